@@ -1,97 +1,223 @@
-import pygame as pg
-from OpenGL.GL import *
-from texture import load_texture, draw_texture
+import numpy as np
+from collections import OrderedDict
+from OpenGL.GL import GL_QUADS
+from renderer import get_renderer
+from sprite_atlas import SpriteAtlas
+from asset_cache import texture_cache, frame_paths, frame_names, IMAGE_DIR
 
-class Animation:
-    def _init_(self, frame_paths, frame_time=0.1, scale=1.0):
+class FrameSet:
+    """
+    The frames of one animation cycle, packed into a single atlas texture.
+    texture_ids are the textures the set owns and frees when evicted; none
+    when its frames live in a shared atlas.
+    """
+    def __init__(self, name, sprites, texture_ids=()):
+        self.name = name
+        self.sprites = sprites
+        self.texture_ids = texture_ids
+        self.refs = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+class FrameSetCache:
+    """
+    Frame sets shared by every animation playing them. A set is decoded and
+    uploaded on its first acquire and reference counted from then on; sets
+    nobody uses are kept for a while in case they are wanted again, then
+    their textures are released. Given an atlas that already holds every
+    frame of a cycle, such as the one uploaded from the asset bundle, the
+    set uses those sprites instead of loading the images again.
+    """
+    def __init__(self, directory=IMAGE_DIR, keep_unused=4, cache=texture_cache, atlas=None):
+        self.directory = directory
+        self.atlas = atlas
+        self.keep_unused = keep_unused
+        self.cache = cache
+        self.sets = {}
+        self.unused = OrderedDict()  # name -> FrameSet with no references, oldest first
+        self.loads = 0
+
+    def acquire(self, name):
+        """Get a frame set and add a reference to it"""
+        frame_set = self.sets.get(name)
+        if frame_set is None:
+            frame_set = self.sets[name] = self._load(name)
+        self.unused.pop(name, None)
+        frame_set.refs += 1
+        return frame_set
+
+    def release(self, name):
+        """Drop a reference; unreferenced sets are freed once too many pile up"""
+        frame_set = self.sets[name]
+        frame_set.refs -= 1
+        if frame_set.refs == 0:
+            self.unused[name] = frame_set
+            while len(self.unused) > self.keep_unused:
+                old_name, old_set = self.unused.popitem(last=False)
+                del self.sets[old_name]
+                for texture_id in old_set.texture_ids:
+                    get_renderer().release_texture(texture_id)
+
+    def _load(self, name):
+        if self.atlas is not None:
+            stems = frame_names(name, self.atlas.sprites)
+            if stems:
+                # Shared with everything else drawn from the atlas, so never released here
+                return FrameSet(name, [self.atlas[stem] for stem in stems])
+        paths = frame_paths(name, self.directory)
+        if not paths:
+            raise KeyError(f"No frames found for animation '{name}'")
+        stems = [path.stem for path in paths]
+        atlas = SpriteAtlas.from_directory(self.directory, f"{name}_*.png", names=stems, cache=self.cache)
+        self.loads += 1
+        return FrameSet(name, [atlas[stem] for stem in stems], atlas.texture_ids)
+
+    def stats(self):
+        """Loaded sets with their reference counts, and how many were loaded from images"""
+        return {'sets': {name: frame_set.refs for name, frame_set in self.sets.items()}, 'loads': self.loads}
+
+class Animator:
+    """
+    Pool of animation instances driven by one clock. Instance state lives in
+    parallel arrays indexed by handle, so update() works out the current
+    frame of every active animation in one vectorized step. Handles of
+    stopped animations are reused by later plays.
+    """
+    def __init__(self, frame_sets=None, capacity=64):
+        self.frame_sets = frame_sets or FrameSetCache()
+        self.sets = [None] * capacity
+        self.start = np.zeros(capacity)
+        self.frame_time = np.ones(capacity)
+        self.frame_count = np.ones(capacity, dtype=np.int64)
+        self.loop = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.finished = np.zeros(capacity, dtype=bool)
+        self.frame = np.zeros(capacity, dtype=np.int64)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        """Double the pool"""
+        capacity = len(self.sets)
+        self.sets.extend([None] * capacity)
+        self.start = np.concatenate((self.start, np.zeros(capacity)))
+        self.frame_time = np.concatenate((self.frame_time, np.ones(capacity)))
+        self.frame_count = np.concatenate((self.frame_count, np.ones(capacity, dtype=np.int64)))
+        for name in ('loop', 'active', 'finished'):
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros(capacity, dtype=bool))))
+        self.frame = np.concatenate((self.frame, np.zeros(capacity, dtype=np.int64)))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def play(self, name, now, frame_time=0.15, loop=True, handle=None):
         """
-        Initialize an animation with a list of frame paths
-        frame_paths: list of paths to frame images
-        frame_time: time per frame in seconds
-        scale: scale factor for the frames
+        Start the frame set called name at time now and return its handle.
+        Pass the handle of a playing animation to switch it to another cycle.
         """
-        self.frames = []
-        for path in frame_paths:
-            frame, w, h = load_texture(path)
-            self.frames.append({
-                'texture': frame,
-                'width': w * scale,
-                'height': h * scale
-            })
-        self.frame_time = frame_time
-        self.current_frame = 0
-        self.start_time = 0
-        self.is_playing = False
-        self.loop = True
-
-    def start(self, current_time, loop=True):
-        """Start playing the animation"""
-        self.is_playing = True
-        self.start_time = current_time
-        self.current_frame = 0
-        self.loop = loop
-
-    def stop(self):
-        """Stop the animation"""
-        self.is_playing = False
+        frame_set = self.frame_sets.acquire(name)
+        if handle is None:
+            if not self.free:
+                self._grow()
+            handle = self.free.pop()
+        elif self.sets[handle] is not None:
+            self.frame_sets.release(self.sets[handle].name)
+        self.sets[handle] = frame_set
+        self.start[handle] = now
+        self.frame_time[handle] = frame_time
+        self.frame_count[handle] = len(frame_set)
+        self.loop[handle] = loop
+        self.active[handle] = True
+        self.finished[handle] = False
+        self.frame[handle] = 0
+        return handle
 
-    def update(self, current_time):
-        """Update the animation state"""
-        if not self.is_playing:
-            return False
-
-        if current_time - self.start_time >= self.frame_time:
-            self.current_frame += 1
-            self.start_time = current_time
-            
-            if self.current_frame >= len(self.frames):
-                if self.loop:
-                    self.current_frame = 0
-                else:
-                    self.is_playing = False
-                    return True  # Animation finished
-        return False
-
-    def draw(self, x, y):
-        """Draw the current frame"""
-        if not self.is_playing:
+    def playing(self, handle):
+        """Name of the cycle an animation is playing"""
+        return self.sets[handle].name
+
+    def stop(self, handle):
+        """Stop an animation and return its handle to the pool"""
+        self.frame_sets.release(self.sets[handle].name)
+        self.sets[handle] = None
+        self.active[handle] = False
+        self.free.append(handle)
+
+    def update(self, now):
+        """
+        Advance every active animation to time now. One-shot animations that
+        ran past their last frame hold it and are flagged finished; returns
+        the handles that finished during this update.
+        """
+        active = np.flatnonzero(self.active)
+        if not len(active):
+            return []
+        index = np.maximum((now - self.start[active]) // self.frame_time[active], 0).astype(np.int64)
+        counts = self.frame_count[active]
+        looping = self.loop[active]
+        self.frame[active] = np.where(looping, index % counts, np.minimum(index, counts - 1))
+        done = active[~looping & (index >= counts) & ~self.finished[active]]
+        self.finished[done] = True
+        return done.tolist()
+
+    def sprite(self, handle):
+        """Sprite of an animation's current frame"""
+        return self.sets[handle].sprites[self.frame[handle]]
+
+    def draw(self, handles, rects):
+        """
+        Draw the current frame of each animation into its (x, y, width,
+        height) rect. Quads are grouped by texture so each frame set costs
+        one batch however many instances are on screen; within a group the
+        given order is kept.
+        """
+        if not len(handles):
             return
+        sprites = [self.sprite(handle) for handle in handles]
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        textures = np.array([sprite.texture_id for sprite in sprites])
+        uvs = np.array([sprite.uv for sprite in sprites], dtype=np.float64)
+        for texture_id in dict.fromkeys(textures.tolist()):
+            group = textures == texture_id
+            x, y, w, h = rects[group].T
+            u0, v0, u1, v1 = uvs[group].T
+            positions = np.stack((x, y, x + w, y, x + w, y + h, x, y + h), axis=1)
+            texcoords = np.stack((u0, v0, u1, v0, u1, v1, u0, v1), axis=1)
+            get_renderer().add_vertices(GL_QUADS, positions, texcoords=texcoords.reshape(-1, 2), texture=texture_id)
 
-        frame = self.frames[self.current_frame]
-        draw_texture(
-            frame['texture'],
-            x - frame['width'] // 2,
-            y - frame['height'] // 2,
-            frame['width'],
-            frame['height']
-        )
+    def clear(self):
+        """Stop every animation"""
+        for handle in np.flatnonzero(self.active):
+            self.stop(int(handle))
 
 class AnimationManager:
-    def _init_(self):
-        """Initialize the animation manager"""
-        self.animations = []
-
-    def create_explosion(self, x, y, current_time, frame_paths, frame_time=0.1, scale=1.0):
-        """Create a new explosion animation"""
-        animation = Animation(frame_paths, frame_time, scale)
-        animation.start(current_time, loop=False)
-        self.animations.append({
-            'animation': animation,
-            'x': x,
-            'y': y
-        })
+    """One-shot animations played at fixed positions, such as explosions"""
+    def __init__(self, animator):
+        self.animator = animator
+        self.animations = []  # (handle, center_x, center_y, scale)
+
+    def create_explosion(self, x, y, current_time, frame_set="explosion", frame_time=0.1, scale=1.0):
+        """Play a frame set once, centered on (x, y)"""
+        handle = self.animator.play(frame_set, current_time, frame_time, loop=False)
+        self.animations.append((handle, x, y, scale))
 
     def update(self, current_time):
-        """Update all animations"""
-        for anim_data in self.animations[:]:
-            if anim_data['animation'].update(current_time):
-                self.animations.remove(anim_data)
+        """Remove animations that have played through; the animator advances the frames"""
+        for animation in self.animations[:]:
+            handle = animation[0]
+            if self.animator.finished[handle]:
+                self.animator.stop(handle)
+                self.animations.remove(animation)
 
     def draw(self):
         """Draw all active animations"""
-        for anim_data in self.animations:
-            anim_data['animation'].draw(anim_data['x'], anim_data['y'])
+        rects = []
+        for handle, x, y, scale in self.animations:
+            sprite = self.animator.sprite(handle)
+            width, height = sprite.width * scale, sprite.height * scale
+            rects.append((x - width // 2, y - height // 2, width, height))
+        self.animator.draw([animation[0] for animation in self.animations], rects)
 
     def clear(self):
         """Clear all animations"""
-        self.animations.clear()
\ No newline at end of file
+        for handle, _, _, _ in self.animations:
+            self.animator.stop(handle)
+        self.animations.clear()
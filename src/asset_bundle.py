@@ -0,0 +1,230 @@
+"""
+Offline asset bundler.
+
+Packs the images the game loads into a single file the game memory-maps
+at startup: a JSON index followed by texture data, mip levels already
+generated and stored in its final texel format, so loading is one upload
+per level straight from the mapped file. Textures are packed to the size
+their images need, and only textures holding a sprite drawn smaller than
+it is get mip levels. Run from the project root:
+
+    python src/asset_bundle.py                          # 16-bit textures: the sky, the ground and the rest
+    python src/asset_bundle.py --format rgba8           # full color sprite atlas
+    python src/asset_bundle.py --format palette8        # smaller file only; uploaded as RGBA8
+    python src/asset_bundle.py --separate sky=rgba8     # full color sky
+"""
+import os
+import sys
+import json
+import hashlib
+import struct
+import numpy as np
+from pathlib import Path
+from renderer import get_renderer
+from sprite_atlas import compose_atlas
+from asset_cache import load_images, frame_names
+from zombie import ENEMY_CYCLES
+from texture_formats import (FORMATS, FORMAT_RGBA8, FORMAT_RGB565, FORMAT_RGBA4444, FORMAT_PALETTE8, BYTES_PER_TEXEL,
+                             UPLOADED_BYTES_PER_TEXEL, encode_pixels, decode_pixels, quantize, build_mipmaps)
+
+BUNDLE_PATH = os.path.join("assets", "bundle.bin")
+IMAGE_DIR = os.path.join("assets", "images")
+RUNTIME_PATTERN = "*.png"  # PSD, EPS, JPG and ZIP files are art sources, not game assets
+# What the game draws: sprites from the atlas from the first frame, and the
+# frames of each animation cycle, loaded on first use. Other PNGs in the
+# image directory are never loaded.
+CORE_SPRITES = ("sky", "player", "ground")
+ANIMATION_CYCLES = tuple(cycle for cycles in ENEMY_CYCLES.values() for cycle in cycles if cycle) + ("explosion",)
+MINIFIED_SPRITES = ("ground",)  # Drawn smaller than their size, so they need mip levels
+# The large backgrounds get textures of their own: the opaque sky needs no alpha
+DEFAULT_FORMAT = FORMAT_RGBA4444
+DEFAULT_SEPARATE = {'sky': FORMAT_RGB565, 'ground': FORMAT_RGBA4444}
+MAGIC = b"CGBUNDL1"
+VERSION = 2  # Layout of the index; bump it when the reader changes
+ALIGNMENT = 16
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def runtime_images(directory=IMAGE_DIR):
+    """Paths of the images the game loads, in name order"""
+    paths = {path.stem: path for path in Path(directory).glob(RUNTIME_PATTERN)}
+    names = [name for name in CORE_SPRITES if name in paths]
+    for cycle in ANIMATION_CYCLES:
+        names += frame_names(cycle, paths)
+    return [paths[name] for name in sorted(names)]
+
+def source_hashes(paths):
+    """SHA-1 of each image file's contents by file name, to tell when a bundle is out of date"""
+    return {Path(path).name: hashlib.sha1(Path(path).read_bytes()).hexdigest() for path in paths}
+
+def build_bundle(output, images, default_format=FORMAT_RGBA8, separate=None, mipmaps=True, max_width=2048,
+                 sources=None, minified=None, power_of_two=True):
+    """
+    Write a bundle of images (name -> RGBA array). Images named in separate
+    (name -> format) get a texture of their own; the rest share one atlas
+    texture called 'sprites' in default_format. With mipmaps, textures get
+    mip levels, only those holding an image named in minified if it is
+    given. power_of_two rounds texture sizes up, else they are trimmed to
+    their images. sources holds the source_hashes() of the files the images
+    came from. Returns the index.
+    """
+    separate = separate or {}
+    missing = set(separate) - set(images)
+    if missing:
+        raise ValueError(f"No images named: {', '.join(sorted(missing))}")
+
+    groups = {name: (fmt, {name: images[name]}) for name, fmt in separate.items()}
+    shared = {name: pixels for name, pixels in images.items() if name not in separate}
+    if shared:
+        groups['sprites'] = (default_format, shared)
+
+    textures = {}
+    blobs = []
+    offset = 0
+
+    def add_blob(array):
+        nonlocal offset
+        data = np.ascontiguousarray(array).tobytes()
+        blobs.append((offset, data))
+        location = {'offset': offset, 'size': len(data)}
+        offset = _align(offset + len(data))
+        return location
+
+    for texture_name, (texel_format, members) in groups.items():
+        if texel_format not in FORMATS:
+            raise ValueError(f"Unknown texture format: {texel_format}")
+        if texel_format == FORMAT_RGB565:
+            transparent = [name for name, pixels in members.items() if (pixels[..., 3] < 255).any()]
+            if transparent:
+                raise ValueError(f"rgb565 has no alpha channel but {', '.join(transparent)} "
+                                 "has transparent pixels; use rgba4444 or palette8")
+        pixels, rects = compose_atlas(members, max_width, power_of_two)
+        height, width = pixels.shape[:2]
+        mipmapped = mipmaps and (minified is None or not set(members).isdisjoint(minified))
+        levels = [pixels] + (build_mipmaps(pixels) if mipmapped else [])
+        palette = quantize(pixels) if texel_format == FORMAT_PALETTE8 else None
+        textures[texture_name] = {
+            'format': texel_format,
+            'width': width,
+            'height': height,
+            'sprites': rects,
+            'palette': add_blob(palette) if palette is not None else None,
+            'levels': [add_blob(encode_pixels(level, texel_format, palette)) for level in levels],
+        }
+
+    index = json.dumps({'version': VERSION, 'textures': textures, 'sources': sources or {}}).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(index))
+    temp_path = output + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(MAGIC + struct.pack("<I", len(index)) + index)
+        for blob_offset, data in blobs:
+            file.seek(data_start + blob_offset)
+            file.write(data)
+    os.replace(temp_path, output)
+    return textures
+
+class AssetBundle:
+    """A memory-mapped bundle written by build_bundle"""
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        index_length, = struct.unpack("<I", bytes(self.data[len(MAGIC):len(MAGIC) + 4]))
+        index_start = len(MAGIC) + 4
+        index = json.loads(bytes(self.data[index_start:index_start + index_length]))
+        if index.get('version') != VERSION:
+            raise ValueError(f"{path} is a version {index.get('version')} asset bundle, expected version {VERSION}")
+        self.data_start = _align(index_start + index_length)
+        self.textures = index['textures']
+        self.sources = index.get('sources')  # Missing from bundles built before sources were recorded
+
+    def stale_sources(self, directory=IMAGE_DIR):
+        """
+        Names of the runtime images in directory added, removed or changed
+        since the bundle was built; every image if the bundle did not record
+        its sources
+        """
+        current = source_hashes(runtime_images(directory))
+        if self.sources is None:
+            return sorted(current)
+        return sorted(name for name in current.keys() | self.sources.keys()
+                      if current.get(name) != self.sources.get(name))
+
+    def _slice(self, location):
+        start = self.data_start + location['offset']
+        return self.data[start:start + location['size']]
+
+    def level(self, name, level=0):
+        """
+        Texels of one mip level as a view into the mapped file: (h, w, 4)
+        uint8 for rgba8, (h, w) uint16 for 16-bit formats and (h, w) uint8
+        palette indices for palette8
+        """
+        entry = self.textures[name]
+        width, height = max(entry['width'] >> level, 1), max(entry['height'] >> level, 1)
+        texels = self._slice(entry['levels'][level])
+        if entry['format'] == FORMAT_RGBA8:
+            return texels.reshape(height, width, 4)
+        if BYTES_PER_TEXEL[entry['format']] == 2:
+            return texels.view(np.uint16).reshape(height, width)
+        return texels.reshape(height, width)
+
+    def palette(self, name):
+        """The (256, 4) RGBA palette of a palette8 texture, else None"""
+        location = self.textures[name]['palette']
+        return self._slice(location).reshape(-1, 4) if location else None
+
+    def pixels(self, name, level=0):
+        """One mip level decoded to a (h, w, 4) uint8 RGBA array"""
+        entry = self.textures[name]
+        texels = self.level(name, level)
+        return decode_pixels(texels, texels.shape[1], texels.shape[0], entry['format'], self.palette(name))
+
+    def upload(self, name):
+        """Create a texture with every stored mip level and return its id"""
+        entry = self.textures[name]
+        levels = [self.level(name, level) for level in range(len(entry['levels']))]
+        return get_renderer().create_texture(levels[0], entry['width'], entry['height'], entry['format'],
+                                             self.palette(name), levels[1:])
+
+def main():
+    import argparse  # Kept out of the game's startup path, which imports this module
+    parser = argparse.ArgumentParser(description="Pack the runtime images into a memory-mappable asset bundle")
+    parser.add_argument("--images", default=IMAGE_DIR, help="directory of runtime images")
+    parser.add_argument("--output", default=BUNDLE_PATH, help="bundle file to write")
+    parser.add_argument("--format", default=DEFAULT_FORMAT, choices=FORMATS,
+                        help="texel format of the shared atlas; palette8 shrinks the file but is uploaded as rgba8")
+    parser.add_argument("--separate", action="append", default=[], metavar="NAME=FORMAT",
+                        help="give an image its own texture in FORMAT (repeatable), or the atlas format with "
+                             f"NAME=shared; by default {', '.join(f'{name}={fmt}' for name, fmt in DEFAULT_SEPARATE.items())}")
+    parser.add_argument("--no-mipmaps", action="store_true", help="store only full-resolution levels")
+    args = parser.parse_args()
+
+    separate = dict(DEFAULT_SEPARATE, **dict(option.split("=", 1) for option in args.separate))
+    separate = {name: fmt for name, fmt in separate.items() if fmt != "shared"}
+    paths = runtime_images(args.images)
+    pixels = load_images(paths)
+    images = {path.stem: pixels[path] for path in paths}
+    textures = build_bundle(args.output, images, args.format, separate, not args.no_mipmaps,
+                            sources=source_hashes(paths), minified=MINIFIED_SPRITES, power_of_two=False)
+
+    total = memory = full = 0
+    for name, entry in textures.items():
+        size = sum(level['size'] for level in entry['levels'])
+        # What the texture takes once uploaded, which is not the stored size for palette8
+        uploaded = size // BYTES_PER_TEXEL[entry['format']] * UPLOADED_BYTES_PER_TEXEL[entry['format']]
+        rgba_size = entry['width'] * entry['height'] * 4
+        total += size
+        memory += uploaded
+        full += rgba_size
+        print(f"{name}: {entry['width']}x{entry['height']} {entry['format']}, {len(entry['levels'])} levels, "
+              f"{len(entry['sprites'])} sprites, {size / 1024:.0f} KiB on disk, {uploaded / 1024:.0f} KiB of "
+              f"texture memory (RGBA8 without mipmaps: {rgba_size / 1024:.0f} KiB)")
+    print(f"Wrote {args.output}: {total / 1024:.0f} KiB of texture data; {memory / 1024:.0f} KiB of texture "
+          f"memory, {memory / full:.0%} of plain RGBA8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import io
+import os
+import re
+import struct
+import hashlib
+import threading
+import numpy as np
+import pygame as pg
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_DIR = os.path.join(".cache", "textures")
+IMAGE_DIR = Path("assets") / "images"
+
+def decode_image(data, name=""):
+    """Decode image file bytes into a (height, width, 4) uint8 RGBA array, top row first"""
+    surface = pg.image.load(io.BytesIO(data), name)
+    width, height = surface.get_size()
+    return np.frombuffer(pg.image.tostring(surface, "RGBA"), dtype=np.uint8).reshape(height, width, 4)
+
+def image_size(path):
+    """Width and height of an image file, read from the PNG header without decoding the pixels"""
+    with open(path, "rb") as file:
+        header = file.read(24)
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", header[16:24])
+    return pg.image.load(path).get_size()
+
+def frame_names(name, names):
+    """Frames of a cycle among names, name_1, name_2, ..., in numeric order"""
+    pattern = re.compile(re.escape(name) + r"_(\d+)$")
+    frames = []
+    for stem in names:
+        match = pattern.match(stem)
+        if match:
+            frames.append((int(match.group(1)), stem))
+    return [stem for _, stem in sorted(frames)]
+
+def frame_paths(name, directory=IMAGE_DIR):
+    """Frame images of a cycle, name_1.png, name_2.png, ..., in numeric order"""
+    paths = {path.stem: path for path in Path(directory).glob(f"{name}_*.png")}
+    return [paths[stem] for stem in frame_names(name, paths)]
+
+def frame_size(name, directory=IMAGE_DIR):
+    """Width and height of the first frame of a cycle, without loading it"""
+    paths = frame_paths(name, directory)
+    if not paths:
+        raise KeyError(f"No frames found for animation '{name}'")
+    return image_size(paths[0])
+
+class DecodedImageCache:
+    """
+    Decoded RGBA pixels of image files, stored on disk under a hash of the
+    file contents. Later loads memory-map the stored pixels instead of
+    decoding the image again, and an edited image gets a new hash, so stale
+    entries are never used. The cache is best effort: if it cannot be
+    written, images are simply decoded every time.
+    """
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # Loads run on worker threads
+
+    def load(self, path):
+        """Get an image as a read-only (height, width, 4) uint8 array, top row first"""
+        with open(path, "rb") as file:
+            data = file.read()
+        cache_path = os.path.join(self.directory, hashlib.sha1(data).hexdigest() + ".npy")
+        try:
+            pixels = np.load(cache_path, mmap_mode="r")
+            hit = True
+        except (OSError, ValueError):
+            pixels = decode_image(data, os.path.basename(path))
+            self._store(cache_path, pixels)
+            hit = False
+
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return pixels
+
+    def _store(self, cache_path, pixels):
+        """Write pixels to the cache, renaming into place so readers never see a partial file"""
+        temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as file:
+                np.save(file, pixels)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def stats(self):
+        """Hit and miss counts since the cache was created"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """Delete every cached image, so the next loads are cold"""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".npy"):
+                    os.remove(os.path.join(self.directory, name))
+
+texture_cache = DecodedImageCache()
+
+def load_images(paths, cache=texture_cache, workers=4):
+    """
+    Load many images through the cache on a pool of worker threads.
+    Returns a dict of path -> pixel array. Only decoding happens here;
+    uploading textures is left to the caller on the thread owning the GL
+    context.
+    """
+    paths = list(paths)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(cache.load, paths)))
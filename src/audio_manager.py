@@ -1,26 +1,46 @@
+import logging
+import threading
 import pygame as pg
 import os
 from pathlib import Path
+from startup_profiler import profiler
+
+log = logging.getLogger(__name__)
 
 class AudioManager:
     def __init__(self):
         # Set volume (0.0 to 1.0) - Move this before loading sounds
         self.volume = 0.5
         
-        # Initialize pygame mixer with specific settings
-        try:
-            pg.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-            print("Pygame mixer initialized successfully")
-        except Exception as e:
-            print(f"Error initializing pygame mixer: {e}")
-            return
-            
-        # Load sound effects
-        self.sounds = {}
-        self._load_sounds()
+        # The mixer is started and sounds are loaded on a background thread
+        # by warm_up(), so opening the audio device delays neither the first
+        # frame nor a shot; sounds is None until they are ready
+        self.sounds = None
+        self.loader = None
+
+    def warm_up(self):
+        """Start the mixer and load the sounds in the background, once"""
+        if self.loader is None:
+            self.loader = threading.Thread(target=self._load, name="audio", daemon=True)
+            self.loader.start()
+
+    def _load(self):
+        """Initialize the mixer and load the sounds, then publish them"""
+        sounds = {}
+        with profiler.phase("audio"):
+            # Initialize pygame mixer with specific settings
+            try:
+                pg.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+                log.debug("Pygame mixer initialized")
+            except Exception as e:
+                log.warning("Could not initialize the pygame mixer, playing without sound: %s", e)
+            else:
+                # Load sound effects
+                self._load_sounds(sounds)
+        self.sounds = sounds  # Only a complete set is ever visible to play_sound
         
-    def _load_sounds(self):
-        """Load all game sound effects"""
+    def _load_sounds(self, sounds):
+        """Load all game sound effects into sounds"""
         try:
             # Get the project root directory (assuming src folder is one level down from project root)
             current_file = Path(__file__)
@@ -30,61 +50,51 @@ class AudioManager:
             # Construct the proper path for the fire sound
             fire_sound_path = sound_dir / "fire.mp3"
             
-            print(f"Looking for sound file at: {fire_sound_path}")
-            
             # Check if file exists
             if not fire_sound_path.exists():
-                print(f"Error: Sound file does not exist at path: {fire_sound_path}")
-                self.sounds['fire'] = None
+                log.warning("Sound file does not exist: %s", fire_sound_path)
+                sounds['fire'] = None
                 return
                 
-            print(f"Attempting to load sound from: {fire_sound_path}")
-            self.sounds['fire'] = pg.mixer.Sound(str(fire_sound_path))
+            log.debug("Loading sound %s", fire_sound_path)
+            sounds['fire'] = pg.mixer.Sound(str(fire_sound_path))
             
             # Verify sound was loaded and set volume
-            if self.sounds['fire']:
-                print("Successfully loaded fire sound")
-                self.sounds['fire'].set_volume(self.volume)
-                print(f"Sound volume set to: {self.volume}")
-                
-                # Test play the sound
-                try:
-                    self.sounds['fire'].play()
-                    print("Test play of fire sound successful")
-                except Exception as e:
-                    print(f"Error during test play: {e}")
+            if sounds['fire']:
+                sounds['fire'].set_volume(self.volume)
             else:
-                print("Error: Sound object is None after loading")
+                log.warning("Loading %s gave no sound", fire_sound_path)
                 
         except Exception as e:
-            print(f"Detailed error loading sounds: {str(e)}")
-            print(f"Error type: {type(e).__name__}")
-            self.sounds['fire'] = None
+            log.warning("Could not load sounds: %s: %s", type(e).__name__, e)
+            sounds['fire'] = None
     
     def play_sound(self, sound_name):
-        """Play a sound effect by name"""
+        """Play a sound effect by name; until the sounds are ready it is skipped, not waited for"""
+        if self.sounds is None:
+            self.warm_up()
+            return
         if sound_name in self.sounds:
             if self.sounds[sound_name] is None:
-                print(f"Warning: Sound '{sound_name}' is None")
+                log.debug("Sound %r failed to load", sound_name)
                 return
                 
             try:
-                print(f"Attempting to play sound: {sound_name}")
                 self.sounds[sound_name].play()
-                print(f"Successfully played sound: {sound_name}")
             except Exception as e:
-                print(f"Detailed error playing sound {sound_name}: {str(e)}")
-                print(f"Error type: {type(e).__name__}")
+                log.debug("Could not play sound %r: %s: %s", sound_name, type(e).__name__, e)
         else:
-            print(f"Warning: Sound '{sound_name}' not found in sounds dictionary")
+            log.debug("No sound named %r", sound_name)
     
     def set_volume(self, volume):
         """Set volume for all sounds (0.0 to 1.0)"""
         self.volume = max(0.0, min(1.0, volume))
-        for sound in self.sounds.values():
+        for sound in (self.sounds or {}).values():
             if sound:
                 sound.set_volume(self.volume)
     
     def cleanup(self):
         """Clean up audio resources"""
-        pg.mixer.quit()
+        if self.loader is not None:
+            self.loader.join()
+            pg.mixer.quit()
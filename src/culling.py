@@ -0,0 +1,77 @@
+import numpy as np
+from graphics_algorithms import clip_lines_batch
+
+class ViewportCuller:
+    """
+    Cull stage run before rasterization.
+    Lines are clipped to the viewport with clip_lines_batch, circles and
+    ellipses whose bounding box misses the viewport are dropped, and
+    counters record how much rasterization work was skipped.
+    """
+    def __init__(self, xmin=0, ymin=0, xmax=639, ymax=479):
+        self.xmin = xmin
+        self.ymin = ymin
+        self.xmax = xmax
+        self.ymax = ymax
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset all counters to zero"""
+        self.stats = {
+            'lines': 0,
+            'lines_culled': 0,
+            'lines_clipped': 0,
+            'line_pixels_skipped': 0,
+            'circles': 0,
+            'circles_culled': 0,
+            'ellipses': 0,
+            'ellipses_culled': 0
+        }
+
+    def cull_lines(self, lines):
+        """
+        Clip lines given as rows of x1, y1, x2, y2 to the viewport.
+        Returns (visible_lines, keep) where keep masks the input rows left.
+        """
+        lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+        clipped, keep = clip_lines_batch(lines, self.xmin, self.ymin, self.xmax, self.ymax)
+
+        # DDA plots max(|dx|, |dy|) + 1 pixels per line
+        before = np.abs(lines[:, 2:] - lines[:, :2]).max(axis=1).astype(np.int64) + 1
+        after = np.abs(clipped[:, 2:] - clipped[:, :2]).max(axis=1).astype(np.int64) + 1
+        after[~keep] = 0
+
+        self.stats['lines'] += len(lines)
+        self.stats['lines_culled'] += int((~keep).sum())
+        self.stats['lines_clipped'] += int((keep & (before != after)).sum())
+        self.stats['line_pixels_skipped'] += int((before - after).sum())
+        return clipped[keep], keep
+
+    def cull_circles(self, circles):
+        """
+        Drop circles given as rows of center_x, center_y, radius whose
+        bounding box lies outside the viewport. Returns (visible, keep).
+        """
+        circles = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+        keep = self._overlaps(circles[:, 0], circles[:, 1], circles[:, 2], circles[:, 2])
+        self.stats['circles'] += len(circles)
+        self.stats['circles_culled'] += int((~keep).sum())
+        return circles[keep], keep
+
+    def cull_ellipses(self, ellipses):
+        """
+        Drop ellipses given as rows of center_x, center_y, a, b whose
+        bounding box lies outside the viewport. Returns (visible, keep).
+        """
+        ellipses = np.asarray(ellipses, dtype=np.float64).reshape(-1, 4)
+        keep = self._overlaps(ellipses[:, 0], ellipses[:, 1], ellipses[:, 2], ellipses[:, 3])
+        self.stats['ellipses'] += len(ellipses)
+        self.stats['ellipses_culled'] += int((~keep).sum())
+        return ellipses[keep], keep
+
+    def _overlaps(self, cx, cy, rx, ry):
+        """Mask of the bounding boxes that touch the viewport"""
+        rx = np.abs(rx)
+        ry = np.abs(ry)
+        return ((cx + rx >= self.xmin) & (cx - rx <= self.xmax) &
+                (cy + ry >= self.ymin) & (cy - ry <= self.ymax))
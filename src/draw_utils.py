@@ -1,46 +1,16 @@
-from OpenGL.GL import *
-import math
+from renderer import get_renderer
+from geometry_cache import ellipse_fan
 
 def draw_rectangle(x, y, width, height, color=(1, 1, 1), filled=True):
-    # Handle both RGB and RGBA colors
-    if len(color) == 4:  # RGBA
-        glColor4f(*color)
-    else:  # RGB
-        glColor3f(*color)
-        
+    # RGB and RGBA colors are both accepted by the renderer
     if filled:
-        glBegin(GL_QUADS)
-        glVertex2f(x, y)
-        glVertex2f(x + width, y)
-        glVertex2f(x + width, y + height)
-        glVertex2f(x, y + height)
-        glEnd()
+        get_renderer().add_rect(x, y, width, height, color)
     else:
-        glBegin(GL_LINE_LOOP)
-        glVertex2f(x, y)
-        glVertex2f(x + width, y)
-        glVertex2f(x + width, y + height)
-        glVertex2f(x, y + height)
-        glEnd()
+        get_renderer().add_line_loop(
+            ((x, y), (x + width, y), (x + width, y + height), (x, y + height)), color)
 
 def draw_circle(cx, cy, radius, color=(1, 1, 1), segments=64):
-    glColor3f(*color)
-    glBegin(GL_TRIANGLE_FAN)
-    glVertex2f(cx, cy)
-    for i in range(segments + 1):
-        angle = 2 * math.pi * i / segments
-        x = cx + math.cos(angle) * radius
-        y = cy + math.sin(angle) * radius
-        glVertex2f(x, y)
-    glEnd()
+    get_renderer().add_triangle_fan(ellipse_fan(cx, cy, radius, radius, segments), color)
 
 def draw_ellipse(cx, cy, rx, ry, color=(1, 1, 1), segments=64):
-    glColor3f(*color)
-    glBegin(GL_TRIANGLE_FAN)
-    glVertex2f(cx, cy)
-    for i in range(segments + 1):
-        angle = 2 * math.pi * i / segments
-        x = cx + math.cos(angle) * rx
-        y = cy + math.sin(angle) * ry
-        glVertex2f(x, y)
-    glEnd()
+    get_renderer().add_triangle_fan(ellipse_fan(cx, cy, rx, ry, segments), color)
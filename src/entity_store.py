@@ -0,0 +1,183 @@
+import numpy as np
+
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+class EntityStore:
+    """
+    Entities of one kind stored column by column. Every field is a NumPy
+    array and rows [0, len(store)) are the live entities, kept packed so an
+    update is one vectorized pass over each column. Removing rows moves the
+    last live rows into the holes (swap-remove), so removal costs the number
+    of rows removed rather than the number of entities, but row numbers are
+    not stable: refer to an entity across ticks by its handle.
+
+    A handle packs a slot, whose entry in a table holds the entity's current
+    row, with the slot's generation, which goes up whenever the slot's
+    entity is removed. Looking a handle up is O(1), and a handle kept after
+    its entity is gone never finds the entity that reuses the slot.
+
+    A fixed store is a pool: its arrays are allocated once and the rows
+    past the live ones are its free list. Adding to a full pool drops the
+    new entities and counts them as overflow instead of growing.
+    """
+    def __init__(self, fields, capacity=64, fixed=False):
+        """
+        fields: name -> dtype, or name -> (dtype, default). A tuple default
+        makes a column with one row of that length per entity, e.g. a color.
+        """
+        self.count = 0
+        self.fixed = fixed
+        self.reset_stats()
+        self.defaults = {'id': -1}
+        self.columns = {'id': np.full(capacity, -1, dtype=np.int64)}  # Handle of each row
+        self.slot_rows = np.full(capacity, -1, dtype=np.int64)
+        self.generations = np.zeros(capacity, dtype=np.int64)
+        # Unused slots are free_slots[:capacity - count], the next one to use last
+        self.free_slots = np.arange(capacity - 1, -1, -1, dtype=np.int64)
+        for name, spec in fields.items():
+            dtype, default = spec if isinstance(spec, tuple) else (spec, 0)
+            self.defaults[name] = default
+            self.columns[name] = self._new_column(capacity, dtype, default)
+
+    @staticmethod
+    def _new_column(capacity, dtype, default):
+        if isinstance(default, tuple):
+            return np.full((capacity, len(default)), default, dtype=dtype)
+        return np.full(capacity, default, dtype=dtype)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        """The live rows of a column; a view, so in-place updates write through"""
+        return self.columns[name][:self.count]
+
+    def __setitem__(self, name, values):
+        self.columns[name][:self.count] = values
+
+    @property
+    def capacity(self):
+        return len(self.columns['id'])
+
+    def reset_stats(self):
+        """Reset the peak and overflow counters"""
+        self.peak = self.count
+        self.overflow = 0
+
+    def stats(self):
+        """Live rows, capacity, occupancy, most rows ever live and entities dropped because the pool was full"""
+        return {'live': self.count, 'capacity': self.capacity, 'occupancy': self.count / self.capacity,
+                'peak': self.peak, 'overflow': self.overflow}
+
+    def interpolate(self, name, alpha, rows=slice(None)):
+        """
+        A column blended from its 'prev_' column, which holds its value at
+        the previous tick, alpha of the way toward its current value
+        """
+        previous = self['prev_' + name][rows]
+        return previous + (self[name][rows] - previous) * alpha
+
+    def _reserve(self, count):
+        """Make room for count rows, at least doubling the capacity when full"""
+        capacity = self.capacity
+        if count <= capacity:
+            return
+        old_capacity, capacity = capacity, max(count, capacity * 2)
+        for name, column in self.columns.items():
+            grown = self._new_column(capacity, column.dtype, self.defaults[name])
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+        free_slots = np.full(capacity, -1, dtype=np.int64)
+        free_slots[:capacity - old_capacity] = np.arange(capacity - 1, old_capacity - 1, -1)
+        free_slots[capacity - old_capacity:capacity - self.count] = self.free_slots[:old_capacity - self.count]
+        self.free_slots = free_slots
+        self.slot_rows = np.concatenate((self.slot_rows, np.full(capacity - old_capacity, -1, dtype=np.int64)))
+        self.generations = np.concatenate((self.generations, np.zeros(capacity - old_capacity, dtype=np.int64)))
+
+    def add(self, **values):
+        """
+        Add one entity and return its handle, or None if the pool is full.
+        Fields not given get their defaults.
+        """
+        ids = self.extend(1, **values)
+        return int(ids[0]) if len(ids) else None
+
+    def extend(self, count, **values):
+        """
+        Add count entities at once. Each value is a scalar shared by all of
+        them or an array with one entry per entity. Returns their handles,
+        which for a full pool leave out the entities that did not fit.
+        """
+        if self.fixed and self.count + count > self.capacity:
+            room = self.capacity - self.count
+            self.overflow += count - room
+            values = {name: value[:room] if np.ndim(value) > np.ndim(self.defaults[name]) else value
+                      for name, value in values.items()}
+            count = room
+        first = self.count
+        self._reserve(first + count)
+        rows = slice(first, first + count)
+        for name, column in self.columns.items():
+            column[rows] = values.get(name, self.defaults[name])
+        top = self.capacity - first
+        slots = self.free_slots[top - count:top][::-1]
+        handles = (self.generations[slots] << SLOT_BITS) | slots
+        self.columns['id'][rows] = handles
+        self.slot_rows[slots] = np.arange(first, first + count)
+        self.count += count
+        self.peak = max(self.peak, self.count)
+        return handles
+
+    def remove(self, rows):
+        """
+        Swap-remove rows (indices or a mask over the live rows): the holes
+        they leave below the new end are filled with the surviving rows
+        from above it.
+        """
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        else:
+            rows = np.unique(rows)
+        if not len(rows):
+            return
+        end = self.count - len(rows)
+        holes = rows[rows < end]
+        survivors = np.ones(len(rows), dtype=bool)
+        survivors[rows[rows >= end] - end] = False
+        movers = np.arange(end, self.count)[survivors]
+
+        handles = self.columns['id']
+        slots = handles[rows] & SLOT_MASK
+        self.slot_rows[handles[movers] & SLOT_MASK] = holes
+        self.slot_rows[slots] = -1
+        self.generations[slots] += 1
+        top = self.capacity - self.count
+        self.free_slots[top:top + len(slots)] = slots
+        for name, column in self.columns.items():
+            column[holes] = column[movers]
+            if column.dtype == object:
+                column[end:self.count] = self.defaults[name]  # Drop references to removed objects
+        self.count = end
+
+    def find(self, handles):
+        """Rows of the entities with the given handles, -1 where one no longer exists"""
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        slots = handles & SLOT_MASK
+        rows = self.slot_rows[np.where(slots < self.capacity, slots, 0)]
+        found = (handles >= 0) & (slots < self.capacity) & (rows >= 0)
+        found &= self.columns['id'][np.where(found, rows, 0)] == handles
+        return np.where(found, rows, -1)
+
+    def row(self, handle):
+        """Row of one entity, or None if it no longer exists"""
+        slot = handle & SLOT_MASK
+        if handle < 0 or slot >= self.capacity:
+            return None
+        row = self.slot_rows[slot]
+        return int(row) if row >= 0 and self.columns['id'][row] == handle else None
+
+    def clear(self):
+        """Remove every entity"""
+        self.remove(np.arange(self.count))
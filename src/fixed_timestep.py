@@ -0,0 +1,41 @@
+class FixedTimestep:
+    """
+    Turns variable frame times into a whole number of simulation ticks of
+    one fixed length. Frame time accumulates and every full tick's worth is
+    simulated, so the game advances the same way however fast it renders.
+    After a hitch at most max_steps ticks are run and the rest of the time
+    is dropped, so a slow frame cannot snowball into ever more catching up.
+    alpha says how far the frame sits between the last two ticks, for
+    drawing moving things in between them.
+    """
+    def __init__(self, tick_rate=60, max_steps=5):
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped = 0.0  # Seconds of frame time thrown away by the catch-up cap
+
+    def advance(self, frame_time):
+        """Add a frame's time in seconds and return how many ticks to simulate"""
+        self.accumulator += frame_time
+        steps = min(int(self.accumulator / self.dt), self.max_steps)
+        self.accumulator -= steps * self.dt
+        if self.accumulator >= self.dt:
+            # Too far behind: keep only the fraction of a tick
+            excess = self.accumulator - self.accumulator % self.dt
+            self.dropped += excess
+            self.accumulator -= excess
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a tick elapsed since the last simulated one, from 0 up to 1"""
+        return self.accumulator / self.dt
+
+    def reset(self):
+        """Start over with no time owed and zeroed tick and dropped-time counts"""
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped = 0.0
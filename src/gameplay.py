@@ -0,0 +1,452 @@
+import numpy as np
+import random
+import math
+from health_system import HealthSystem
+from zombie import ZombieStore
+from entity_store import EntityStore
+from spatial_hash import SpatialHash
+from timer_wheel import TimerWheel
+from particles import ParticleSystem, Effect, circles, ellipses, lines
+from score_system import ScoreSystem
+from asset_cache import image_size
+
+PLAYER_IMAGE = "assets/images/player.png"
+EFFECT_PLAYER_SIZE = 80  # Player effects are laid out for a sprite this wide and high
+
+# Power-up types; the type column holds indices into these
+POWERUP_TYPES = ("health", "speed", "shield")
+POWERUP_COLORS = np.array([(0.0, 1.0, 0.0), (1.0, 1.0, 0.0), (0.0, 0.5, 1.0)])  # Green, yellow, blue
+BULLET_SPEED = 4000  # Pixels per second without the speed power-up
+
+# Capacities of the fixed pools holding short-lived entities; what does not
+# fit is dropped and counted in the pool's overflow counter
+BULLET_POOL_SIZE = 256
+TRAIL_POOL_SIZE = 2048
+
+# Visual effects, drawn in this order; player effects are placed at the
+# player's center, laid out for an EFFECT_PLAYER_SIZE sprite and scaled to
+# the player's
+EFFECTS = {
+    # Expanding orange circles where bullets hit
+    "bullet_hit": Effect(duration=0.3, radius=10, color=(1.0, 0.5, 0.0), shapes=(circles(),), growth=30,
+                         capacity=256),
+    # Circles shrinking as they fade behind moving power-ups, six a second from each
+    "powerup_trail": Effect(duration=0.3, radius=5, color=(1.0, 1.0, 0.0), shapes=(circles(shrink=True),),
+                            capacity=512, rate=6),
+    # Attraction field: pulsing concentric circles with varying opacity
+    "attract": Effect(duration=1.0, radius=100, color=(0.8, 0.8, 1.0), capacity=16,
+                      shapes=(circles(offsets=((0, 0),) * 3, size=(1.0, 0.8, 0.6), alpha=(1.0, 0.7, 0.4),
+                                      pulse=(0.2, 10)),)),
+    # Green dots turning around the player
+    "healing": Effect(duration=1.0, radius=5, color=(0.0, 1.0, 0.0), capacity=16,
+                      shapes=(circles(offsets=((-10, -10),) * 8, angles=range(0, 360, 45), spin=100),)),
+    # Blue ellipse around the player, as wide and high as its sprite
+    "shield": Effect(duration=3.0, radius=80, color=(0.0, 0.5, 1.0), shapes=(ellipses(),), capacity=16),
+    # Yellow speed lines behind the player
+    "speed_boost": Effect(duration=5.0, radius=0, color=(1.0, 1.0, 0.0), capacity=16,
+                          shapes=(lines([(-70 - 5 * i, -40 + 10 * i, -90 - 10 * i, -40 + 10 * i) for i in range(5)]),)),
+}
+
+class Game:
+    """
+    The game without a window: spawning, typing, bullets, power-ups, health
+    and score, advanced one tick at a time by update() and steered by
+    key_pressed(). Nothing here needs a display or GL context, so the game
+    can be simulated on its own as fast as the CPU allows; App draws it.
+    Every random choice comes from the game's own generators, so the same
+    seed, keys and tick lengths always play out the same game.
+    """
+    def __init__(self, animator=None, player_size=None, seed=None):
+        """
+        animator: plays the enemy and explosion animations; without one the
+        game runs with no animations at all
+        player_size: width and height of the player sprite, read from its
+        image if not given
+        seed: seeds the random spawns and effects; a random seed if not given
+        """
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.random = random.Random(self.seed)
+        self.np_random = np.random.default_rng(self.seed)
+
+        # Player setup
+        self.player_x = 50
+        self.player_y = 225
+        self.player_speed = 5
+        self.player_w, self.player_h = player_size or image_size(PLAYER_IMAGE)
+        self.player_scale = (self.player_w / EFFECT_PLAYER_SIZE, self.player_h / EFFECT_PLAYER_SIZE)
+
+        # Game systems
+        self.health_system = HealthSystem(max_health=100, damage_rate=20)
+        self.score_system = ScoreSystem(target_score=10)
+        self.sounds = []  # Names of the sounds to play, collected until the caller drains them
+
+        # Animations share frame sets and advance on the game clock
+        self.game_time = 0.0
+        # Spawns, cooldowns and power-up durations are timers on the game clock
+        self.timers = TimerWheel()
+        self.animator = animator
+        if animator:
+            from animation import AnimationManager  # Only a drawn game needs the animation engine and its OpenGL
+            self.animation_manager = AnimationManager(animator)
+        else:
+            self.animation_manager = None
+
+        # Entities live in columnar stores, updated by vectorized passes
+        self.zombies = ZombieStore(animator)
+        self.active_zombie = None  # Handle of the zombie being typed
+        self.zombie_spawn_interval = 3
+        self.zombie_words = ["zombie", "ghost", "monster", "creature", "undead", "horror", "scary", "dead"]
+        self.enemy_weights = {"zombie": 6, "bat": 2, "boss": 1}  # Relative spawn chances
+        self.zombie_grid = SpatialHash(cell_size=128)  # Zombie boxes, filed once per tick for bullet hits
+
+        # Bullet system; bullets, their trails and visual effects are short
+        # lived, so they recycle the rows of fixed pools
+        self.bullets = EntityStore({'x': np.float64, 'prev_x': np.float64, 'y': np.float64, 'start_x': np.float64,
+                                    'start_y': np.float64, 'angle': np.float64},
+                                   BULLET_POOL_SIZE, fixed=True)
+        self.bullet_speed = BULLET_SPEED
+        self.bullet_trails = EntityStore({'start_x': np.float64, 'start_y': np.float64, 'end_x': np.float64,
+                                          'end_y': np.float64, 'time_left': np.float64},
+                                         TRAIL_POOL_SIZE, fixed=True)
+
+        # Power-up system using midpoint circle algorithm
+        self.powerups = EntityStore({'x': np.float64, 'y': np.float64, 'prev_x': np.float64, 'prev_y': np.float64,
+                                     'type': np.int8, 'radius': (np.float64, 15), 'rotation': np.float64,
+                                     'pulse': np.float64, 'move_timer': np.float64, 'move_speed': np.float64})
+        self.powerup_spawn_interval = 10  # Spawn every 10 seconds
+        self.powerup_types = POWERUP_TYPES
+        self.attract_powerups = False  # Flag for powerup attraction
+        # Pending timers of the attraction cooldown and the power-up effects
+        self.attract_timer = None
+        self.speed_timer = None
+        self.shield_timer = None
+
+        # Visual effects
+        self.particles = ParticleSystem(EFFECTS)
+        self._schedule_spawns()
+
+    def _schedule_spawns(self):
+        self.timers.schedule(self.zombie_spawn_interval, self._zombie_spawn_due)
+        self.timers.schedule(self.powerup_spawn_interval, self._powerup_spawn_due)
+
+    def _zombie_spawn_due(self):
+        self.spawn_zombie()
+        self.timers.schedule(self.zombie_spawn_interval, self._zombie_spawn_due)
+
+    def _powerup_spawn_due(self):
+        self.spawn_powerup()
+        self.timers.schedule(self.powerup_spawn_interval, self._powerup_spawn_due)
+
+    @property
+    def attract_cooldown(self):
+        """Seconds until power-ups can be attracted again"""
+        return self.timers.remaining(self.attract_timer)
+
+    @attract_cooldown.setter
+    def attract_cooldown(self, seconds):
+        self.timers.cancel(self.attract_timer)
+        self.attract_timer = self.timers.schedule(seconds, self._attract_ready) if seconds > 0 else None
+
+    def _attract_ready(self):
+        self.attract_timer = None
+        self.attract_powerups = False
+
+    def player_center(self):
+        return self.player_x + self.player_w * 0.75, self.player_y + self.player_h * 0.75
+
+    def player_effect(self, name):
+        """Start a player effect at the player's center, fitted to its size"""
+        self.particles.emit(name, *self.player_center(), scale=self.player_scale)
+
+    def spawn_zombie(self):
+        """Spawn a new zombie with random word and speed"""
+        word = self.random.choice(self.zombie_words)
+        speed = self.random.uniform(50, 150)
+        kind = self.random.choices(list(self.enemy_weights), weights=list(self.enemy_weights.values()))[0]
+        self.zombies.spawn(x=640, y=225, speed=speed, word=word, kind=kind, now=self.game_time)
+
+    def key_pressed(self, char):
+        """
+        Handle a key given as the character it types: space restarts after
+        the game ends and otherwise attracts power-ups if the ability is
+        ready; anything else is typed at the zombies
+        """
+        if self.score_system.game_won or self.score_system.game_over:
+            if char == " ":
+                self.reset()
+            return
+
+        # Attract powerups with spacebar if cooldown is ready
+        if char == " " and self.attract_timer is None:
+            self.attract_powerups = True
+            self.attract_cooldown = 5  # 5 second cooldown
+            # Add visual effect to show attraction is active
+            self.player_effect("attract")
+            return
+
+        self._handle_typing(char)
+
+    def _handle_typing(self, typed_letter):
+        """Handle typing mechanics"""
+        # Find new zombie to type if none active
+        if self.active_zombie is None:
+            self.active_zombie = self.zombies.target(typed_letter)
+
+        # Process typing for active zombie
+        if self.active_zombie is not None:
+            row = self.zombies.row(self.active_zombie)
+            if row is not None and self.zombies.process_typed_letter(row, typed_letter):
+                self._fire_bullet()
+                if not self.zombies['alive'][row]:
+                    if self.animation_manager:
+                        x, y, width, height = self.zombies.draw_rects([row])[0]
+                        self.animation_manager.create_explosion(x + width / 2, y + height / 2,
+                                                                self.game_time, scale=1.5)
+                    if self.score_system.increment_score():
+                        self.score_system.game_won = True
+                    self.active_zombie = None
+            else:
+                self.active_zombie = None
+
+    def _fire_bullet(self):
+        """Fire a bullet at the active zombie"""
+        start_x = self.player_x + self.player_w // 2
+        start_y = self.player_y + 50
+
+        # Get target zombie position for trajectory
+        row = self.zombies.row(self.active_zombie) if self.active_zombie is not None else None
+        if row is not None:
+            target_x = self.zombies['x'][row] + self.zombies['width'][row] // 2
+            target_y = self.zombies['y'][row] + self.zombies['height'][row] // 2
+        else:
+            # Default trajectory if no target
+            target_x = start_x + 100
+            target_y = start_y
+
+        # Calculate angle for visual effect
+        angle = math.atan2(target_y - start_y, target_x - start_x)
+
+        self.bullets.add(x=start_x, prev_x=start_x, y=start_y, start_x=start_x, start_y=start_y, angle=angle)
+        self.sounds.append('fire')
+
+    def update(self, dt):
+        """Advance the game by dt seconds"""
+        if self.score_system.game_won or self.score_system.game_over:
+            return True
+        self.game_time += dt
+
+        # Spawn, end cooldowns and wear off power-ups whose time has come
+        self.timers.advance(dt)
+
+        # Update zombies
+        player_right_edge = self.player_x + (self.player_w * 1.5)
+        is_any_zombie_close = self.zombies.update(dt, player_right_edge, -50, self.game_time)
+        self.zombie_grid.build(self.zombies.bounds())
+
+        # Advance every animation on the shared clock
+        if self.animator:
+            self.animator.update(self.game_time)
+            self.animation_manager.update(self.game_time)
+
+        # Update health system
+        if not self.health_system.update(dt, is_any_zombie_close, False):
+            self.score_system.set_game_over()
+            return True
+
+        # Update bullets
+        self._update_bullets(dt)
+
+        # Update powerups
+        self._update_powerups(dt)
+
+        # Update visual effects
+        self.particles.update(dt)
+
+        return True
+
+    def spawn_powerup(self):
+        """Spawn a powerup of random type in a random position on screen"""
+        x, y = self.random.randint(100, 540), self.random.randint(100, 380)
+        self.powerups.add(x=x, y=y, prev_x=x, prev_y=y, type=self.random.randrange(len(POWERUP_TYPES)),
+                          move_speed=self.random.uniform(30, 60))  # Random movement speed
+
+    def _update_powerups(self, dt):
+        """Move powerups toward the player in one pass and collect those that reach it"""
+        powerups = self.powerups
+        if not len(powerups):
+            return
+
+        powerups['prev_x'] = powerups['x']
+        powerups['prev_y'] = powerups['y']
+
+        # Animate powerups with rotation and pulsing
+        powerups['rotation'] = (powerups['rotation'] + 90 * dt) % 360
+        powerups['pulse'] = math.sin(self.game_time * 5) * 3
+
+        # Direction and distance to player, measured once per tick
+        player_center_x, player_center_y = self.player_center()
+        dx = player_center_x - powerups['x']
+        dy = player_center_y - powerups['y']
+        distance = np.hypot(dx, dy)
+
+        # Move powerups toward player
+        if self.attract_powerups:
+            # Fast attraction when space is pressed, with more frequent trails
+            moving = distance > 0
+            speed = powerups['move_speed'] * 3
+            trail_rate = 3
+        else:
+            # Normal gradual movement, starting after 2 seconds
+            powerups['move_timer'] += dt
+            moving = (powerups['move_timer'] > 2.0) & (distance > 0)
+            speed = powerups['move_speed']
+            trail_rate = 1
+        step = np.where(moving, speed * dt, 0.0)
+        scale = step / np.where(distance > 0, distance, 1.0)
+        powerups['x'] += dx * scale
+        powerups['y'] += dy * scale
+
+        # Moving powerups leave trails now and then
+        trails = np.flatnonzero(moving)
+        self.particles.emit_random("powerup_trail", powerups['x'][trails], powerups['y'][trails], dt,
+                                   self.np_random, trail_rate, color=POWERUP_COLORS[powerups['type'][trails]])
+
+        # Check for player collision; powerups move straight at the player, so
+        # the distance left follows from the step without measuring again
+        collected = np.flatnonzero(np.abs(distance - step) < powerups['radius'] + 30)  # Player collision radius
+        for powerup_type in powerups['type'][collected]:
+            self._apply_powerup(POWERUP_TYPES[powerup_type])
+        powerups.remove(collected)
+
+    def _apply_powerup(self, powerup_type):
+        """Apply powerup effects"""
+        if powerup_type == "health":
+            self.health_system.current_health = min(self.health_system.current_health + 30, self.health_system.max_health)
+            # Add healing visual effect
+            self.player_effect("healing")
+        elif powerup_type == "speed":
+            # Increase bullet speed temporarily, for 5 seconds; another pickup restarts the 5 seconds
+            self.bullet_speed = BULLET_SPEED * 1.5
+            self.timers.cancel(self.speed_timer)
+            self.speed_timer = self.timers.schedule(5, self._speed_boost_over)
+            # Add speed boost visual effect
+            self.player_effect("speed_boost")
+        elif powerup_type == "shield":
+            # Make player temporarily invulnerable, for 3 seconds
+            self.health_system.damage_rate = 0
+            self.timers.cancel(self.shield_timer)
+            self.shield_timer = self.timers.schedule(3, self._shield_over)
+            # Add shield visual effect
+            self.player_effect("shield")
+
+    def _speed_boost_over(self):
+        self.speed_timer = None
+        self.bullet_speed = BULLET_SPEED  # Reset bullet speed
+
+    def _shield_over(self):
+        self.shield_timer = None
+        self.health_system.damage_rate = 20  # Reset damage rate
+
+    def _update_bullets(self, dt):
+        """Move every bullet, leave a DDA trail segment behind each and resolve hits in one pass"""
+        bullets = self.bullets
+        if len(bullets):
+            bullets['prev_x'] = bullets['x']
+            prev_x = bullets['prev_x']
+            bullets['x'] += self.bullet_speed * dt
+
+            # Add bullet trails using DDA line algorithm; a trail lasts for 0.2 seconds
+            self.bullet_trails.extend(len(bullets), start_x=prev_x, start_y=bullets['y'], end_x=bullets['x'],
+                                      end_y=bullets['y'], time_left=0.2)
+
+            # Each bullet stops at the first zombie its path this tick runs into
+            path = np.column_stack((prev_x, bullets['y'], bullets['x'], bullets['y']))
+            hits, zombie_rows = self.zombie_grid.query(path)
+            if len(hits):
+                entry = np.maximum(self.zombie_grid.boxes[zombie_rows, 0], prev_x[hits])
+                order = np.lexsort((entry, hits))
+                hits, zombie_rows = hits[order], zombie_rows[order]
+                first = np.ones(len(hits), dtype=bool)
+                first[1:] = hits[1:] != hits[:-1]
+                hits, zombie_rows = hits[first], zombie_rows[first]
+                # Add hit visual effects using midpoint circle
+                x, y, width, height = self.zombies.draw_rects(zombie_rows).T
+                self.particles.emit("bullet_hit", x + width / 2, y + height / 2)
+            hit = np.zeros(len(bullets), dtype=bool)
+            hit[hits] = True
+            bullets.remove(hit | (bullets['x'] > 640))
+
+        # Update bullet trails
+        trails = self.bullet_trails
+        trails['time_left'] -= dt
+        trails.remove(trails['time_left'] <= 0)
+
+    def reset(self):
+        """Reset the game state"""
+        self.score_system.reset()
+        self.zombies.clear()
+        if self.animation_manager:
+            self.animation_manager.clear()
+        self.bullets.clear()
+        self.bullet_trails.clear()
+        self.powerups.clear()
+        self.particles.clear()
+        self.active_zombie = None
+        self.attract_powerups = False
+        self.timers.clear()
+        self.attract_timer = self.speed_timer = self.shield_timer = None
+        self._schedule_spawns()
+        self.health_system = HealthSystem(max_health=100, damage_rate=20)
+        self.bullet_speed = BULLET_SPEED  # Reset bullet speed
+
+def autoplay(game, letters_per_second):
+    """
+    Return a function that types at the game like a player typing
+    letters_per_second: each call with a tick's length types the letters
+    due by then, always the next one the oldest zombie needs
+    """
+    due = 0.0
+    def type_letters(dt):
+        nonlocal due
+        due += dt * letters_per_second
+        while due >= 1:
+            due -= 1
+            row = game.zombies.row(game.active_zombie) if game.active_zombie is not None else None
+            if row is None:
+                rows = game.zombies.spawn_order()
+                row = rows[0] if len(rows) else None
+            if row is not None and game.zombies['word'][row]:
+                game.key_pressed(game.zombies['word'][row][0])
+    return type_letters
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Simulate the game without a window")
+    parser.add_argument("--ticks", type=int, default=100000, help="simulation ticks to run")
+    parser.add_argument("--tick-rate", type=int, default=60, help="simulation ticks per game second")
+    parser.add_argument("--typing-speed", type=float, default=3.0, metavar="LETTERS",
+                        help="letters per second typed at the oldest zombie")
+    parser.add_argument("--seed", type=int, help="seed the random spawns")
+    parser.add_argument("--restart", action="store_true", help="start a new game whenever one ends")
+    args = parser.parse_args()
+
+    dt = 1 / args.tick_rate
+    game = Game(seed=args.seed)
+    type_letters = autoplay(game, args.typing_speed)
+    wins = losses = ticks = 0
+    start = time.perf_counter()
+    while ticks < args.ticks:
+        game.update(dt)
+        ticks += 1
+        type_letters(dt)
+        if game.score_system.game_won or game.score_system.game_over:
+            wins += game.score_system.game_won
+            losses += game.score_system.game_over
+            if not args.restart:
+                break
+            game.key_pressed(" ")
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks ({ticks * dt:.0f} game seconds) in {elapsed:.2f} s, {ticks / elapsed:.0f} ticks/s")
+    print(f"seed {game.seed}, score {game.score_system.score}, health {game.health_system.current_health:.0f}, "
+          f"{wins} won, {losses} lost, {len(game.zombies)} zombies on the field")
@@ -0,0 +1,59 @@
+from OpenGL.GL import GL_TRIANGLES, GL_QUADS, GL_LINES
+import numpy as np
+from raster_cache import OffsetCache
+from renderer import get_renderer, fan_to_triangles
+
+def _unit_circle(segments):
+    """Points around the unit circle, first point repeated at the end"""
+    angles = 2 * np.pi * np.arange(segments + 1) / segments
+    return np.column_stack((np.cos(angles), np.sin(angles)))
+
+# Unit-circle tessellations keyed by segment count
+unit_circle_cache = OffsetCache(_unit_circle, max_entries=16)
+
+def ellipse_fan(cx, cy, rx, ry, segments=64):
+    """Triangle-fan vertices of an ellipse: the center, then the scaled unit circle"""
+    ring = unit_circle_cache.get(segments) * (rx, ry) + (cx, cy)
+    return np.vstack(((cx, cy), ring))
+
+class StaticMesh:
+    """
+    Vertices of a shape that never changes, built once in local coordinates.
+    Drawing only offsets the cached array and queues it with a color.
+    """
+    def __init__(self, mode, vertices):
+        self.mode = mode
+        self.vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 2)
+        self.vertices.setflags(write=False)
+
+    def draw(self, x, y, color):
+        """Queue the mesh with its local origin at (x, y)"""
+        get_renderer().add_vertices(self.mode, self.vertices + np.float32((x, y)), color)
+
+_meshes = {}
+
+def get_mesh(key, build):
+    """Get the mesh cached under key, building it on first use"""
+    mesh = _meshes.get(key)
+    if mesh is None:
+        mesh = _meshes[key] = build()
+    return mesh
+
+def heart_mesh(size, segments=64):
+    """Heart icon of the given size: two round lobes above a triangle"""
+    quarter = size / 4
+    triangles = [
+        fan_to_triangles(ellipse_fan(quarter, quarter, quarter, quarter, segments)),
+        fan_to_triangles(ellipse_fan(size * 3 / 4, quarter, quarter, quarter, segments)),
+        np.array([[(size / 2, size), (0, quarter), (size, quarter)]], dtype=np.float32)
+    ]
+    return StaticMesh(GL_TRIANGLES, np.concatenate(triangles))
+
+def rect_mesh(width, height):
+    """Filled rectangle with its top-left corner at the origin"""
+    return StaticMesh(GL_QUADS, ((0, 0), (width, 0), (width, height), (0, height)))
+
+def rect_outline_mesh(width, height):
+    """Rectangle outline as four line segments"""
+    corners = np.array(((0, 0), (width, 0), (width, height), (0, height)), dtype=np.float32)
+    return StaticMesh(GL_LINES, np.column_stack((corners, np.roll(corners, -1, axis=0))))
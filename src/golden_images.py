@@ -0,0 +1,164 @@
+"""
+Golden-image harness for headless rendering.
+
+Renders scripted App states with the NumPy SoftwareRenderer and compares
+them with the reference PNGs in assets/golden. Textures are sampled
+bilinearly like the GL renderer's GL_LINEAR, so sprites match a GL frame;
+GL rasterizes the edges of lines and points a little differently, which
+still sets a GL frame of the powerups scene about 1.5% of pixels apart.
+Run from the project root:
+
+    python src/golden_images.py              # compare against the goldens
+    python src/golden_images.py --update     # rewrite the goldens
+    python src/golden_images.py --bench 20   # also time each scene
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import sys
+import time
+import numpy as np
+import pygame as pg
+from renderer import set_renderer
+from software_renderer import SoftwareRenderer, load_png
+from main import App
+from gameplay import POWERUP_TYPES
+
+GOLDEN_DIR = os.path.join("assets", "golden")
+FIXED_TICKS = 1000  # Pulses and rotations are frozen at this time
+
+def create_app():
+    """Build an App without a window, GL context or main loop"""
+    app = App.__new__(App)
+    app._ticks = lambda: FIXED_TICKS
+    app._load_textures()
+    app._initialize_game_systems()
+    return app
+
+def add_zombie(game, x, word, kind="zombie"):
+    """Place an enemy with a fixed word at x and return its handle"""
+    return game.zombies.spawn(x=x, y=225, speed=100, word=word, kind=kind)
+
+def scene_start(game):
+    """Fresh game, nothing spawned yet"""
+
+def scene_combat(game):
+    """A bat, a zombie being typed and an attacking boss, with bullets, trails, hit effects and a kill"""
+    add_zombie(game, 420, "ghost", kind="bat")
+    target = add_zombie(game, 540, "monster")
+    game.zombies.set_word(game.zombies.row(target), "nster")
+    game.active_zombie = target
+    add_zombie(game, 120, "horror", kind="boss")
+    game.zombies.update(0, game.player_x + game.player_w * 1.5, -50, now=0.0)  # The boss reached the player: attack cycle
+    game.animation_manager.create_explosion(470, 300, 0.0, scale=1.5)
+    game.animator.update(0.35)
+    for x in (200, 330):
+        game.bullets.add(x=x, prev_x=x, y=275, start_x=90, start_y=275, angle=0)
+        game.bullet_trails.add(start_x=x - 70, start_y=275, end_x=x, end_y=275, time_left=0.15)
+    game.particles.emit("bullet_hit", 600, 285)
+    game.health_system.current_health = 45
+    game.score_system.score = 4
+
+def scene_powerups(game):
+    """One powerup of each type with attraction, shield, healing and speed effects"""
+    for i in range(len(POWERUP_TYPES)):
+        game.powerups.add(x=250 + i * 120, y=150 + i * 60, type=i, radius=15, rotation=i * 30, pulse=1.5 * i,
+                         move_speed=40)
+        game.particles.emit("powerup_trail", 262 + i * 120, 156 + i * 60)
+    game.attract_powerups = True
+    game.attract_cooldown = 3.5
+    for name in ("attract", "shield", "healing", "speed_boost"):
+        game.player_effect(name)
+    game.health_system.current_health = 15
+
+def scene_win(game):
+    """Win screen"""
+    game.score_system.score = 10
+    game.score_system.game_won = True
+
+def scene_game_over(game):
+    """Game over screen"""
+    game.score_system.score = 3
+    game.score_system.game_over = True
+
+SCENES = {
+    "start": scene_start,
+    "combat": scene_combat,
+    "powerups": scene_powerups,
+    "win": scene_win,
+    "game_over": scene_game_over,
+}
+
+def render_scene(name, renderer):
+    """Render one scripted scene and return its App"""
+    app = create_app()
+    SCENES[name](app.game)
+    renderer.clear()
+    app.draw()
+    return app
+
+def compare(actual, golden, tolerance=8, max_fraction=0.001):
+    """
+    Compare two RGBA images. Pixels whose channels differ by more than
+    tolerance count as mismatched; returns (passed, mismatched_fraction).
+    """
+    if actual.shape != golden.shape:
+        return False, 1.0
+    difference = np.abs(actual.astype(np.int16) - golden.astype(np.int16)).max(axis=2)
+    mismatched = float((difference > tolerance).mean())
+    return mismatched <= max_fraction, mismatched
+
+def main():
+    parser = argparse.ArgumentParser(description="Render scripted game states and compare them to golden images")
+    parser.add_argument("scenes", nargs="*", default=list(SCENES), help="scenes to render (default: all)")
+    parser.add_argument("--update", action="store_true", help="overwrite the golden images")
+    parser.add_argument("--output", help="directory to write the rendered images to")
+    parser.add_argument("--bench", type=int, default=0, metavar="FRAMES",
+                        help="time FRAMES draws of each scene")
+    args = parser.parse_args()
+
+    pg.init()
+    pg.display.set_mode((1, 1))  # Surfaces need a video mode for convert_alpha
+    renderer = SoftwareRenderer(640, 480)
+    set_renderer(renderer)
+
+    failures = 0
+    for name in args.scenes:
+        app = render_scene(name, renderer)
+        image = renderer.to_rgba8()
+        golden_path = os.path.join(GOLDEN_DIR, f"{name}.png")
+
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            renderer.save_png(os.path.join(args.output, f"{name}.png"))
+
+        if args.update:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            renderer.save_png(golden_path)
+            status = "updated"
+        elif not os.path.exists(golden_path):
+            status = "MISSING"
+            failures += 1
+        else:
+            passed, mismatched = compare(image, load_png(golden_path))
+            status = f"{'ok' if passed else 'FAIL'} ({mismatched:.4%} pixels differ)"
+            failures += not passed
+
+        if args.bench:
+            start = time.perf_counter()
+            for _ in range(args.bench):
+                renderer.clear()
+                app.draw()
+            elapsed = (time.perf_counter() - start) / args.bench
+            stats = renderer.last_frame
+            status += f", {elapsed * 1000:.2f} ms/frame, {stats['vertices']} vertices, {stats['draw_calls']} draws"
+
+        print(f"{name}: {status}")
+
+    pg.quit()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,48 @@
-from OpenGL.GL import *
+import numpy as np
 import math
+from raster_cache import OffsetCache
+from renderer import get_renderer, expand_colors
+from transforms import sin_cos
 
 def dda_line(x1, y1, x2, y2, color=(1, 1, 0)):
     """
     Draw a line using the Digital Differential Analyzer (DDA) algorithm.
     This is more efficient than the built-in OpenGL line drawing.
+    Use draw_lines to pick Bresenham or Wu instead.
     """
-    dx = x2 - x1
-    dy = y2 - y1
-    
-    # Calculate steps based on the larger distance
-    steps = max(abs(dx), abs(dy))
-    
-    # Calculate increment in x and y for each step
-    x_increment = dx / steps
-    y_increment = dy / steps
-    
-    # Set initial points
-    x = x1
-    y = y1
-    
-    # Begin drawing points
-    # Handle both RGB and RGBA color formats
-    if len(color) == 4:  # RGBA
-        glColor4f(*color)
-    else:  # RGB
-        glColor3f(*color)
-    glBegin(GL_POINTS)
-    
-    # Draw each point in the line
-    for i in range(int(steps) + 1):
-        glVertex2f(round(x), round(y))  # Round to nearest pixel
-        x += x_increment
-        y += y_increment
-    
-    glEnd()
-    glColor3f(1, 1, 1)  # Reset color
+    points, _ = dda_line_batch([(x1, y1, x2, y2)])
+    draw_points(points, color)
 
 def midpoint_circle(center_x, center_y, radius, color=(1, 0, 0)):
     """
     Draw a circle using the Midpoint Circle algorithm.
     More efficient than using trigonometric functions for each point.
+    The octant offsets for each whole-pixel radius come from
+    circle_offset_cache, so a repeated radius costs a single array add.
+    """
+    offsets = circle_offset_cache.get(max(int(round(radius)), 0))
+    draw_points(offsets + np.float32((center_x, center_y)), color)
+
+def midpoint_ellipse(center_x, center_y, a, b, color=(0, 1, 0)):
+    """
+    Draw an ellipse using the Midpoint Ellipse algorithm.
+    a: semi-major axis (horizontal radius)
+    b: semi-minor axis (vertical radius)
+    Quadrant offsets are cached per (a, b) in ellipse_offset_cache.
+    """
+    axes = (max(int(round(a)), 0), max(int(round(b)), 0))
+    offsets = ellipse_offset_cache.get(axes)
+    draw_points(offsets + np.float32((center_x, center_y)), color)
+
+def _circle_offsets(radius):
+    """
+    Run the midpoint circle decision loop once for an integer radius and
+    return the (x, y) offsets of all eight octants as an (M, 2) array.
     """
     x = 0
     y = radius
-    p = 1 - radius  # Initial decision parameter
-    
-    # Handle both RGB and RGBA color formats
-    if len(color) == 4:  # RGBA
-        glColor4f(*color)
-    else:  # RGB
-        glColor3f(*color)
-    glBegin(GL_POINTS)
-    
-    # Plot initial points in all octants
-    plot_circle_points(center_x, center_y, x, y)
-    
-    # Calculate points for one octant and reflect to others
+    p = 1 - radius
+    octant = [(x, y)]
     while x < y:
         x += 1
         if p < 0:
@@ -64,87 +50,246 @@ def midpoint_circle(center_x, center_y, radius, color=(1, 0, 0)):
         else:
             y -= 1
             p += 2 * (x - y) + 1
-        
-        plot_circle_points(center_x, center_y, x, y)
-    
-    glEnd()
-    glColor3f(1, 1, 1)  # Reset color
+        octant.append((x, y))
 
-def plot_circle_points(center_x, center_y, x, y):
-    """
-    Plot points in all octants of a circle.
-    """
-    glVertex2f(center_x + x, center_y + y)
-    glVertex2f(center_x - x, center_y + y)
-    glVertex2f(center_x + x, center_y - y)
-    glVertex2f(center_x - x, center_y - y)
-    glVertex2f(center_x + y, center_y + x)
-    glVertex2f(center_x - y, center_y + x)
-    glVertex2f(center_x + y, center_y - x)
-    glVertex2f(center_x - y, center_y - x)
+    ox, oy = np.array(octant, dtype=np.float32).T
+    xs = np.concatenate((ox, -ox, ox, -ox, oy, -oy, oy, -oy))
+    ys = np.concatenate((oy, oy, -oy, -oy, ox, ox, -ox, -ox))
+    return np.column_stack((xs, ys))
 
-def midpoint_ellipse(center_x, center_y, a, b, color=(0, 1, 0)):
+def _ellipse_offsets(a, b):
     """
-    Draw an ellipse using the Midpoint Ellipse algorithm.
-    a: semi-major axis (horizontal radius)
-    b: semi-minor axis (vertical radius)
+    Run the midpoint ellipse decision loops once for integer semi-axes and
+    return the (x, y) offsets of all four quadrants as an (M, 2) array.
     """
-    # Handle both RGB and RGBA color formats
-    if len(color) == 4:  # RGBA
-        glColor4f(*color)
-    else:  # RGB
-        glColor3f(*color)
-    glBegin(GL_POINTS)
-    
+    quadrant = []
+
     # Region 1
     x = 0
     y = b
     d1 = b*b - a*a*b + 0.25*a*a
     dx = 2*b*b*x
     dy = 2*a*a*y
-    
     while dx < dy:
-        plot_ellipse_points(center_x, center_y, x, y)
-        
+        quadrant.append((x, y))
+        x += 1
+        dx += 2*b*b
         if d1 < 0:
-            x += 1
-            dx += 2*b*b
             d1 += dx + b*b
         else:
-            x += 1
             y -= 1
-            dx += 2*b*b
             dy -= 2*a*a
             d1 += dx - dy + b*b
-    
+
     # Region 2
     d2 = (b*b*(x+0.5)*(x+0.5) + a*a*(y-1)*(y-1) - a*a*b*b)
-    
     while y >= 0:
-        plot_ellipse_points(center_x, center_y, x, y)
-        
+        quadrant.append((x, y))
+        y -= 1
+        dy -= 2*a*a
         if d2 > 0:
-            y -= 1
-            dy -= 2*a*a
             d2 += a*a - dy
         else:
-            y -= 1
             x += 1
             dx += 2*b*b
-            dy -= 2*a*a
             d2 += dx - dy + a*a
-    
-    glEnd()
-    glColor3f(1, 1, 1)  # Reset color
 
-def plot_ellipse_points(center_x, center_y, x, y):
+    qx, qy = np.array(quadrant, dtype=np.float32).reshape(-1, 2).T
+    xs = np.concatenate((qx, -qx, qx, -qx))
+    ys = np.concatenate((qy, qy, -qy, -qy))
+    return np.column_stack((xs, ys))
+
+# Offset tables keyed by integer radius and by (a, b) semi-axes
+circle_offset_cache = OffsetCache(_circle_offsets, max_entries=128)
+ellipse_offset_cache = OffsetCache(lambda axes: _ellipse_offsets(*axes), max_entries=32)
+
+def _translate_tables(tables, centers):
+    """
+    Concatenate one offset table per primitive and move each to its center.
+    Returns (points, counts) in the format shared by the *_batch rasterizers.
+    """
+    counts = np.array([len(table) for table in tables], dtype=np.int64)
+    if not len(tables):
+        return np.empty((0, 2), dtype=np.float32), counts
+    points = np.concatenate(tables)
+    points += np.repeat(centers, counts, axis=0).astype(np.float32)
+    return points, counts
+
+def _line_steps(counts):
     """
-    Plot points in all quadrants of an ellipse.
+    For lines producing counts[i] points each, get the index of the owning
+    line and the step number along that line for every output point.
     """
-    glVertex2f(center_x + x, center_y + y)
-    glVertex2f(center_x - x, center_y + y)
-    glVertex2f(center_x + x, center_y - y)
-    glVertex2f(center_x - x, center_y - y)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    first = np.cumsum(counts) - counts
+    step = np.arange(counts.sum()) - first[owner]
+    return owner, step
+
+def dda_line_batch(lines):
+    """
+    Rasterize N lines at once with the DDA algorithm.
+    lines: array-like of shape (N, 4) holding x1, y1, x2, y2 per line.
+    Returns (points, counts): an (M, 2) float32 array of pixel positions and
+    the number of points each line produced, in input order.
+    """
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    x1, y1, x2, y2 = lines.T
+    dx = x2 - x1
+    dy = y2 - y1
+
+    # Same step count as dda_line; zero-length lines still plot one pixel
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    counts = steps.astype(np.int64) + 1
+    safe_steps = np.where(steps > 0, steps, 1)
+    owner, step = _line_steps(counts)
+
+    xs = x1[owner] + step * (dx / safe_steps)[owner]
+    ys = y1[owner] + step * (dy / safe_steps)[owner]
+    points = np.round(np.column_stack((xs, ys))).astype(np.float32)
+    return points, counts
+
+def bresenham_line_batch(lines):
+    """
+    Rasterize N lines at once with Bresenham's algorithm.
+    Endpoints are rounded to whole pixels and all arithmetic is integer.
+    The minor-axis offset at each step is computed in closed form, which
+    yields exactly the pixels of the incremental error-term loop.
+    Returns (points, counts) like dda_line_batch.
+    """
+    ends = np.rint(np.asarray(lines, dtype=np.float64).reshape(-1, 4)).astype(np.int64)
+    x1, y1, x2, y2 = ends.T
+    dx = x2 - x1
+    dy = y2 - y1
+    sx = np.where(dx >= 0, 1, -1)
+    sy = np.where(dy >= 0, 1, -1)
+    major = np.maximum(np.abs(dx), np.abs(dy))
+    minor = np.minimum(np.abs(dx), np.abs(dy))
+    counts = major + 1
+    owner, step = _line_steps(counts)
+
+    major_owner = np.maximum(major, 1)[owner]
+    offset = (2 * step * minor[owner] + major_owner) // (2 * major_owner)
+    x_major = (np.abs(dx) >= np.abs(dy))[owner]
+    xs = x1[owner] + sx[owner] * np.where(x_major, step, offset)
+    ys = y1[owner] + sy[owner] * np.where(x_major, offset, step)
+    return np.column_stack((xs, ys)).astype(np.float32), counts
+
+def wu_line_batch(lines):
+    """
+    Rasterize N anti-aliased lines at once with Xiaolin Wu's algorithm.
+    Every step along the major axis plots the two pixels straddling the
+    ideal line, weighted by how much of each the line covers. Endpoints
+    are snapped to the nearest major-axis pixel rather than faded.
+    Returns (points, counts, coverage) where coverage is the alpha of each
+    point in [0, 1].
+    """
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    x1, y1, x2, y2 = lines.T
+    steep = np.abs(y2 - y1) > np.abs(x2 - x1)
+
+    # Walk along the major axis a, interpolating the minor axis b
+    a1 = np.where(steep, y1, x1)
+    b1 = np.where(steep, x1, y1)
+    a2 = np.where(steep, y2, x2)
+    b2 = np.where(steep, x2, y2)
+    start = np.rint(a1)
+    steps = np.abs(np.rint(a2) - start).astype(np.int64)
+    direction = np.where(a2 >= a1, 1, -1)
+    length = np.abs(a2 - a1)
+    gradient = np.where(length > 0, (b2 - b1) / np.where(length > 0, length, 1), 0)
+    owner, step = _line_steps(steps + 1)
+
+    a = start[owner] + direction[owner] * step
+    b = b1[owner] + gradient[owner] * (a - a1[owner]) * direction[owner]
+    base = np.floor(b)
+    fraction = b - base
+
+    # Two pixels per step, kept next to each other so lines stay contiguous
+    near_b = np.column_stack((base, base + 1)).reshape(-1)
+    a = np.repeat(a, 2)
+    steep_point = np.repeat(steep[owner], 2)
+    xs = np.where(steep_point, near_b, a)
+    ys = np.where(steep_point, a, near_b)
+    coverage = np.column_stack((1 - fraction, fraction)).reshape(-1)
+    points = np.column_stack((xs, ys)).astype(np.float32)
+    return points, (steps + 1) * 2, coverage.astype(np.float32)
+
+# Line rasterizers selectable by name, globally or per call
+LINE_ALGORITHMS = {
+    'dda': dda_line_batch,
+    'bresenham': bresenham_line_batch,
+    'wu': wu_line_batch
+}
+_line_algorithm = 'dda'
+
+def set_line_algorithm(name):
+    """Select the line algorithm used when a call does not name one"""
+    global _line_algorithm
+    if name not in LINE_ALGORITHMS:
+        raise ValueError(f"Unknown line algorithm '{name}', expected one of {sorted(LINE_ALGORITHMS)}")
+    _line_algorithm = name
+
+def get_line_algorithm():
+    """Get the name of the default line algorithm"""
+    return _line_algorithm
+
+def rasterize_lines(lines, algorithm=None):
+    """
+    Rasterize N lines with the named algorithm, or the default one.
+    Returns (points, counts, coverage); coverage is None unless the
+    algorithm anti-aliases.
+    """
+    result = LINE_ALGORITHMS[algorithm or _line_algorithm](lines)
+    if len(result) == 2:
+        return result[0], result[1], None
+    return result
+
+def midpoint_circle_batch(circles, step=1):
+    """
+    Rasterize N circles at once with the Midpoint Circle algorithm.
+    circles: array-like of shape (N, 3) holding center_x, center_y, radius.
+    Radii are rounded to whole pixels and looked up in circle_offset_cache,
+    so only unseen radii run the decision loop.
+    step: keep every step-th point of each outline, for dotted, cheaper circles
+    Returns (points, counts) like dda_line_batch.
+    """
+    circles = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+    radii = np.maximum(np.rint(circles[:, 2]), 0).astype(np.int64)
+    tables = {radius: circle_offset_cache.get(radius)[::step] for radius in np.unique(radii).tolist()}
+    return _translate_tables([tables[radius] for radius in radii.tolist()], circles[:, :2])
+
+def midpoint_ellipse_batch(ellipses, step=1):
+    """
+    Rasterize N ellipses at once with the Midpoint Ellipse algorithm.
+    ellipses: array-like of shape (N, 4) holding center_x, center_y, a, b.
+    step: keep every step-th point of each outline, like midpoint_circle_batch
+    Returns (points, counts) like dda_line_batch.
+    """
+    ellipses = np.asarray(ellipses, dtype=np.float64).reshape(-1, 4)
+    axes = [tuple(pair) for pair in np.maximum(np.rint(ellipses[:, 2:]), 0).astype(np.int64).tolist()]
+    tables = {pair: ellipse_offset_cache.get(pair)[::step] for pair in set(axes)}
+    return _translate_tables([tables[pair] for pair in axes], ellipses[:, :2])
+
+def draw_points(points, colors, counts=None, coverage=None):
+    """
+    Queue a whole point array on the active renderer as one GL_POINTS batch.
+    colors: one RGB/RGBA color, one per point, or one per primitive when the
+    counts returned by a *_batch rasterizer are passed along.
+    coverage: optional per-point alpha factor from an anti-aliasing rasterizer.
+    """
+    if coverage is not None:
+        colors = np.array(expand_colors(colors, len(points), counts))
+        colors[:, 3] *= coverage
+        counts = None
+    get_renderer().add_points(points, colors, counts)
+
+def draw_lines(lines, colors, algorithm=None):
+    """
+    Rasterize N lines with the named or default line algorithm and queue
+    them as one batch. colors: one color, or one per line.
+    """
+    points, counts, coverage = rasterize_lines(lines, algorithm)
+    draw_points(points, colors, counts, coverage)
 
 def translate_point(x, y, tx, ty):
     """
@@ -155,17 +300,18 @@ def translate_point(x, y, tx, ty):
 def rotate_point(x, y, center_x, center_y, angle_degrees):
     """
     Rotate a point around a center by the given angle in degrees.
+    Integer angles use the trig tables in transforms; use
+    transforms.rotation_matrices to rotate many points at once.
     """
-    # Convert angle to radians
-    angle_radians = math.radians(angle_degrees)
+    sin, cos = sin_cos(angle_degrees)
     
     # Translate point to origin
     x_translated = x - center_x
     y_translated = y - center_y
     
     # Rotate point
-    x_rotated = x_translated * math.cos(angle_radians) - y_translated * math.sin(angle_radians)
-    y_rotated = x_translated * math.sin(angle_radians) + y_translated * math.cos(angle_radians)
+    x_rotated = x_translated * cos - y_translated * sin
+    y_rotated = x_translated * sin + y_translated * cos
     
     # Translate back
     return x_rotated + center_x, y_rotated + center_y
@@ -257,4 +403,59 @@ def clip_line(x1, y1, x2, y2, xmin, ymin, xmax, ymax):
     if accept:
         return x1, y1, x2, y2
     else:
-        return None  # Line completely outside
\ No newline at end of file
+        return None  # Line completely outside
+
+def clip_lines_batch(lines, xmin, ymin, xmax, ymax):
+    """
+    Cohen-Sutherland line clipping for N segments in one array pass.
+    lines: array-like of shape (N, 4) holding x1, y1, x2, y2 per line.
+    Returns (clipped, accepted): the (N, 4) clipped segments and a boolean
+    mask of the segments with a visible part. Rejected rows are not clipped.
+    """
+    # Same region codes as clip_line
+    INSIDE, LEFT, RIGHT, BOTTOM, TOP = 0, 1, 2, 4, 8
+
+    def compute_codes(x, y):
+        horizontal = np.where(x < xmin, LEFT, np.where(x > xmax, RIGHT, INSIDE))
+        vertical = np.where(y < ymin, BOTTOM, np.where(y > ymax, TOP, INSIDE))
+        return horizontal | vertical
+
+    clipped = np.array(lines, dtype=np.float64).reshape(-1, 4)
+    x1, y1, x2, y2 = clipped.T  # Views, so clipping writes into clipped
+    code1 = compute_codes(x1, y1)
+    code2 = compute_codes(x2, y2)
+    accepted = np.zeros(len(clipped), dtype=bool)
+    active = np.ones(len(clipped), dtype=bool)
+
+    # Every pass moves one outside endpoint of each undecided line onto a
+    # clip edge, so this settles after a handful of passes
+    while True:
+        inside = active & (code1 == 0) & (code2 == 0)
+        accepted |= inside
+        active &= ~inside
+        active &= (code1 & code2) == 0  # Trivially reject
+        if not active.any():
+            break
+
+        code_out = np.where(code1 != 0, code1, code2)
+        dx = x2 - x1
+        dy = y2 - y1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.select(
+                [code_out & TOP != 0, code_out & BOTTOM != 0, code_out & RIGHT != 0],
+                [x1 + dx * (ymax - y1) / dy, x1 + dx * (ymin - y1) / dy, np.full_like(x1, xmax)],
+                np.full_like(x1, xmin))
+            y = np.select(
+                [code_out & TOP != 0, code_out & BOTTOM != 0, code_out & RIGHT != 0],
+                [np.full_like(y1, ymax), np.full_like(y1, ymin), y1 + dy * (xmax - x1) / dx],
+                y1 + dy * (xmin - x1) / dx)
+
+        # Replace the outside endpoint with the intersection point
+        first = active & (code1 != 0)
+        second = active & (code1 == 0)
+        x1[first], y1[first] = x[first], y[first]
+        x2[second], y2[second] = x[second], y[second]
+        code1[first] = compute_codes(x1[first], y1[first])
+        code2[second] = compute_codes(x2[second], y2[second])
+
+    return clipped, accepted
@@ -1,7 +1,3 @@
-from OpenGL.GL import *
-from draw_utils import draw_rectangle, draw_circle, draw_ellipse
-import math
-
 class HealthSystem:
     def __init__(self, max_health=100, damage_rate=20):
         self.max_health = max_health
@@ -9,7 +5,7 @@ class HealthSystem:
         self.damage_rate = damage_rate
         self.regen_rate = 5
         
-        # Health bar visual properties
+        # Where the HUD draws the health bar and heart
         self.health_bar_width = 210
         self.health_bar_height = 20
         self.health_bar_x = 50
@@ -30,59 +26,13 @@ class HealthSystem:
         else:
             return (0.8, 0.2, 0.2)  # Red
 
-    def draw_simple_health_bar(self):
-        """Draw a simple rectangular health bar with a border"""
-        # Draw background (gray)
-        draw_rectangle(
-            self.health_bar_x,
-            self.health_bar_y,
-            self.health_bar_width,
-            self.health_bar_height,
-            color=(0.3, 0.3, 0.3)
-        )
-        # Draw current health
+    def get_display_key(self):
+        """
+        What the health display currently shows: the bar width in whole
+        pixels and its color. Changes only when the drawn HUD would change.
+        """
         health_width = (self.current_health / self.max_health) * self.health_bar_width
-        if health_width > 0:
-            draw_rectangle(
-                self.health_bar_x,
-                self.health_bar_y,
-                health_width,
-                self.health_bar_height,
-                color=self.get_health_color()
-            )
-        # Draw border
-        draw_rectangle(
-            self.health_bar_x,
-            self.health_bar_y,
-            self.health_bar_width,
-            self.health_bar_height,
-            color=(1, 1, 1),
-            filled=False
-        )
-
-    def draw_heart(self, x, y, size, color):
-        """Draw a heart shape"""
-        # Left side of heart
-        draw_ellipse(x + size/4, y + size/4, size/4, size/4, color)
-        # Right side of heart
-        draw_ellipse(x + size*3/4, y + size/4, size/4, size/4, color)
-        # Bottom triangle
-        glColor3f(*color)
-        glBegin(GL_TRIANGLES)
-        glVertex2f(x + size/2, y + size)
-        glVertex2f(x, y + size/4)
-        glVertex2f(x + size, y + size/4)
-        glEnd()
-
-    def draw(self):
-        """Draw the health bar and heart icon"""
-        # Draw heart icon
-        heart_color = self.get_health_color() if self.current_health > 0 else (0.5, 0.5, 0.5)
-        self.draw_heart(self.heart_x, self.heart_y, self.heart_size, heart_color)
-        # Draw health bar
-        self.draw_simple_health_bar()
-        # Reset color
-        glColor3f(1, 1, 1)
+        return round(health_width), self.current_health > 0, self.get_health_color()
 
     def update(self, dt, is_zombie_close, is_word_complete):
         """Update health based on game conditions. Returns True if player is still alive, False if dead."""
@@ -0,0 +1,82 @@
+from texture import draw_rectangle
+from draw_utils import draw_rectangle as draw_bar
+from text_manager import draw_text, measure_text
+from geometry_cache import get_mesh, heart_mesh, rect_mesh, rect_outline_mesh
+from renderer import get_renderer
+from layers import RenderLayer
+
+# Drawing of the health, score and end screens, kept apart from the
+# HealthSystem and ScoreSystem state so the game core needs no display
+
+def draw_health(health):
+    """Draw a HealthSystem's heart icon and health bar"""
+    heart_color = health.get_health_color() if health.current_health > 0 else (0.5, 0.5, 0.5)
+    draw_heart(health.heart_x, health.heart_y, health.heart_size, heart_color)
+    draw_health_bar(health)
+
+def draw_heart(x, y, size, color):
+    """Draw a heart shape from a mesh cached per size"""
+    get_mesh(('heart', size), lambda: heart_mesh(size)).draw(x, y, color)
+
+def draw_health_bar(health):
+    """Draw a simple rectangular health bar with a border"""
+    size = (health.health_bar_width, health.health_bar_height)
+    # Draw background (gray)
+    get_mesh(('health_bar',) + size, lambda: rect_mesh(*size)).draw(
+        health.health_bar_x, health.health_bar_y, (0.3, 0.3, 0.3))
+    # Draw current health
+    health_width = (health.current_health / health.max_health) * health.health_bar_width
+    if health_width > 0:
+        draw_bar(
+            health.health_bar_x,
+            health.health_bar_y,
+            health_width,
+            health.health_bar_height,
+            color=health.get_health_color()
+        )
+    # Draw border
+    get_mesh(('health_bar_border',) + size, lambda: rect_outline_mesh(*size)).draw(
+        health.health_bar_x, health.health_bar_y, (1, 1, 1))
+
+def draw_score(score_system):
+    """Draw the score in the top right corner"""
+    score_text = f"Score: {score_system.score}/{score_system.target_score}"
+    score_w, score_h = measure_text(score_text)
+    draw_text(score_text, 640 - score_w - 20, 20)
+
+class EndScreens:
+    """The win and game over screens"""
+    def __init__(self):
+        # The end screens only change with the final score, so keep them in a layer
+        self.layer = RenderLayer(0, 0, 640, 480)
+
+    def draw_win(self, score):
+        """Draw the win screen for a final score"""
+        get_renderer().clear()
+        self.layer.draw(('win', score), lambda: self._draw_content("YOU WIN!", score))
+        get_renderer().present()
+
+    def draw_game_over(self, score):
+        """Draw the game over screen for a final score"""
+        get_renderer().clear()
+        self.layer.draw(('game_over', score), lambda: self._draw_content("GAME OVER!", score))
+        get_renderer().present()
+
+    def _draw_content(self, title, score):
+        """Draw an end screen's contents into the layer"""
+        # Draw semi-transparent black background
+        draw_rectangle(0, 0, 640, 480, color=(0, 0, 0), alpha=0.7)
+
+        # Draw the message
+        title_w, title_h = measure_text(title, font_size=48)  # Larger text
+        draw_text(title, 320 - title_w//2, 240 - title_h//2, font_size=48)
+
+        # Draw final score
+        final_score_text = f"Final Score: {score}"
+        score_w, score_h = measure_text(final_score_text)
+        draw_text(final_score_text, 320 - score_w//2, 240 + title_h//2 + 20)
+
+        # Draw restart instruction
+        restart_text = "Press SPACE to restart"
+        restart_w, restart_h = measure_text(restart_text)
+        draw_text(restart_text, 320 - restart_w//2, 240 + title_h//2 + 60)
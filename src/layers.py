@@ -0,0 +1,44 @@
+from renderer import get_renderer
+
+class RenderLayer:
+    """
+    A part of the screen that is drawn into an offscreen render target and
+    composited with a single textured quad every frame. The content is only
+    redrawn when the key passed to draw() changes, so static or slowly
+    changing parts of the frame cost one quad instead of their full draw.
+    """
+    def __init__(self, x=0, y=0, width=640, height=480, clear_color=(0, 0, 0, 0)):
+        self.rect = (x, y, width, height)
+        self.clear_color = clear_color
+        self.target = None
+        self.key = None
+        self.valid = False
+        self.redraws = 0
+
+    def invalidate(self):
+        """Force the content to be redrawn on the next draw()"""
+        self.valid = False
+
+    def draw(self, key, draw_content):
+        """
+        Composite the layer, first calling draw_content to render it into the
+        target if key differs from the key of the last render
+        """
+        renderer = get_renderer()
+        if self.target is None:
+            self.target = renderer.create_target(*self.rect)
+            self.valid = False
+        if not self.valid or key != self.key:
+            renderer.begin_target(self.target, self.clear_color)
+            draw_content()
+            renderer.end_target()
+            self.key = key
+            self.valid = True
+            self.redraws += 1
+        renderer.add_target(self.target)
+
+    def release(self):
+        """Free the render target"""
+        if self.target is not None:
+            get_renderer().release_target(self.target)
+            self.target = None
@@ -0,0 +1,50 @@
+"""
+Throughput benchmark for the line algorithms in graphics_algorithms.
+
+Rasterizes batches of random lines of several lengths with every
+registered algorithm and reports lines and pixels per second. Run it on
+the target machine to pick the fastest algorithm that still looks fine:
+
+    python src/line_benchmark.py
+    python src/line_benchmark.py --lines 500 --lengths 8 64 640
+"""
+import argparse
+import time
+import numpy as np
+from graphics_algorithms import LINE_ALGORITHMS, rasterize_lines
+
+def random_lines(count, length, rng):
+    """Lines of the given length at random positions and angles"""
+    angles = rng.uniform(0, 2 * np.pi, count)
+    x1 = rng.uniform(0, 640, count)
+    y1 = rng.uniform(0, 480, count)
+    return np.column_stack((x1, y1, x1 + np.cos(angles) * length, y1 + np.sin(angles) * length))
+
+def benchmark(algorithm, lines, repeats):
+    """Best time of several runs, plus the number of points produced"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        points, _, _ = rasterize_lines(lines, algorithm)
+        best = min(best, time.perf_counter() - start)
+    return best, len(points)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare line algorithm throughput across segment lengths")
+    parser.add_argument("--lines", type=int, default=200, help="lines per batch")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[4, 16, 64, 256, 640],
+                        help="segment lengths in pixels")
+    parser.add_argument("--repeats", type=int, default=20, help="runs per measurement, the best is kept")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'algorithm':<10} {'length':>6} {'ms/batch':>9} {'klines/s':>9} {'Mpixels/s':>10}")
+    for length in args.lengths:
+        lines = random_lines(args.lines, length, rng)
+        for algorithm in LINE_ALGORITHMS:
+            elapsed, pixels = benchmark(algorithm, lines, args.repeats)
+            print(f"{algorithm:<10} {length:>6} {elapsed * 1000:>9.3f} "
+                  f"{args.lines / elapsed / 1000:>9.1f} {pixels / elapsed / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,72 @@
+from startup_profiler import profiler
 import pygame as pg
-from OpenGL.GL import *
-from texture import load_texture, draw_texture, draw_rectangle
-from text_manager import render_text
-from health_system import HealthSystem
-from zombie import Zombie
-from score_system import ScoreSystem
-from graphics_algorithms import dda_line, midpoint_circle, midpoint_ellipse, clip_line, rotate_point, translate_point, scale_point
+from OpenGL.GL import (glEnable, glBlendFunc, glMatrixMode, glLoadIdentity, glOrtho, glClearColor,
+                       GL_BLEND, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_PROJECTION, GL_MODELVIEW)
+from texture import draw_sprite, draw_rectangle
+from sprite_atlas import SpriteAtlas
+from asset_cache import texture_cache
+from asset_bundle import AssetBundle, BUNDLE_PATH, CORE_SPRITES
+from text_manager import draw_text
+from hud import draw_health, draw_score, EndScreens
+from gameplay import Game, POWERUP_COLORS
+from replay import InputRecorder, InputLog, frame_time_report
+from fixed_timestep import FixedTimestep
+from quality_governor import QualityGovernor, QUALITY_LEVELS
+from graphics_algorithms import rasterize_lines, midpoint_circle_batch, midpoint_ellipse_batch, draw_points
+from culling import ViewportCuller
+from transforms import rotation_matrices, apply_transform
 from audio_manager import AudioManager
-import random
-import math
+from renderer import get_renderer
+from layers import RenderLayer
+from animation import Animator, FrameSetCache
+import numpy as np
+import logging
+import os
+
+profiler.record("import", 0.0)
+
+log = logging.getLogger(__name__)
+
+TRAIL_COLOR = (1.0, 1.0, 0.0)  # Yellow bullet trails
 
 class App:
-    def __init__(self):
-        pg.init()
-        pg.display.set_mode((640, 480), pg.OPENGL | pg.DOUBLEBUF)
-        self.clock = pg.time.Clock()
-        self._setup_opengl()
-        self._load_textures()
-        self._initialize_game_systems()
-        self.mainLoop()
+    def __init__(self, startup_profile=None, tick_rate=60, max_catchup_steps=5, seed=None, record=None,
+                 replay=None, frame_budget=1 / 60, quality=0):
+        """
+        startup_profile: path to write the startup timeline to as JSON
+        tick_rate: simulation ticks per second, independent of the frame rate
+        max_catchup_steps: most ticks simulated in one frame after a hitch
+        seed: seeds the game's random spawns and effects
+        record: path to record the session's input log to
+        replay: path of an input log to play back as fast as possible instead of taking input
+        frame_budget: seconds of simulating and drawing a frame may take before
+        effects are drawn with less detail, or None to keep the quality fixed
+        quality: index in QUALITY_LEVELS of the quality to start at
+        """
+        self.startup_profile = startup_profile
+        self.timestep = FixedTimestep(tick_rate, max_catchup_steps)
+        with profiler.phase("display"):
+            # Only what the first frame needs; the mixer starts on the first sound
+            pg.display.init()
+            pg.font.init()
+            pg.display.set_mode((640, 480), pg.OPENGL | pg.DOUBLEBUF)
+            self.clock = pg.time.Clock()
+        with profiler.phase("gl_setup"):
+            self._setup_opengl()
+        with profiler.phase("textures"):
+            self._load_textures()
+        log = InputLog(replay) if replay else None
+        with profiler.phase("game_systems"):
+            self._initialize_game_systems(log.seed if log else seed)
+        if record:
+            self.recorder = InputRecorder(record, self.game.seed)
+        if frame_budget and not log:  # Replays time every build at one quality
+            self.governor = QualityGovernor(frame_budget, level=quality)
+        self._apply_quality(QUALITY_LEVELS[quality])
+        if log:
+            self.replayLoop(log)
+        else:
+            self.mainLoop()
 
     def _setup_opengl(self):
         """Setup OpenGL environment"""
@@ -34,538 +82,266 @@ class App:
 
     def _load_textures(self):
         """Load all game textures"""
-        self.sky_texture, self.sky_w, self.sky_h = load_texture("assets/images/sky.png")
-        self.player_texture, self.player_w, self.player_h = load_texture("assets/images/player.png")
-        self.zombie_texture, self.zombie_w, self.zombie_h = load_texture("assets/images/zombie.png")
-        self.ground_texture, self.ground_w, self.ground_h = load_texture("assets/images/ground.png")
+        # Every image shares one atlas texture, so sprites batch into one draw call.
+        # A prebuilt asset bundle is uploaded straight from the mapped file unless
+        # images changed since it was built; without one, decoded pixels come from
+        # the on-disk cache after the first launch.
+        try:
+            bundle = AssetBundle(BUNDLE_PATH) if os.path.exists(BUNDLE_PATH) else None
+        except ValueError as e:
+            print(f"{e}; loading the images instead. Rebuild it with python src/asset_bundle.py")
+            bundle = None
+        stale = bundle.stale_sources() if bundle else None
+        if stale:
+            print(f"{BUNDLE_PATH} is out of date ({', '.join(stale[:5])}{', ...' if len(stale) > 5 else ''} "
+                  "changed); loading the images instead. Rebuild it with python src/asset_bundle.py")
+            bundle = None
+        if bundle:
+            self.atlas = SpriteAtlas.from_bundle(bundle)
+            self.texture_source = "asset bundle"
+        else:
+            self.atlas = SpriteAtlas.from_directory("assets/images", names=CORE_SPRITES, cache=texture_cache)
+            stats = texture_cache.stats()
+            state = "warm" if stats['misses'] == 0 else "cold"
+            self.texture_source = f"{state} texture cache: {stats['hits']} hits, {stats['misses']} misses"
+        self.sky_sprite = self.atlas['sky']
+        self.player_sprite = self.atlas['player']
+        self.ground_sprite = self.atlas['ground']
+        self.sky_w, self.sky_h = self.sky_sprite.width, self.sky_sprite.height
+        self.player_w, self.player_h = self.player_sprite.width, self.player_sprite.height
+        self.ground_w, self.ground_h = self.ground_sprite.width, self.ground_sprite.height
 
-    def _initialize_game_systems(self):
-        """Initialize all game systems and variables"""
-        # Player setup
-        self.player_x = 50
-        self.player_y = 225
-        self.player_speed = 5
-        
-        # Game systems
-        self.health_system = HealthSystem(max_health=100, damage_rate=20)
-        self.score_system = ScoreSystem(target_score=10)
+    def _initialize_game_systems(self, seed=None):
+        """Create the game and what draws it"""
+        # Animations share frame sets and advance on the game clock; frames
+        # already in the bundle's atlas are drawn from it, not loaded again
+        self.animator = Animator(FrameSetCache(atlas=self.atlas))
+        self.game = Game(self.animator, player_size=(self.player_w, self.player_h), seed=seed)
+        self.recorder = None  # Writes the input log when recording
+        self.governor = None  # Adjusts self.quality to hold the frame budget
+        self.quality = QUALITY_LEVELS[0]
         self.audio_manager = AudioManager()  # Initialize audio manager
         
-        # Zombie management
-        self.zombies = []
-        self.active_zombie_index = None
-        self.zombie_spawn_timer = 0
-        self.zombie_spawn_interval = 3
-        self.zombie_words = ["zombie", "ghost", "monster", "creature", "undead", "horror", "scary", "dead"]
-        
-        # Bullet system
-        self.bullets = []
-        self.bullet_speed = 4000
-        self.bullet_trails = []
-        
-        # Power-up system using midpoint circle algorithm
-        self.powerups = []
-        self.powerup_spawn_timer = 0
-        self.powerup_spawn_interval = 10  # Spawn every 10 seconds
-        self.powerup_types = ["health", "speed", "shield"]
-        self.attract_powerups = False  # Flag for powerup attraction
-        self.attract_cooldown = 0  # Cooldown for attraction ability
+        # Clips and culls lines, circles and ellipses before rasterization
+        self.culler = ViewportCuller(0, 0, 639, 479)
         
-        # Visual effects
-        self.visual_effects = []
+        # Retained layers: the background never changes, the HUD strips only
+        # when the score, health bar or attract state they show changes
+        self.background_layer = RenderLayer(0, 0, 640, 480, clear_color=(0.1, 0.2, 0.2, 1))
+        self.hud_layer = RenderLayer(0, 0, 640, 64)
+        self.attract_layer = RenderLayer(0, 448, 640, 32)
+        self.end_screens = EndScreens()
 
-    def spawn_zombie(self):
-        """Spawn a new zombie with random word and speed"""
-        word = random.choice(self.zombie_words)
-        speed = random.uniform(50, 150)
-        zombie = Zombie(
-            x=640,
-            y=225,
-            speed=speed,
-            word=word,
-            zombie_texture=self.zombie_texture,
-            zombie_w=self.zombie_w,
-            zombie_h=self.zombie_h
-        )
-        self.zombies.append(zombie)
+    def _ticks(self):
+        """Milliseconds of game time, the clock for pulses and rotations"""
+        return int(self.game.game_time * 1000)
 
     def handle_input(self, event):
-        """Handle all game input"""
+        """Pass key presses to the game; returns False when the window is closed"""
         if event.type == pg.QUIT:
             return False
-        
         if event.type == pg.KEYDOWN:
-            if self.score_system.game_won:
-                if self.score_system.handle_win_screen_input(event):
-                    self.reset_game()
-                return True
-            elif self.score_system.game_over:
-                if self.score_system.handle_game_over_input(event):
-                    self.reset_game()
-                return True
-
-            # Attract powerups with spacebar if cooldown is ready
-            if event.key == pg.K_SPACE and self.attract_cooldown <= 0:
-                self.attract_powerups = True
-                self.attract_cooldown = 5  # 5 second cooldown
-                # Add visual effect to show attraction is active
-                self._add_visual_effect("attract", self.player_x + self.player_w * 0.75, 
-                                       self.player_y + self.player_h * 0.75, 
-                                       duration=1.0, radius=100, 
-                                       color=(0.8, 0.8, 1.0, 0.5))
-                return True
-
-            typed_letter = event.unicode.lower()
-            self._handle_typing(typed_letter)
-        
-        # Handle custom events for powerup timeouts
-        if event.type == pg.USEREVENT + 1:  # Speed powerup timeout
-            self.bullet_speed /= 1.5  # Reset bullet speed
-            pg.time.set_timer(pg.USEREVENT + 1, 0)  # Disable timer
-        
-        if event.type == pg.USEREVENT + 2:  # Shield powerup timeout
-            self.health_system.damage_rate = 20  # Reset damage rate
-            pg.time.set_timer(pg.USEREVENT + 2, 0)  # Disable timer
-        
+            char = " " if event.key == pg.K_SPACE else event.unicode.lower()
+            ended = self.game.score_system.game_won or self.game.score_system.game_over
+            self.game.key_pressed(char)
+            if ended and char == " ":
+                self.timestep.reset()  # Space restarted the game: its counts start afresh
+            if self.recorder:
+                self.recorder.key(char)
         return True
 
-    def _handle_typing(self, typed_letter):
-        """Handle typing mechanics"""
-        # Find new zombie to type if none active
-        if self.active_zombie_index is None:
-            for i, zombie in enumerate(self.zombies):
-                if zombie.alive and zombie.word and typed_letter == zombie.word[0]:
-                    self.active_zombie_index = i
-                    break
-        
-        # Process typing for active zombie
-        if self.active_zombie_index is not None:
-            zombie = self.zombies[self.active_zombie_index]
-            if zombie.process_typed_letter(typed_letter):
-                self._fire_bullet()
-                if not zombie.word:
-                    zombie.alive = False
-                    if self.score_system.increment_score():
-                        self.score_system.game_won = True
-                        print(f"Game won! Score: {self.score_system.score}")  # Debug print
-                    self.active_zombie_index = None
-            elif typed_letter != zombie.word[0]:
-                self.active_zombie_index = None
-
-    def _fire_bullet(self):
-        """Fire a bullet at the active zombie"""
-        start_x = self.player_x + self.player_w // 2
-        start_y = self.player_y + 50
-        
-        # Get target zombie position for trajectory
-        if self.active_zombie_index is not None and self.active_zombie_index < len(self.zombies):
-            target_zombie = self.zombies[self.active_zombie_index]
-            target_x = target_zombie.x + target_zombie.zombie_w // 2
-            target_y = target_zombie.y + target_zombie.zombie_h // 2
-        else:
-            # Default trajectory if no target
-            target_x = start_x + 100
-            target_y = start_y
-        
-        # Calculate angle for visual effect
-        angle = math.atan2(target_y - start_y, target_x - start_x)
-        
-        self.bullets.append({
-            'x': start_x,
-            'y': start_y,
-            'target_zombie': self.active_zombie_index,
-            'start_x': start_x,
-            'start_y': start_y,
-            'angle': angle
-        })
-        # Play fire sound effect
-        self.audio_manager.play_sound('fire')
-
     def update(self, dt):
-        """Update all game systems"""
-        if self.score_system.game_won or self.score_system.game_over:
-            return True
-
-        # Update attract cooldown
-        if self.attract_cooldown > 0:
-            self.attract_cooldown -= dt
-            if self.attract_cooldown <= 0:
-                self.attract_powerups = False
-
-        # Spawn new zombies
-        self.zombie_spawn_timer += dt
-        if self.zombie_spawn_timer >= self.zombie_spawn_interval:
-            self.spawn_zombie()
-            self.zombie_spawn_timer = 0
-        
-        # Update zombies
-        player_right_edge = self.player_x + (self.player_w * 1.5)
-        is_any_zombie_close = False
-        
-        for zombie in self.zombies[:]:
-            if zombie.alive:
-                distance = zombie.update(dt, player_right_edge, -50)
-                if distance <= -50:
-                    is_any_zombie_close = True
-            else:
-                self.zombies.remove(zombie)
-        
-        # Update health system
-        if not self.health_system.update(dt, is_any_zombie_close, False):
-            self.score_system.set_game_over()
-            return True
-        
-        # Update bullets
-        self._update_bullets(dt)
-        
-        # Update powerups
-        self._update_powerups(dt)
-        
-        # Update visual effects
-        self._update_visual_effects(dt)
-        
+        """Advance the game by dt seconds and play the sounds it asked for"""
+        self.game.update(dt)
+        if self.recorder:
+            self.recorder.tick(dt)
+        self._play_sounds()
         return True
-        
-    def _update_powerups(self, dt):
-        """Update and spawn powerups using midpoint circle algorithm"""
-        # Spawn new powerups
-        self.powerup_spawn_timer += dt
-        if self.powerup_spawn_timer >= self.powerup_spawn_interval:
-            # Spawn in a random position on screen
-            x = random.randint(100, 540)
-            y = random.randint(100, 380)
-            powerup_type = random.choice(self.powerup_types)
-            self.powerups.append({
-                'x': x,
-                'y': y,
-                'type': powerup_type,
-                'radius': 15,
-                'active': True,
-                'rotation': 0,
-                'pulse': 0,
-                'move_timer': 0,
-                'move_speed': random.uniform(30, 60)  # Random movement speed
-            })
-            self.powerup_spawn_timer = 0
-        
-        # Update existing powerups
-        for powerup in self.powerups[:]:
-            # Animate powerups with rotation and pulsing
-            powerup['rotation'] = (powerup['rotation'] + 90 * dt) % 360
-            powerup['pulse'] = math.sin(pg.time.get_ticks() / 200) * 3
-            
-            # Calculate direction to player
-            player_center_x = self.player_x + self.player_w * 0.75
-            player_center_y = self.player_y + self.player_h * 0.75
-            dx = player_center_x - powerup['x']
-            dy = player_center_y - powerup['y']
-            distance = math.sqrt(dx*dx + dy*dy)
-            
-            # Move powerups toward player
-            if self.attract_powerups:
-                # Fast attraction when space is pressed
-                if distance > 0:
-                    dx /= distance
-                    dy /= distance
-                    # Faster movement during attraction
-                    powerup['x'] += dx * powerup['move_speed'] * 3 * dt
-                    powerup['y'] += dy * powerup['move_speed'] * 3 * dt
-                    
-                    # Add more frequent trail effect during attraction
-                    if random.random() < 0.3:  # More frequent trails
-                        color = (0.0, 1.0, 0.0) if powerup['type'] == "health" else \
-                                (1.0, 1.0, 0.0) if powerup['type'] == "speed" else \
-                                (0.0, 0.5, 1.0)  # Shield
-                        self._add_visual_effect("powerup_trail", powerup['x'], powerup['y'], 
-                                               duration=0.3, radius=5, color=color)
-            else:
-                # Normal gradual movement
-                powerup['move_timer'] += dt
-                if powerup['move_timer'] > 2.0:  # Start moving after 2 seconds
-                    # Normalize and apply movement
-                    if distance > 0:
-                        dx /= distance
-                        dy /= distance
-                        powerup['x'] += dx * powerup['move_speed'] * dt
-                        powerup['y'] += dy * powerup['move_speed'] * dt
-                        
-                        # Add trail effect using midpoint circle
-                        if random.random() < 0.1:  # Only add trail occasionally
-                            color = (0.0, 1.0, 0.0) if powerup['type'] == "health" else \
-                                    (1.0, 1.0, 0.0) if powerup['type'] == "speed" else \
-                                    (0.0, 0.5, 1.0)  # Shield
-                            self._add_visual_effect("powerup_trail", powerup['x'], powerup['y'], 
-                                                   duration=0.3, radius=5, color=color)
-            
-            # Check for player collision
-            player_center_x = self.player_x + self.player_w * 0.75
-            player_center_y = self.player_y + self.player_h * 0.75
-            distance = math.sqrt((powerup['x'] - player_center_x)**2 + (powerup['y'] - player_center_y)**2)
-            
-            if distance < powerup['radius'] + 30:  # Player collision radius
-                self._apply_powerup(powerup['type'])
-                self.powerups.remove(powerup)
-    
-    def _apply_powerup(self, powerup_type):
-        """Apply powerup effects"""
-        if powerup_type == "health":
-            self.health_system.current_health = min(self.health_system.current_health + 30, self.health_system.max_health)
-            # Add healing visual effect
-            self._add_visual_effect("healing", self.player_x, self.player_y, duration=1.0)
-        elif powerup_type == "speed":
-            # Increase bullet speed temporarily
-            self.bullet_speed *= 1.5
-            # Schedule speed reset after 5 seconds
-            pg.time.set_timer(pg.USEREVENT + 1, 5000)  # Reset in 5 seconds
-            # Add speed boost visual effect
-            self._add_visual_effect("speed_boost", self.player_x, self.player_y, duration=5.0)
-        elif powerup_type == "shield":
-            # Make player temporarily invulnerable
-            self.health_system.damage_rate = 0
-            # Schedule shield reset after 3 seconds
-            pg.time.set_timer(pg.USEREVENT + 2, 3000)  # Reset in 3 seconds
-            # Add shield visual effect
-            self._add_visual_effect("shield", self.player_x, self.player_y, duration=3.0)
-    
-    def _update_visual_effects(self, dt):
-        """Update visual effects"""
-        for effect in self.visual_effects[:]:
-            effect['time_left'] -= dt
-            if effect['time_left'] <= 0:
-                self.visual_effects.remove(effect)
-            else:
-                # Update effect properties based on time left
-                effect['alpha'] = min(1.0, effect['time_left'])
-                if effect['type'] == "bullet_hit":
-                    effect['radius'] += 30 * dt  # Expand effect
 
-    def _update_bullets(self, dt):
-        """Update bullet positions and check collisions using DDA line algorithm for trails"""
-        for bullet in self.bullets[:]:
-            # Store previous position for trail
-            prev_x, prev_y = bullet['x'], bullet['y']
-            
-            # Update bullet position
-            bullet['x'] += self.bullet_speed * dt
-            
-            # Add bullet trail using DDA line algorithm
-            self.bullet_trails.append({
-                'start_x': prev_x,
-                'start_y': prev_y,
-                'end_x': bullet['x'],
-                'end_y': bullet['y'],
-                'time_left': 0.2,  # Trail lasts for 0.2 seconds
-                'color': (1.0, 1.0, 0.0)  # Yellow trail
-            })
-            
-            # Check for collision with zombies
-            if bullet['target_zombie'] < len(self.zombies):
-                target_zombie = self.zombies[bullet['target_zombie']]
-                if (target_zombie.alive and
-                    bullet['x'] >= target_zombie.x and 
-                    bullet['x'] <= target_zombie.x + target_zombie.zombie_w * 1.5 and
-                    bullet['y'] >= target_zombie.y and 
-                    bullet['y'] <= target_zombie.y + target_zombie.zombie_h * 1.5):
-                    # Add hit visual effect using midpoint circle
-                    self._add_visual_effect("bullet_hit", target_zombie.x + target_zombie.zombie_w * 0.75, 
-                                           target_zombie.y + target_zombie.zombie_h * 0.75, duration=0.3)
-                    self.bullets.remove(bullet)
-            elif bullet['x'] > 640:
-                self.bullets.remove(bullet)
-        
-        # Update bullet trails
-        for trail in self.bullet_trails[:]:
-            trail['time_left'] -= dt
-            if trail['time_left'] <= 0:
-                self.bullet_trails.remove(trail)
-    
-    def _add_visual_effect(self, effect_type, x, y, duration=1.0, radius=None, color=None):
-        """Add a visual effect at the specified position"""
-        # Set default radius based on effect type if not provided
-        if radius is None:
-            radius = 10 if effect_type == "bullet_hit" else \
-                    5 if effect_type == "powerup_trail" else 30
-        
-        # Set default color based on effect type if not provided
-        if color is None:
-            color = (1.0, 0.5, 0.0) if effect_type == "bullet_hit" else \
-                   (0.0, 1.0, 0.0) if effect_type == "healing" else \
-                   (0.0, 0.5, 1.0) if effect_type == "shield" else \
-                   (1.0, 1.0, 0.0)  # Default yellow for speed_boost
-        
-        self.visual_effects.append({
-            'type': effect_type,
-            'x': x,
-            'y': y,
-            'time_left': duration,
-            'alpha': 1.0,
-            'radius': radius,
-            'color': color
-        })
+    def _apply_quality(self, level):
+        """Draw and emit effects at a QualityLevel from now on"""
+        self.quality = level
+        self.game.particles.rate_scale = level.trail_rate
+        self.game.particles.max_random = level.max_effects
+
+    def _play_sounds(self):
+        for sound in self.game.sounds:
+            self.audio_manager.play_sound(sound)
+        self.game.sounds.clear()
 
-    def draw(self):
-        """Draw all game elements"""
-        if self.score_system.game_won:
-            self.score_system.draw_win_screen()
+    def draw(self, alpha=1.0):
+        """
+        Draw all game elements. Moving ones are drawn alpha of the way from
+        where they were at the previous tick to where they are now.
+        """
+        game = self.game
+        if game.score_system.game_won:
+            self.end_screens.draw_win(game.score_system.score)
             return
-        elif self.score_system.game_over:
-            self.score_system.draw_game_over_screen()
+        elif game.score_system.game_over:
+            self.end_screens.draw_game_over(game.score_system.score)
             return
             
-        glClear(GL_COLOR_BUFFER_BIT)
+        get_renderer().clear()
         
         # Draw background
-        draw_texture(self.sky_texture, 0, 0, self.sky_w, self.sky_h)
-        draw_texture(self.ground_texture, 0, 0, self.ground_w // 2, self.ground_h // 1.5)
+        self.background_layer.draw(None, self._draw_background)
         
         # Draw player
-        draw_texture(self.player_texture, self.player_x, self.player_y, self.player_w * 1.5, self.player_h * 1.5)
+        draw_sprite(self.player_sprite, game.player_x, game.player_y, game.player_w * 1.5, game.player_h * 1.5)
         
         # Draw game systems
-        self.health_system.draw()
-        self.score_system.draw_score()
+        hud_key = (game.health_system.get_display_key(), game.score_system.score, game.score_system.target_score)
+        self.hud_layer.draw(hud_key, self._draw_hud)
         
         # Draw attract ability cooldown indicator
-        if self.attract_cooldown > 0:
-            # Draw cooldown bar
-            cooldown_width = 100 * (self.attract_cooldown / 5.0)  # 5.0 is the max cooldown time
+        if game.attract_cooldown > 0:
+            # Draw cooldown bar, which shrinks every frame so stays out of the layer
+            cooldown_width = 100 * (game.attract_cooldown / 5.0)  # 5.0 is the max cooldown time
             draw_rectangle(20, 460, cooldown_width, 10, color=(0.5, 0.5, 1.0))
-            
-            # Draw outline (using GL_LINE_LOOP instead of filled=False)
-            glColor3f(0.8, 0.8, 1.0)
-            glBegin(GL_LINE_LOOP)
-            glVertex2f(20, 460)
-            glVertex2f(20 + 100, 460)
-            glVertex2f(20 + 100, 460 + 10)
-            glVertex2f(20, 460 + 10)
-            glEnd()
-            glColor3f(1, 1, 1)  # Reset color to white
-            
-            # Draw text
-            cooldown_text = "ATTRACT: " + str(int(self.attract_cooldown)) + "s"
-            cooldown_texture, cooldown_w, cooldown_h = render_text(cooldown_text, font_size=12, color=(255, 255, 255))
-            draw_texture(cooldown_texture, 125, 460, cooldown_w, cooldown_h)
-            glDeleteTextures([cooldown_texture])
+            attract_key = int(game.attract_cooldown)
         else:
-            # Draw ready indicator
-            draw_rectangle(20, 460, 100, 10, color=(0.8, 0.8, 1.0))
-            ready_text = "ATTRACT: READY (SPACE)"
-            ready_texture, ready_w, ready_h = render_text(ready_text, font_size=12, color=(255, 255, 255))
-            draw_texture(ready_texture, 125, 460, ready_w, ready_h)
-            glDeleteTextures([ready_texture])
-        
-        # Draw bullet trails using DDA line algorithm
-        for trail in self.bullet_trails:
-            alpha = trail['time_left'] * 5  # Fade out effect
-            color = (trail['color'][0], trail['color'][1], trail['color'][2], alpha)
-            dda_line(trail['start_x'], trail['start_y'], trail['end_x'], trail['end_y'], color)
+            attract_key = None
+        self.attract_layer.draw(attract_key, self._draw_attract_indicator)
+        
+        # Draw bullet trails using DDA line algorithm, all trails in one batch
+        trails = game.bullet_trails
+        if len(trails):
+            trail_lines = np.column_stack((trails['start_x'], trails['start_y'], trails['end_x'], trails['end_y']))
+            trail_colors = np.empty((len(trails), 4))
+            trail_colors[:, :3] = TRAIL_COLOR
+            trail_colors[:, 3] = trails['time_left'] * 5  # Fade out effect
+            self._draw_line_batch(trail_lines, trail_colors)
         
         # Draw bullets
-        for bullet in self.bullets:
-            draw_rectangle(bullet['x'], bullet['y'], 15, 5, color=(1, 1, 0))
-        
-        # Draw zombies
-        for zombie in self.zombies:
-            if zombie.alive:
-                zombie.draw()
+        if len(game.bullets):
+            bullet_rects = np.empty((len(game.bullets), 4))
+            bullet_rects[:, 0] = game.bullets.interpolate('x', alpha)
+            bullet_rects[:, 1] = game.bullets['y']
+            bullet_rects[:, 2:] = (15, 5)
+            get_renderer().add_rects(bullet_rects, (1, 1, 0))
+        
+        # Draw zombies, all frames before all words so each set batches into one draw call
+        zombie_rows = game.zombies.draw(alpha)
+        game.animation_manager.draw()
+        for word, x, y in game.zombies.labels(zombie_rows, alpha):
+            draw_text(word, x, y)
+        
+        # Collect circles, ellipses and lines for powerups and effects so each
+        # algorithm rasterizes and submits its primitives in a single batch;
+        # every list holds arrays of rows, one array per kind of shape
+        circles, circle_colors = [], []
+        ellipses, ellipse_colors = [], []
+        lines, line_colors = [], []
+        # Rotating dots as (x, y, center_x, center_y, angle, radius)
+        rotating, rotating_colors = [], []
         
         # Draw powerups using midpoint circle algorithm
-        for powerup in self.powerups:
-            # Determine color based on powerup type
-            if powerup['type'] == "health":
-                color = (0.0, 1.0, 0.0)  # Green for health
-            elif powerup['type'] == "speed":
-                color = (1.0, 1.0, 0.0)  # Yellow for speed
-            else:  # Shield
-                color = (0.0, 0.5, 1.0)  # Blue for shield
-            
-            # Draw outer circle with pulsing effect
-            radius = powerup['radius'] + powerup['pulse']
-            midpoint_circle(powerup['x'], powerup['y'], radius, color)
+        powerups = game.powerups
+        powerup_x, powerup_y = powerups.interpolate('x', alpha), powerups.interpolate('y', alpha)
+        if len(powerups):
+            x, y = powerup_x, powerup_y
+            colors = np.column_stack((POWERUP_COLORS[powerups['type']], np.ones(len(powerups))))
             
-            # Draw inner circle
-            midpoint_circle(powerup['x'], powerup['y'], radius * 0.6, (1.0, 1.0, 1.0))
+            # Outer circle with pulsing effect, then the inner circle over it
+            radius = powerups['radius'] + powerups['pulse']
+            outer = np.column_stack((x, y, radius))
+            inner = np.column_stack((x, y, radius * 0.6))
+            circles.append(np.stack((outer, inner), axis=1).reshape(-1, 3))
+            circle_colors.append(np.stack((colors, np.ones_like(colors)), axis=1).reshape(-1, 4))
             
-            # Draw rotating elements using 2D transformation
-            for i in range(4):
-                angle = powerup['rotation'] + (i * 90)
-                x, y = rotate_point(powerup['x'] + radius, powerup['y'], 
-                                   powerup['x'], powerup['y'], angle)
-                midpoint_circle(x, y, 3, color)
-        
-        # Draw visual effects
-        for effect in self.visual_effects:
-            if effect['type'] == "bullet_hit":
-                # Draw expanding circle for bullet hit
-                midpoint_circle(effect['x'], effect['y'], effect['radius'], 
-                              (effect['color'][0], effect['color'][1], effect['color'][2], effect['alpha']))
-            elif effect['type'] == "powerup_trail":
-                # Draw fading trail for powerups
-                midpoint_circle(effect['x'], effect['y'], effect['radius'] * effect['alpha'], 
-                              (effect['color'][0], effect['color'][1], effect['color'][2], effect['alpha']))
-            elif effect['type'] == "attract":
-                # Draw attraction field effect (pulsing circle)
-                # Draw multiple concentric circles with varying opacity
-                for i in range(3):
-                    pulse_radius = effect['radius'] * (1 - i * 0.2) * (0.8 + 0.2 * math.sin(pg.time.get_ticks() / 100))
-                    alpha = effect['alpha'] * (1 - i * 0.3)
-                    midpoint_circle(effect['x'], effect['y'], pulse_radius, 
-                                  (effect['color'][0], effect['color'][1], effect['color'][2], alpha))
-                
-                # Draw lines from powerups to player when attraction is active
-                if self.attract_cooldown > 0 and self.attract_powerups:
-                    player_center_x = self.player_x + self.player_w * 0.75
-                    player_center_y = self.player_y + self.player_h * 0.75
-                    for powerup in self.powerups:
-                        dda_line(powerup['x'], powerup['y'], player_center_x, player_center_y, 
-                               (0.8, 0.8, 1.0, 0.3))
-            elif effect['type'] == "healing":
-                # Draw healing effect (green crosses)
-                for i in range(8):
-                    angle = (pg.time.get_ticks() / 10 + i * 45) % 360
-                    x, y = rotate_point(self.player_x + 50, self.player_y + 50, 
-                                       self.player_x + self.player_w * 0.75, 
-                                       self.player_y + self.player_h * 0.75, angle)
-                    midpoint_circle(x, y, 5, (0.0, 1.0, 0.0, effect['alpha']))
-            elif effect['type'] == "shield":
-                # Draw shield effect (blue circle around player)
-                midpoint_ellipse(self.player_x + self.player_w * 0.75, 
-                               self.player_y + self.player_h * 0.75,
-                               self.player_w, self.player_h, 
-                               (0.0, 0.5, 1.0, effect['alpha']))
-            elif effect['type'] == "speed_boost":
-                # Draw speed lines behind player
-                for i in range(5):
-                    start_x = self.player_x - 10 - i * 5
-                    start_y = self.player_y + 20 + i * 10
-                    end_x = self.player_x - 30 - i * 10
-                    end_y = start_y
-                    dda_line(start_x, start_y, end_x, end_y, 
-                           (1.0, 1.0, 0.0, effect['alpha']))
-        
-        # Reset color
-        glColor3f(1, 1, 1)
+            # Four rotating elements each, transformed together with the rest below
+            angles = (powerups['rotation'][:, None] + np.arange(4) * 90).reshape(-1)
+            rotating.append(np.column_stack((np.repeat(x + radius, 4), np.repeat(y, 4), np.repeat(x, 4),
+                                             np.repeat(y, 4), angles, np.full(len(angles), 3))))
+            rotating_colors.append(np.repeat(colors, 4, axis=0))
+        
+        # Draw visual effects: every effect's circles, ellipses and lines join the batches
+        effects = game.particles.shapes(self._ticks() / 1000, {'attract': self.quality.attract_rings})
+        for kind, shapes, colors in (('circle', circles, circle_colors), ('ellipse', ellipses, ellipse_colors),
+                                     ('line', lines, line_colors)):
+            shapes.extend(effects[kind][0])
+            colors.extend(effects[kind][1])
+        
+        # Lines from powerups to player when attraction is active
+        attract = len(game.particles['attract'])
+        if self.quality.attract_lines is not None:
+            attract = min(attract, self.quality.attract_lines)
+        if attract and game.attract_cooldown > 0 and game.attract_powerups and len(powerups):
+            player_center_x, player_center_y = game.player_center()
+            powerup_lines = np.column_stack((powerup_x, powerup_y, np.full(len(powerups), player_center_x),
+                                             np.full(len(powerups), player_center_y)))
+            lines.insert(0, np.tile(powerup_lines, (attract, 1)))
+            line_colors.insert(0, np.tile((0.8, 0.8, 1.0, 0.3), (len(powerup_lines) * attract, 1)))
+        
+        # Rotate every satellite of the frame in one pass
+        if rotating:
+            rotating = np.concatenate(rotating)
+            matrices = rotation_matrices(rotating[:, 4], rotating[:, 2], rotating[:, 3])
+            centers = apply_transform(matrices, rotating[:, :2])
+            circles.append(np.column_stack((centers, rotating[:, 5])))
+            circle_colors.extend(rotating_colors)
+        
+        if circles:
+            self._draw_circle_batch(np.concatenate(circles), np.concatenate(circle_colors))
+        if ellipses:
+            self._draw_ellipse_batch(np.concatenate(ellipses), np.concatenate(ellipse_colors))
+        if lines:
+            self._draw_line_batch(np.concatenate(lines), np.concatenate(line_colors))
+        
+        # Submit the whole frame and show it
+        get_renderer().present()
+
+    def _draw_line_batch(self, lines, colors):
+        """Clip lines to the viewport, then rasterize them in one batch with the selected line algorithm"""
+        lines, keep = self.culler.cull_lines(lines)
+        if len(lines):
+            points, counts, coverage = rasterize_lines(lines)
+            draw_points(points, np.asarray(colors)[keep], counts, coverage)
+
+    def _draw_circle_batch(self, circles, colors):
+        """Cull off-screen circles, then rasterize the rest in one batch"""
+        circles, keep = self.culler.cull_circles(circles)
+        if len(circles):
+            points, counts = midpoint_circle_batch(circles, self.quality.point_step)
+            draw_points(points, np.asarray(colors)[keep], counts)
 
-        pg.display.flip()
+    def _draw_ellipse_batch(self, ellipses, colors):
+        """Cull off-screen ellipses, then rasterize the rest in one batch"""
+        ellipses, keep = self.culler.cull_ellipses(ellipses)
+        if len(ellipses):
+            points, counts = midpoint_ellipse_batch(ellipses, self.quality.point_step)
+            draw_points(points, np.asarray(colors)[keep], counts)
 
-    def reset_game(self):
-        """Reset the game state"""
-        self.score_system.reset()
-        self.zombies.clear()
-        self.bullets.clear()
-        self.bullet_trails.clear()
-        self.powerups.clear()
-        self.visual_effects.clear()
-        self.active_zombie_index = None
-        self.zombie_spawn_timer = 0
-        self.powerup_spawn_timer = 0
-        self.attract_powerups = False
-        self.attract_cooldown = 0
-        self.health_system = HealthSystem(max_health=100, damage_rate=20)
-        self.bullet_speed = 4000  # Reset bullet speed
+    def _draw_background(self):
+        """Draw the sky and ground into the background layer"""
+        draw_sprite(self.sky_sprite, 0, 0, self.sky_w, self.sky_h)
+        draw_sprite(self.ground_sprite, 0, 0, self.ground_w // 2, self.ground_h // 1.5)
+
+    def _draw_hud(self):
+        """Draw health and score into the HUD layer"""
+        draw_health(self.game.health_system)
+        draw_score(self.game.score_system)
+
+    def _draw_attract_indicator(self):
+        """Draw the static parts of the attract indicator into its layer"""
+        if self.game.attract_cooldown > 0:
+            # Draw outline
+            get_renderer().add_line_loop(((20, 460), (20 + 100, 460), (20 + 100, 460 + 10), (20, 460 + 10)),
+                                         (0.8, 0.8, 1.0))
+            
+            # Draw text
+            cooldown_text = "ATTRACT: " + str(int(self.game.attract_cooldown)) + "s"
+            draw_text(cooldown_text, 125, 460, font_size=12, color=(255, 255, 255))
+        else:
+            # Draw ready indicator
+            draw_rectangle(20, 460, 100, 10, color=(0.8, 0.8, 1.0))
+            ready_text = "ATTRACT: READY (SPACE)"
+            draw_text(ready_text, 125, 460, font_size=12, color=(255, 255, 255))
 
     def mainLoop(self):
         running = True
+        first_frame = True
         while running:
             # Handle events
             for event in pg.event.get():
@@ -573,30 +349,87 @@ class App:
                     running = False
                     break
             
-            # Update game state
-            dt = self.clock.tick(60) / 1000
+            # Simulate whole fixed ticks for the time the last frame took
+            steps = self.timestep.advance(self.clock.tick(60) / 1000)
+            
+            # Keep the last frame's work, without the limiter's wait, within budget
+            if self.governor and self.governor.record(self.clock.get_rawtime() / 1000):
+                self._apply_quality(self.governor.level)
+                log.info("Quality %s: %s", self.quality.name, self.governor.reason)
             
             # Check game state before updating
-            if self.score_system.game_won:
-                self.score_system.draw_win_screen()
+            if self.game.score_system.game_won:
+                self.end_screens.draw_win(self.game.score_system.score)
                 continue
-            elif self.score_system.game_over:
-                self.score_system.draw_game_over_screen()
+            elif self.game.score_system.game_over:
+                self.end_screens.draw_game_over(self.game.score_system.score)
                 continue
                 
-            if not self.update(dt):
-                running = False
+            for _ in range(steps):
+                if not self.update(self.timestep.dt):
+                    running = False
+                    break
+            if not running:
                 break
             
-            # Draw game
-            self.draw()
+            # Draw game, between the last two ticks
+            self.draw(self.timestep.alpha)
+            if first_frame:
+                self._report_startup()
+                self.audio_manager.warm_up()  # Now that the window is up, and off the game thread
+                first_frame = False
         
         self.quit()
+
+    def replayLoop(self, log):
+        """Play an input log back as fast as possible, drawing after every tick, and report the frame times"""
+        def draw():
+            pg.event.pump()
+            self.game.sounds.clear()
+            self.draw()
+        times, matched = log.play(self.game, draw)
+        print(frame_time_report(times))
+        print("Replay " + ("matches the recording" if matched else "DIFFERS FROM THE RECORDING"))
+        self.quit()
+
+    def _report_startup(self):
+        """Print the time from launch to the first presented frame and save the timeline"""
+        elapsed = profiler.mark("first_frame") * 1000
+        print(f"First frame after {elapsed:.0f} ms ({self.texture_source})")
+        if self.startup_profile:
+            profiler.write(self.startup_profile)
     
     def quit(self):
         """Clean up resources before quitting"""
         self.audio_manager.cleanup()  # Clean up audio resources
+        if self.recorder:
+            self.recorder.close(self.game)
+        if self.startup_profile:
+            profiler.write(self.startup_profile)  # Again, now with lazily started subsystems
         pg.quit()
 
 if __name__ == "__main__":
-    myApp = App()
+    import argparse  # Only the command line needs it; it is slow to import
+    parser = argparse.ArgumentParser(description="Typing Zombie Defense")
+    parser.add_argument("--startup-profile", metavar="FILE",
+                        help="write the startup timeline as Chrome trace JSON")
+    parser.add_argument("--tick-rate", type=int, default=60,
+                        help="simulation ticks per second; lower it on slow machines, drawing stays smooth")
+    parser.add_argument("--max-catchup", type=int, default=5, metavar="STEPS",
+                        help="most simulation ticks run in one frame to catch up after a hitch")
+    parser.add_argument("--seed", type=int, help="seed the random spawns and effects")
+    parser.add_argument("--record", metavar="LOG", help="record the seed, keys and ticks of the session to LOG")
+    parser.add_argument("--replay", metavar="LOG",
+                        help="play back a recorded session as fast as possible and report frame times")
+    parser.add_argument("--frame-budget", type=float, default=1000 / 60, metavar="MS",
+                        help="milliseconds a frame may take before effects lose detail; 0 keeps the quality fixed")
+    parser.add_argument("--quality", choices=[level.name for level in QUALITY_LEVELS], default="full",
+                        help="quality to start at, or to keep with --frame-budget 0")
+    parser.add_argument("--log-level", default="warning", choices=("debug", "info", "warning"),
+                        help="show log messages from this level up; info shows quality changes")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(message)s")
+    quality = [level.name for level in QUALITY_LEVELS].index(args.quality)
+    myApp = App(startup_profile=args.startup_profile, tick_rate=args.tick_rate,
+                max_catchup_steps=args.max_catchup, seed=args.seed, record=args.record, replay=args.replay,
+                frame_budget=args.frame_budget / 1000, quality=quality)
@@ -0,0 +1,178 @@
+import numpy as np
+from collections import namedtuple
+from entity_store import EntityStore
+from transforms import rotation_matrices, apply_transform
+
+# How a particle is drawn, as k primitives placed relative to its position.
+# offsets: (k, 2) points, or (k, 4) line segments, from the particle, in
+#       multiples of its x and y scale
+# size: per primitive, multiples of the particle's radius; (k,) for
+#       circles, (k, 2) axes for ellipses, which also follow its scale,
+#       unused for lines
+# alpha: per primitive, multiples of the particle's alpha
+# shrink: scale circle radii by the particle's alpha as it fades
+# angles, spin: circle offsets are turned about the particle by
+#       angles + spin * now degrees
+# pulse: (amplitude, rate); sizes swing by amplitude at rate radians a second
+Shape = namedtuple('Shape', ['kind', 'offsets', 'size', 'alpha', 'shrink', 'angles', 'spin', 'pulse'])
+
+def circles(offsets=((0, 0),), size=None, alpha=None, **options):
+    """Circles of the particle's radius times size, one per offset"""
+    return _shape('circle', offsets, size, alpha, **options)
+
+def ellipses(offsets=((0, 0),), size=((1, 1),), alpha=None, **options):
+    """Ellipses with axes of the particle's radius times size, one per offset"""
+    return _shape('ellipse', offsets, size, alpha, **options)
+
+def lines(segments, alpha=None):
+    """Line segments, given as x0, y0, x1, y1 rows relative to the particle"""
+    return _shape('line', segments, None, alpha)
+
+def _shape(kind, offsets, size, alpha, shrink=False, angles=None, spin=0.0, pulse=(0.0, 0.0)):
+    """A Shape with every per-primitive field as an array of one entry per primitive"""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    count = len(offsets)
+    return Shape(kind, offsets,
+                 np.ones(count) if size is None else np.asarray(size, dtype=np.float64),
+                 np.ones(count) if alpha is None else np.asarray(alpha, dtype=np.float64),
+                 shrink, np.zeros(count) if angles is None else np.asarray(angles, dtype=np.float64),
+                 spin, pulse)
+
+# A kind of effect: how long its particles live, their starting radius and
+# how fast it grows, their color, how many can be live at once, how many
+# emit_random() starts per source per second, and how each is drawn
+Effect = namedtuple('Effect', ['duration', 'radius', 'color', 'shapes', 'growth', 'capacity', 'rate'],
+                    defaults=(0.0, 64, 0.0))
+
+class ParticleSystem:
+    """
+    Particles of every effect kind, each kind in its own fixed-capacity pool.
+    Aging, fading and growth are one vectorized pass per kind, and drawing
+    turns every kind's shapes into rows of circles, ellipses and lines for
+    the batch rasterizers. Effects are data: a new one is an entry in the
+    effects table, with no new code on the per-frame path.
+    """
+    def __init__(self, effects):
+        self.effects = effects
+        self.pools = {
+            name: EntityStore({'x': np.float64, 'y': np.float64, 'time_left': np.float64,
+                               'alpha': (np.float64, 1.0), 'radius': np.float64,
+                               'color': (np.float64, effect.color), 'scale': (np.float64, (1.0, 1.0))},
+                              effect.capacity, fixed=True)
+            for name, effect in effects.items()
+        }
+        self.rate_scale = 1.0  # Scales every random emitter's rate
+        self.max_random = None  # Live particles above which random emitters start no more
+
+    def __getitem__(self, name):
+        """The live particles of one effect"""
+        return self.pools[name]
+
+    def __len__(self):
+        return sum(len(pool) for pool in self.pools.values())
+
+    def emit(self, name, x, y, duration=None, radius=None, color=None, scale=(1.0, 1.0)):
+        """
+        Start particles of an effect at x, y. Any argument may hold one
+        entry per particle to start several at once; duration, radius and
+        color default to the effect's. scale stretches the particles'
+        shapes along x and y, e.g. to fit effects to a sprite's size.
+        """
+        effect = self.effects[name]
+        x = np.atleast_1d(x)
+        color = effect.color if color is None else np.asarray(color)[..., :3]
+        self.pools[name].extend(len(x), x=x, y=y, time_left=effect.duration if duration is None else duration,
+                                radius=effect.radius if radius is None else radius, color=color, scale=scale)
+
+    def emit_random(self, name, x, y, dt, rng, rate_scale=1.0, color=None):
+        """
+        Start a particle at each source x, y with the chance of one in dt
+        at the effect's rate times rate_scale; color may hold one entry per
+        source. Returns the indices of the sources that emitted. The same
+        random numbers are drawn whatever the system's rate_scale and
+        max_random, so they never change what else rng produces.
+        """
+        x = np.atleast_1d(x)
+        emitted = np.flatnonzero(rng.random(len(x)) < self.effects[name].rate * rate_scale * self.rate_scale * dt)
+        if self.max_random is not None:
+            emitted = emitted[:max(self.max_random - len(self), 0)]
+        if len(emitted):
+            if color is not None and np.ndim(color) > 1:
+                color = np.asarray(color)[emitted]
+            self.emit(name, x[emitted], np.atleast_1d(y)[emitted], color=color)
+        return emitted
+
+    def update(self, dt):
+        """Age every particle, drop the expired and fade and grow the rest"""
+        for name, pool in self.pools.items():
+            pool['time_left'] -= dt
+            pool.remove(pool['time_left'] <= 0)
+            pool['alpha'] = np.minimum(1.0, pool['time_left'])
+            pool['radius'] += self.effects[name].growth * dt
+
+    def clear(self):
+        for pool in self.pools.values():
+            pool.clear()
+
+    def stats(self):
+        """Pool statistics of every effect"""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def shapes(self, now, primitives=None):
+        """
+        Everything to draw at time now in seconds, as {'circle': (rows,
+        colors), 'ellipse': ..., 'line': ...}, each a list of arrays: circle
+        rows are x, y, radius, ellipse rows x, y, a, b, line rows x0, y0,
+        x1, y1, and colors are RGBA rows
+        primitives: {effect name: most primitives drawn of each of its shapes}
+        """
+        primitives = primitives or {}
+        shapes = {'circle': ([], []), 'ellipse': ([], []), 'line': ([], [])}
+        for name, pool in self.pools.items():
+            if not len(pool):
+                continue
+            colors = np.column_stack((pool['color'], pool['alpha']))
+            for shape in self.effects[name].shapes:
+                if name in primitives:
+                    shape = _first(shape, primitives[name])
+                rows = SHAPE_BUILDERS[shape.kind](shape, pool, now)
+                shape_colors = np.repeat(colors, len(shape.offsets), axis=0)
+                shape_colors[:, 3] *= np.tile(shape.alpha, len(pool))
+                shapes[shape.kind][0].append(rows)
+                shapes[shape.kind][1].append(shape_colors)
+        return shapes
+
+def _first(shape, count):
+    """A shape with only its first count primitives"""
+    return shape._replace(offsets=shape.offsets[:count], size=shape.size[:count], alpha=shape.alpha[:count],
+                          angles=shape.angles[:count])
+
+def _pulse(shape, now):
+    amplitude, rate = shape.pulse
+    return 1 - amplitude + amplitude * np.sin(rate * now)
+
+def _centers(shape, pool):
+    """Every primitive's point, particle by particle, as (n * k, 2) rows"""
+    offsets = shape.offsets[None, :, :2] * pool['scale'][:, None, :]
+    return (np.column_stack((pool['x'], pool['y']))[:, None, :] + offsets).reshape(-1, 2)
+
+def _circle_rows(shape, pool, now):
+    centers = _centers(shape, pool)
+    if shape.spin or shape.angles.any():
+        angles = np.tile((shape.angles + shape.spin * now) % 360, len(pool))
+        matrices = rotation_matrices(angles, np.repeat(pool['x'], len(shape.offsets)),
+                                     np.repeat(pool['y'], len(shape.offsets)))
+        centers = apply_transform(matrices, centers)
+    radius = pool['radius'] * (pool['alpha'] if shape.shrink else 1.0)
+    radius = (radius[:, None] * shape.size * _pulse(shape, now)).reshape(-1)
+    return np.column_stack((centers, radius))
+
+def _ellipse_rows(shape, pool, now):
+    axes = pool['radius'][:, None, None] * pool['scale'][:, None, :] * shape.size[None, :, :] * _pulse(shape, now)
+    return np.column_stack((_centers(shape, pool), axes.reshape(-1, 2)))
+
+def _line_rows(shape, pool, now):
+    origins = np.tile(np.column_stack((pool['x'], pool['y'])), 2)
+    return (origins[:, None, :] + shape.offsets[None, :, :] * np.tile(pool['scale'], 2)[:, None, :]).reshape(-1, 4)
+
+SHAPE_BUILDERS = {'circle': _circle_rows, 'ellipse': _ellipse_rows, 'line': _line_rows}
@@ -0,0 +1,94 @@
+from collections import namedtuple
+
+# A step of visual quality, best first. Only cosmetics change; the game
+# plays the same at every level.
+# trail_rate: scale of the rate random emitters such as power-up trails start particles at
+# point_step: draw every point_step-th point of each circle and ellipse outline
+# attract_rings: concentric circles drawn per attract particle
+# attract_lines: attract particles that draw lines to the power-ups, None for all
+# max_effects: live particles above which random emitters start no more, None for no cap
+QualityLevel = namedtuple('QualityLevel', ['name', 'trail_rate', 'point_step', 'attract_rings', 'attract_lines',
+                                           'max_effects'])
+
+QUALITY_LEVELS = (
+    QualityLevel('full', 1.0, 1, 3, None, None),
+    QualityLevel('high', 0.5, 1, 3, 1, 256),
+    QualityLevel('medium', 0.35, 2, 2, 1, 128),
+    QualityLevel('low', 0.2, 3, 1, 0, 64),
+)
+
+# A level change: the frame it happened on, the level moved to and why
+QualityChange = namedtuple('QualityChange', ['frame', 'level', 'reason'])
+
+class QualityGovernor:
+    """
+    Holds frame time under a budget by stepping visual quality down and up.
+    Each frame's time, the time spent simulating and drawing without any
+    wait for the frame limiter, feeds a moving average; one hitch counts as
+    at most four budgets, so a single stall cannot change the level alone.
+    Quality drops one level once the average has been over budget for
+    downgrade_after frames in a row, and rises one level once it has been
+    under budget * headroom for upgrade_after frames. Every change restarts
+    both counts, and a drop soon after a rise doubles the wait before the
+    next rise, so a level the machine cannot hold is not retried every few
+    seconds.
+    """
+    def __init__(self, budget=1 / 60, levels=QUALITY_LEVELS, level=0, smoothing=0.1, downgrade_after=30,
+                 upgrade_after=180, headroom=0.7):
+        self.budget = budget
+        self.levels = levels
+        self.index = level
+        self.smoothing = smoothing
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.upgrade_wait = upgrade_after
+        self.headroom = headroom
+        self.average = None
+        self.frames = 0
+        self.over = 0  # Frames in a row with the average over budget
+        self.under = 0  # Frames in a row with the average under budget * headroom
+        self.last_upgrade = None  # Frame of the last rise
+        self.reason = f"starting at {levels[level].name} quality"
+        self.changes = []
+
+    @property
+    def level(self):
+        """The current QualityLevel"""
+        return self.levels[self.index]
+
+    def record(self, frame_time):
+        """Add one frame's time in seconds; returns True if the level changed"""
+        frame_time = min(frame_time, self.budget * 4)
+        if self.average is None:
+            self.average = frame_time
+        else:
+            self.average += (frame_time - self.average) * self.smoothing
+        self.frames += 1
+
+        if self.average > self.budget:
+            self.over += 1
+            self.under = 0
+        elif self.average < self.budget * self.headroom:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.downgrade_after and self.index < len(self.levels) - 1:
+            if self.last_upgrade is not None and self.frames - self.last_upgrade < self.upgrade_wait:
+                self.upgrade_wait *= 2
+            self.last_upgrade = None
+            return self._change(self.index + 1, f"frame time {self.average * 1000:.1f} ms over the "
+                                f"{self.budget * 1000:.1f} ms budget for {self.over} frames")
+        if self.under >= self.upgrade_wait and self.index > 0:
+            self.last_upgrade = self.frames
+            return self._change(self.index - 1, f"frame time {self.average * 1000:.1f} ms under "
+                                f"{self.budget * self.headroom * 1000:.1f} ms for {self.under} frames")
+        return False
+
+    def _change(self, index, reason):
+        self.index = index
+        self.reason = reason
+        self.over = self.under = 0
+        self.changes.append(QualityChange(self.frames, self.level, reason))
+        return True
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+class OffsetCache:
+    """
+    LRU cache of precomputed raster offset tables.
+    Tables are built once per key (a radius, or a pair of semi-axes) by the
+    given build function and translated to a center at draw time.
+    """
+    def __init__(self, build, max_entries=64):
+        self.build = build
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the offset table for key, building it on a miss"""
+        table = self.entries.get(key)
+        if table is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return table
+
+        self.misses += 1
+        table = self.build(key)
+        table.setflags(write=False)  # Shared between callers, never mutate
+        self.entries[key] = table
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)  # Drop least recently used
+            self.evictions += 1
+        return table
+
+    def stats(self):
+        """Get cache counters as a dictionary"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        """Drop all tables and reset the counters"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -0,0 +1,341 @@
+import pygame as pg
+from OpenGL.GL import (glBindBuffer, glBindFramebuffer, glBindTexture, glBlendFunc, glBlendFuncSeparate,
+                       glBufferData, glCheckFramebufferStatus, glClear, glClearColor, glColor4f,
+                       glColorPointer, glDeleteFramebuffers, glDeleteTextures, glDisable,
+                       glDisableClientState, glDrawArrays, glEnable, glEnableClientState,
+                       glFramebufferTexture2D, glGenBuffers, glGenFramebuffers, glGenTextures, glGetFloatv,
+                       glGetIntegerv, glLoadIdentity, glMatrixMode, glOrtho, glPixelStorei, glPopMatrix,
+                       glPushMatrix, glTexCoordPointer, glTexImage2D, glTexParameteri, glVertexPointer,
+                       glViewport, GL_ARRAY_BUFFER, GL_COLOR_ARRAY, GL_COLOR_ATTACHMENT0, GL_COLOR_BUFFER_BIT,
+                       GL_COLOR_CLEAR_VALUE, GL_FLOAT, GL_FRAMEBUFFER, GL_FRAMEBUFFER_COMPLETE, GL_LINEAR,
+                       GL_LINEAR_MIPMAP_LINEAR, GL_LINES, GL_MODELVIEW, GL_NEAREST, GL_ONE,
+                       GL_ONE_MINUS_SRC_ALPHA, GL_POINTS, GL_PROJECTION, GL_QUADS, GL_RGB, GL_RGB5, GL_RGBA,
+                       GL_RGBA4, GL_RGBA8, GL_SRC_ALPHA, GL_STREAM_DRAW, GL_TEXTURE_2D,
+                       GL_TEXTURE_COORD_ARRAY, GL_TEXTURE_MAG_FILTER, GL_TEXTURE_MAX_LEVEL,
+                       GL_TEXTURE_MIN_FILTER, GL_TRIANGLES, GL_UNPACK_ALIGNMENT, GL_UNSIGNED_BYTE,
+                       GL_UNSIGNED_SHORT_4_4_4_4, GL_UNSIGNED_SHORT_5_6_5, GL_VERTEX_ARRAY, GL_VIEWPORT)
+import ctypes
+import numpy as np
+from texture_formats import FORMAT_RGBA8, FORMAT_RGB565, FORMAT_RGBA4444, FORMAT_PALETTE8
+
+# Interleaved vertex layout: x, y, u, v, r, g, b, a
+VERTEX_FLOATS = 8
+VERTEX_STRIDE = VERTEX_FLOATS * 4
+WHITE = (1.0, 1.0, 1.0, 1.0)
+
+# GL internal format, pixel format and type for each texel format. GL has no
+# portable paletted textures, so palette8 is expanded to RGBA8 on upload.
+TEXTURE_UPLOAD = {
+    FORMAT_RGBA8: (GL_RGBA8, GL_RGBA, GL_UNSIGNED_BYTE),
+    FORMAT_RGB565: (GL_RGB5, GL_RGB, GL_UNSIGNED_SHORT_5_6_5),
+    FORMAT_RGBA4444: (GL_RGBA4, GL_RGBA, GL_UNSIGNED_SHORT_4_4_4_4),
+    FORMAT_PALETTE8: (GL_RGBA8, GL_RGBA, GL_UNSIGNED_BYTE),
+}
+
+# Blend modes: regular alpha blending, and "over" for premultiplied
+# colors, which is how offscreen layers are composited
+BLEND_ALPHA = 'alpha'
+BLEND_PREMULTIPLIED = 'premultiplied'
+
+class RenderTarget:
+    """
+    Offscreen image covering the screen rectangle (x, y, width, height).
+    Drawing between begin_target and end_target lands in it at the same
+    screen coordinates; uv maps its texture upright onto a quad.
+    """
+    def __init__(self, x, y, width, height, texture_id, uv, handle=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.texture_id = texture_id
+        self.uv = uv
+        self.handle = handle  # Backend data, e.g. the framebuffer object
+
+def expand_colors(colors, total, counts=None):
+    """
+    Turn a single color, one color per primitive or one color per vertex into
+    a (total, 4) float32 RGBA array.
+    """
+    colors = np.asarray(colors, dtype=np.float32)
+    if colors.ndim == 1:
+        colors = colors.reshape(1, -1)
+    if colors.shape[1] == 3:
+        colors = np.column_stack((colors, np.ones(len(colors), dtype=np.float32)))
+    if len(colors) == 1:
+        return np.broadcast_to(colors, (total, 4))
+    if counts is not None:
+        return np.repeat(colors, counts, axis=0)
+    return colors
+
+class Renderer:
+    """
+    Drawing front end shared by all renderer backends.
+    Subclasses implement add_vertices, create_texture, release_texture,
+    create_target, begin_target, end_target, clear, flush and present; the
+    shape helpers below are built on top.
+    """
+    def add_points(self, points, colors, counts=None):
+        """Queue single pixels, e.g. the output of the *_batch rasterizers"""
+        self.add_vertices(GL_POINTS, points, colors, counts=counts)
+
+    def add_lines(self, segments, colors, counts=None):
+        """Queue line segments given as rows of x1, y1, x2, y2"""
+        segments = np.asarray(segments, dtype=np.float32).reshape(-1, 4)
+        if counts is None:
+            counts = np.full(len(segments), 2)
+        self.add_vertices(GL_LINES, segments.reshape(-1, 2), colors, counts=counts)
+
+    def add_line_loop(self, vertices, color):
+        """Queue a closed outline through the given vertices"""
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 2)
+        segments = np.column_stack((vertices, np.roll(vertices, -1, axis=0)))
+        self.add_lines(segments, color)
+
+    def add_triangles(self, vertices, colors):
+        """Queue triangles given as consecutive vertex triples"""
+        self.add_vertices(GL_TRIANGLES, vertices, colors)
+
+    def add_triangle_fan(self, vertices, color):
+        """Queue a triangle fan, split into triangles so it can share a run"""
+        self.add_triangles(fan_to_triangles(vertices), color)
+
+    def add_rect(self, x, y, width, height, color):
+        """Queue a filled axis-aligned rectangle"""
+        self.add_vertices(GL_QUADS, _quad(x, y, width, height), color)
+
+    def add_rects(self, rects, colors):
+        """Queue filled rectangles given as rows of x, y, width, height, with one color or one per rectangle"""
+        x, y, width, height = np.asarray(rects, dtype=np.float32).reshape(-1, 4).T
+        corners = np.stack((x, y, x + width, y, x + width, y + height, x, y + height), axis=1)
+        self.add_vertices(GL_QUADS, corners, colors, counts=np.full(len(x), 4))
+
+    def add_textured_quad(self, texture_id, x, y, width, height, uv=(0, 0, 1, 1), color=WHITE):
+        """Queue a textured rectangle sampling the uv sub-rectangle (u0, v0, u1, v1)"""
+        u0, v0, u1, v1 = uv
+        texcoords = ((u0, v0), (u1, v0), (u1, v1), (u0, v1))
+        self.add_vertices(GL_QUADS, _quad(x, y, width, height), color, texcoords, texture_id)
+
+    def add_target(self, target):
+        """Composite a render target back onto the screen where it was drawn"""
+        u0, v0, u1, v1 = target.uv
+        texcoords = ((u0, v0), (u1, v0), (u1, v1), (u0, v1))
+        self.add_vertices(GL_QUADS, _quad(target.x, target.y, target.width, target.height), WHITE,
+                          texcoords, target.texture_id, blend=BLEND_PREMULTIPLIED)
+
+class BatchRenderer(Renderer):
+    """
+    Retained-mode renderer backed by a vertex buffer object.
+    Draw calls only append vertices; flush() uploads the whole frame with one
+    glBufferData and draws it. Consecutive primitives of the same type and
+    texture share a run, so a frame costs one glDrawArrays per run instead
+    of one glVertex call per vertex, while keeping the painter's order.
+    """
+    def __init__(self):
+        self.vbo = glGenBuffers(1)
+        self.chunks = []
+        self.runs = []  # [mode, texture_id, blend, first_vertex, vertex_count]
+        self.vertex_count = 0
+        self.pending_deletes = []
+        self.saved_state = None  # Viewport and clear color while drawing to a target
+        self.last_frame = {'vertices': 0, 'draw_calls': 0}
+
+    def add_vertices(self, mode, positions, colors=WHITE, texcoords=None, texture=None, counts=None,
+                     blend=BLEND_ALPHA):
+        """Append vertices of one primitive type to the current frame"""
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        total = len(positions)
+        if not total:
+            return
+
+        vertices = np.zeros((total, VERTEX_FLOATS), dtype=np.float32)
+        vertices[:, 0:2] = positions
+        if texcoords is not None:
+            vertices[:, 2:4] = np.asarray(texcoords, dtype=np.float32).reshape(-1, 2)
+        vertices[:, 4:8] = expand_colors(colors, total, counts)
+        self.chunks.append(vertices)
+
+        # Extend the previous run when nothing changes between the two
+        if self.runs and self.runs[-1][:3] == [mode, texture, blend]:
+            self.runs[-1][4] += total
+        else:
+            self.runs.append([mode, texture, blend, self.vertex_count, total])
+        self.vertex_count += total
+
+    def create_texture(self, image_data, width, height, texel_format=FORMAT_RGBA8, palette=None, mipmaps=()):
+        """
+        Upload a top-row-first image as a texture and return its id.
+        image_data holds texels of texel_format (RGBA bytes by default) and
+        mipmaps the data of each smaller level, halving down from level 1.
+        Buffers such as memory-mapped arrays are passed to GL without copying.
+        """
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR if mipmaps else GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(mipmaps))
+
+        internal_format, pixel_format, pixel_type = TEXTURE_UPLOAD[texel_format]
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)  # 16-bit and 8-bit rows are not padded
+        for level, data in enumerate((image_data,) + tuple(mipmaps)):
+            level_w, level_h = max(width >> level, 1), max(height >> level, 1)
+            if texel_format == FORMAT_PALETTE8:
+                indices = np.frombuffer(data, dtype=np.uint8, count=level_w * level_h)
+                data = np.asarray(palette, dtype=np.uint8).reshape(-1, 4)[indices]
+            glTexImage2D(GL_TEXTURE_2D, level, internal_format, level_w, level_h, 0,
+                         pixel_format, pixel_type, data)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        return texture_id
+
+    def release_texture(self, texture_id):
+        """Delete a texture once the queued draws that may use it are flushed"""
+        self.pending_deletes.append(texture_id)
+
+    def flush(self):
+        """Upload the queued vertices and draw every run"""
+        if self.runs:
+            data = np.concatenate(self.chunks)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STREAM_DRAW)
+
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glVertexPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+            glTexCoordPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(8))
+            glColorPointer(4, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(16))
+
+            for mode, texture_id, blend, first, count in self.runs:
+                if texture_id is None:
+                    glDisable(GL_TEXTURE_2D)
+                else:
+                    glEnable(GL_TEXTURE_2D)
+                    glBindTexture(GL_TEXTURE_2D, texture_id)
+                if blend == BLEND_PREMULTIPLIED:
+                    glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+                    glDrawArrays(mode, first, count)
+                    self._set_blend()
+                else:
+                    glDrawArrays(mode, first, count)
+
+            glDisable(GL_TEXTURE_2D)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glColor4f(*WHITE)  # Reset color
+
+        self.last_frame = {'vertices': self.vertex_count, 'draw_calls': len(self.runs)}
+        self.chunks.clear()
+        self.runs.clear()
+        self.vertex_count = 0
+
+        if self.pending_deletes:
+            glDeleteTextures(self.pending_deletes)
+            self.pending_deletes.clear()
+
+    def create_target(self, x, y, width, height):
+        """Create a framebuffer object with a texture covering the given screen rectangle"""
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+
+        framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, texture_id, 0)
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Framebuffer incomplete: 0x{status:x}")
+
+        # GL textures are stored bottom row first, so sample them flipped
+        return RenderTarget(x, y, width, height, texture_id, (0, 1, 1, 0), framebuffer)
+
+    def begin_target(self, target, clear_color=(0, 0, 0, 0)):
+        """Redirect drawing into target, clearing it first"""
+        self.flush()
+        self.saved_state = (glGetIntegerv(GL_VIEWPORT), glGetFloatv(GL_COLOR_CLEAR_VALUE))
+        glBindFramebuffer(GL_FRAMEBUFFER, target.handle)
+        glViewport(0, 0, target.width, target.height)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(target.x, target.x + target.width, target.y + target.height, target.y, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glClearColor(*clear_color)
+        glClear(GL_COLOR_BUFFER_BIT)
+        self._set_blend()
+
+    def end_target(self):
+        """Finish drawing into the current target and return to the screen"""
+        self.flush()
+        viewport, clear_color = self.saved_state
+        self.saved_state = None
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glViewport(*viewport)
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glClearColor(*clear_color)
+        self._set_blend()
+
+    def release_target(self, target):
+        """Delete a target's framebuffer object and texture"""
+        self.flush()
+        glDeleteFramebuffers(1, [target.handle])
+        glDeleteTextures([target.texture_id])
+
+    def _set_blend(self):
+        """
+        Regular alpha blending on screen. Inside a target the alpha channel
+        accumulates coverage instead, which leaves the target holding
+        premultiplied colors ready to composite with BLEND_PREMULTIPLIED.
+        """
+        if self.saved_state is None:
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        else:
+            glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+    def clear(self):
+        """Clear the color buffer to the current clear color"""
+        glClear(GL_COLOR_BUFFER_BIT)
+
+    def present(self):
+        """Flush the frame and show it"""
+        self.flush()
+        pg.display.flip()
+
+def fan_to_triangles(vertices):
+    """Split triangle-fan vertices into an (N, 3, 2) array of separate triangles"""
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 2)
+    if len(vertices) < 3:
+        return np.empty((0, 3, 2), dtype=np.float32)
+    triangles = np.empty((len(vertices) - 2, 3, 2), dtype=np.float32)
+    triangles[:, 0] = vertices[0]
+    triangles[:, 1] = vertices[1:-1]
+    triangles[:, 2] = vertices[2:]
+    return triangles
+
+def _quad(x, y, width, height):
+    """Corner positions of an axis-aligned rectangle, counter-clockwise"""
+    return ((x, y), (x + width, y), (x + width, y + height), (x, y + height))
+
+_active_renderer = None
+
+def get_renderer():
+    """Get the renderer used by all drawing helpers, creating it on first use"""
+    global _active_renderer
+    if _active_renderer is None:
+        _active_renderer = BatchRenderer()
+    return _active_renderer
+
+def set_renderer(renderer):
+    """
+    Replace the renderer used by all drawing helpers, e.g. with a
+    software_renderer.SoftwareRenderer for headless rendering.
+    """
+    global _active_renderer
+    _active_renderer = renderer
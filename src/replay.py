@@ -0,0 +1,171 @@
+import hashlib
+import struct
+import time
+import zlib
+import numpy as np
+
+# A log is a header followed by a zlib stream of records: one per tick
+# with its length and the keys pressed before it, one with the keys
+# pressed after the last tick, and a closing record with the tick count
+# and a fingerprint of the game state at the end
+MAGIC = b"TZDR"
+VERSION = 2
+HEADER = struct.Struct("<4sHQ")  # Magic, version, seed
+TICK = struct.Struct("<dH")  # dt, length of the UTF-8 keys that follow
+KEYS = struct.Struct("<H")  # Length of the UTF-8 keys that follow
+END = struct.Struct("<I20s")  # Ticks, fingerprint
+TICK_RECORD, KEYS_RECORD, END_RECORD = b"T", b"K", b"E"
+
+def fingerprint(game):
+    """Digest of the game state a replay must reproduce exactly"""
+    digest = hashlib.sha1()
+    digest.update(struct.pack("<ddiQ", game.game_time, game.health_system.current_health,
+                              game.score_system.score, game.zombies.spawned))
+    # Particles are left out: they are cosmetic, and how many start depends on the drawing quality
+    stores = [(game.zombies, ('x', 'speed', 'serial')), (game.bullets, ('x', 'y')), (game.powerups, ('x', 'y', 'type'))]
+    for store, names in stores:
+        for name in names:
+            digest.update(np.ascontiguousarray(store[name]).tobytes())
+    digest.update("\0".join(game.zombies['word']).encode())
+    return digest.digest()
+
+class InputRecorder:
+    """
+    Writes a game's seed, the keys pressed and the length of every tick to
+    a compact binary log. Call key() for each key the game gets and tick()
+    after each update; keys are stored with the tick that follows them.
+    """
+    def __init__(self, path, seed):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self.compressor = zlib.compressobj(9)
+        self.keys = []
+        self.ticks = 0
+
+    def key(self, char):
+        self.keys.append(char)
+
+    def tick(self, dt):
+        keys = "".join(self.keys).encode("utf-8")
+        self.file.write(self.compressor.compress(TICK_RECORD + TICK.pack(dt, len(keys)) + keys))
+        self.keys.clear()
+        self.ticks += 1
+
+    def close(self, game):
+        """Finish the log with the keys no tick followed, the tick count and the final state of game"""
+        keys = "".join(self.keys).encode("utf-8")
+        self.file.write(self.compressor.compress(KEYS_RECORD + KEYS.pack(len(keys)) + keys))
+        self.keys.clear()
+        self.file.write(self.compressor.compress(END_RECORD + END.pack(self.ticks, fingerprint(game))))
+        self.file.write(self.compressor.flush())
+        self.file.close()
+
+class InputLog:
+    """A recorded session: its seed, (dt, keys) for every tick and the keys pressed after the last"""
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an input log this version can replay")
+        records = zlib.decompress(data[HEADER.size:])
+        self.ticks = []
+        self.keys = ""
+        self.fingerprint = None  # Missing if the recording was cut short
+        offset = 0
+        while offset < len(records):
+            kind = records[offset:offset + 1]
+            offset += 1
+            if kind == TICK_RECORD:
+                dt, length = TICK.unpack_from(records, offset)
+                offset += TICK.size
+                self.ticks.append((dt, records[offset:offset + length].decode("utf-8")))
+                offset += length
+            elif kind == KEYS_RECORD:
+                length, = KEYS.unpack_from(records, offset)
+                offset += KEYS.size
+                self.keys = records[offset:offset + length].decode("utf-8")
+                offset += length
+            elif kind == END_RECORD:
+                _, self.fingerprint = END.unpack_from(records, offset)
+                offset += END.size
+            else:
+                raise ValueError(f"Corrupt input log {path}")
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def play(self, game, after_tick=None):
+        """
+        Feed the recorded keys and ticks to game, a fresh Game created with
+        this log's seed, as fast as possible; after_tick() runs after every
+        tick, e.g. to draw. Returns the time each tick took, in seconds, and
+        whether the game ended in the recorded state.
+        """
+        times = np.empty(len(self.ticks))
+        for i, (dt, keys) in enumerate(self.ticks):
+            start = time.perf_counter()
+            for char in keys:
+                game.key_pressed(char)
+            game.update(dt)
+            if after_tick:
+                after_tick()
+            times[i] = time.perf_counter() - start
+        for char in self.keys:
+            game.key_pressed(char)
+        return times, self.fingerprint is None or fingerprint(game) == self.fingerprint
+
+def frame_time_report(times):
+    """Summary of per-tick times, in milliseconds, for comparing builds"""
+    ms = np.asarray(times) * 1000
+    if not len(ms):
+        return "no ticks"
+    p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+    return (f"{len(ms)} ticks in {ms.sum() / 1000:.2f} s: mean {ms.mean():.3f} ms, p50 {p50:.3f} ms, "
+            f"p95 {p95:.3f} ms, p99 {p99:.3f} ms, max {ms.max():.3f} ms")
+
+def check_round_trip(path, seed=0, ticks=400):
+    """
+    Record an autoplayed session to path that ends with keys typed after
+    its last tick, as when the window closes mid-frame, replay it and
+    return whether the replay ends in the recorded state
+    """
+    from gameplay import Game, autoplay
+    game = Game(seed=seed)
+    recorder = InputRecorder(path, seed)
+    key_pressed = game.key_pressed
+    def record_key(char):
+        recorder.key(char)
+        key_pressed(char)
+    game.key_pressed = record_key
+    type_letters = autoplay(game, 3.0)
+    for _ in range(ticks):
+        type_letters(1 / 60)
+        game.update(1 / 60)
+        recorder.tick(1 / 60)
+    type_letters(1.0)
+    recorder.close(game)
+    log = InputLog(path)
+    return log.play(Game(seed=log.seed))[1]
+
+if __name__ == "__main__":
+    import argparse
+    from gameplay import Game
+    parser = argparse.ArgumentParser(description="Replay an input log without a window and time it")
+    parser.add_argument("log", help="input log written by main.py --record")
+    parser.add_argument("--check", action="store_true",
+                        help="instead record a short scripted session to LOG and check that it replays exactly")
+    args = parser.parse_args()
+
+    if args.check:
+        matched = check_round_trip(args.log)
+        print("round trip " + ("matches" if matched else "DIFFERS"))
+        raise SystemExit(0 if matched else 1)
+
+    log = InputLog(args.log)
+    game = Game(seed=log.seed)
+    times, matched = log.play(game)
+    print(frame_time_report(times))
+    print(f"seed {log.seed}, score {game.score_system.score}, "
+          + ("state matches the recording" if matched else "STATE DIFFERS FROM THE RECORDING"))
+    raise SystemExit(0 if matched else 1)
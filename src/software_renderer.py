@@ -0,0 +1,244 @@
+import pygame as pg
+from OpenGL.GL import GL_POINTS, GL_LINES, GL_TRIANGLES, GL_QUADS
+import numpy as np
+from renderer import Renderer, RenderTarget, WHITE, BLEND_ALPHA, BLEND_PREMULTIPLIED, expand_colors
+from graphics_algorithms import dda_line_batch
+from texture_formats import FORMAT_RGBA8, decode_pixels
+
+def sample_bilinear(image, uv):
+    """
+    Sample a (height, width, 4) texture at each (u, v) row of uv the way
+    GL_LINEAR does: the four texels around the point, weighted by distance
+    from their centers, with edges clamped
+    """
+    tex_h, tex_w = image.shape[:2]
+    x = uv[:, 0] * tex_w - 0.5
+    y = uv[:, 1] * tex_h - 0.5
+    nearest_x, nearest_y = np.rint(x), np.rint(y)
+    if np.abs(x - nearest_x).max() < 1e-3 and np.abs(y - nearest_y).max() < 1e-3:
+        # Every sample is on a texel center, as when layers are drawn 1:1
+        return image[np.clip(nearest_y.astype(np.int64), 0, tex_h - 1), np.clip(nearest_x.astype(np.int64), 0, tex_w - 1)]
+    x0, y0 = np.floor(x), np.floor(y)
+    fx, fy = (x - x0).astype(np.float32)[:, None], (y - y0).astype(np.float32)[:, None]
+    x0, y0 = x0.astype(np.int64), y0.astype(np.int64)
+    u0, v0 = np.clip(x0, 0, tex_w - 1), np.clip(y0, 0, tex_h - 1)
+    u1, v1 = np.clip(x0 + 1, 0, tex_w - 1), np.clip(y0 + 1, 0, tex_h - 1)
+    top = image[v0, u0] + (image[v0, u1] - image[v0, u0]) * fx
+    bottom = image[v1, u0] + (image[v1, u1] - image[v1, u0]) * fx
+    return top + (bottom - top) * fy
+
+class SoftwareRenderer(Renderer):
+    """
+    Renderer backend that rasterizes straight into a NumPy RGBA framebuffer.
+    Install it with renderer.set_renderer() to draw frames without a display
+    or GL context. Blending matches glBlendFunc(GL_SRC_ALPHA,
+    GL_ONE_MINUS_SRC_ALPHA) on all four channels, points and lines cover the
+    same pixels the DDA/midpoint rasterizers emit, and textures are sampled
+    bilinearly like GL_LINEAR. Render targets are extra framebuffers that also
+    serve as textures, blended the same way as GL framebuffer objects.
+    """
+    def __init__(self, width=640, height=480, clear_color=(0.1, 0.2, 0.2, 1)):
+        self.width = width
+        self.height = height
+        self.clear_color = np.array(clear_color, dtype=np.float32)
+        self.framebuffer = np.empty((height, width, 4), dtype=np.float32)
+        self.screen = self.framebuffer
+        self.origin = (0, 0)  # Screen position of the framebuffer's top-left pixel
+        self.textures = {}
+        self.next_texture_id = 1
+        self.pending_deletes = []
+        self.vertex_count = 0
+        self.draw_calls = 0
+        self.last_frame = {'vertices': 0, 'draw_calls': 0}
+        self.clear()
+
+    def add_vertices(self, mode, positions, colors=WHITE, texcoords=None, texture=None, counts=None,
+                     blend=BLEND_ALPHA):
+        """Rasterize vertices of one primitive type into the framebuffer"""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2) - self.origin
+        total = len(positions)
+        if not total:
+            return
+        colors = np.clip(expand_colors(colors, total, counts), 0, 1)
+        if texcoords is not None:
+            texcoords = np.asarray(texcoords, dtype=np.float64).reshape(-1, 2)
+
+        if mode == GL_POINTS:
+            self._blend(np.floor(positions[:, 0]), np.floor(positions[:, 1]), colors, blend=blend)
+        elif mode == GL_LINES:
+            # Lines use the DDA rasterizer and the color of their first vertex
+            points, line_counts = dda_line_batch(positions.reshape(-1, 4))
+            self._blend(points[:, 0], points[:, 1], np.repeat(colors[0::2], line_counts, axis=0), blend=blend)
+        elif mode in (GL_TRIANGLES, GL_QUADS):
+            corners = 3 if mode == GL_TRIANGLES else 4
+            for first in range(0, total - corners + 1, corners):
+                # Quads are split into two triangles sharing the 0-2 diagonal
+                fans = ((0, 1, 2),) if corners == 3 else ((0, 1, 2), (0, 2, 3))
+                for fan in fans:
+                    index = [first + i for i in fan]
+                    uv = texcoords[index] if texcoords is not None else None
+                    self._fill_triangle(positions[index], colors[index], uv, texture, blend)
+        else:
+            raise ValueError(f"Unsupported primitive mode: {mode}")
+
+        self.vertex_count += total
+        self.draw_calls += 1
+
+    def _blend(self, xs, ys, colors, unique=False, blend=BLEND_ALPHA):
+        """
+        Alpha-blend one color per pixel, in submission order, into the
+        framebuffer. Pass unique=True when no pixel appears twice.
+        """
+        height, width = self.framebuffer.shape[:2]
+        xs = np.asarray(xs).astype(np.int64)
+        ys = np.asarray(ys).astype(np.int64)
+        visible = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        flat = (ys * width + xs)[visible]
+        colors = np.asarray(colors, dtype=np.float32)[visible]
+        if not len(flat):
+            return
+        pixels = self.framebuffer.reshape(-1, 4)
+        if unique:
+            pixels[flat] = self._blend_function(colors, pixels[flat], blend)
+            return
+
+        # Pixels hit more than once must blend one after another, so split
+        # the writes into passes by how often the pixel was already hit
+        order = np.argsort(flat, kind='stable')
+        sorted_flat = flat[order]
+        group_start = np.r_[True, sorted_flat[1:] != sorted_flat[:-1]]
+        first_index = np.maximum.accumulate(np.where(group_start, np.arange(len(flat)), 0))
+        rank = np.empty(len(flat), dtype=np.int64)
+        rank[order] = np.arange(len(flat)) - first_index
+
+        for layer in range(rank.max() + 1):
+            selected = rank == layer
+            target = flat[selected]
+            pixels[target] = self._blend_function(colors[selected], pixels[target], blend)
+
+    def _blend_function(self, source, destination, blend):
+        """
+        Blend source over destination colors. Matches the GL renderer: alpha
+        blending, with coverage accumulated in the alpha channel while drawing
+        into a render target, or "over" for premultiplied colors.
+        """
+        alpha = source[:, 3:4]
+        if blend == BLEND_PREMULTIPLIED:
+            return source + destination * (1 - alpha)
+        result = source * alpha + destination * (1 - alpha)
+        if self.framebuffer is not self.screen:
+            result[:, 3:4] = alpha + destination[:, 3:4] * (1 - alpha)
+        return result
+
+    def _fill_triangle(self, vertices, colors, texcoords=None, texture=None, blend=BLEND_ALPHA):
+        """Fill one triangle, interpolating colors and texture coordinates"""
+        (x0, y0), (x1, y1), (x2, y2) = vertices
+        area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+        if area == 0:
+            return
+
+        height, width = self.framebuffer.shape[:2]
+        left = max(int(np.floor(min(x0, x1, x2))), 0)
+        right = min(int(np.ceil(max(x0, x1, x2))), width)
+        top = max(int(np.floor(min(y0, y1, y2))), 0)
+        bottom = min(int(np.ceil(max(y0, y1, y2))), height)
+        if left >= right or top >= bottom:
+            return
+
+        # Sample at pixel centers, like the GL rasterizer
+        px, py = np.meshgrid(np.arange(left, right) + 0.5, np.arange(top, bottom) + 0.5)
+        sign = 1 if area > 0 else -1
+        weights = []
+        for (ax, ay), (bx, by) in (((x1, y1), (x2, y2)), ((x2, y2), (x0, y0)), ((x0, y0), (x1, y1))):
+            edge = sign * ((bx - ax) * (py - ay) - (by - ay) * (px - ax))
+            # Top-left rule: pixels exactly on a shared edge belong to one triangle only
+            dx, dy = sign * (bx - ax), sign * (by - ay)
+            owns_edge = dy > 0 or (dy == 0 and dx < 0)
+            weights.append((edge, owns_edge))
+
+        inside = np.ones(px.shape, dtype=bool)
+        for edge, owns_edge in weights:
+            inside &= (edge > 0) | ((edge == 0) & owns_edge)
+        if not inside.any():
+            return
+
+        # Barycentric weights of the covered pixel centers
+        w0 = weights[0][0][inside] / abs(area)
+        w1 = weights[1][0][inside] / abs(area)
+        w2 = weights[2][0][inside] / abs(area)
+        barycentric = np.column_stack((w0, w1, w2))
+        pixel_colors = barycentric @ colors
+
+        if texture is not None:
+            pixel_colors = pixel_colors * sample_bilinear(self.textures[texture], barycentric @ texcoords)
+
+        self._blend(px[inside] - 0.5, py[inside] - 0.5, pixel_colors, unique=True, blend=blend)
+
+    def create_texture(self, image_data, width, height, texel_format=FORMAT_RGBA8, palette=None, mipmaps=()):
+        """
+        Keep a top-row-first image as a float RGBA texture and return its id.
+        Sampling is bilinear at full resolution, so mip levels are ignored.
+        """
+        texture_id = self.next_texture_id
+        self.next_texture_id += 1
+        image = decode_pixels(image_data, width, height, texel_format, palette)
+        self.textures[texture_id] = image.astype(np.float32) / 255
+        return texture_id
+
+    def release_texture(self, texture_id):
+        """Forget a texture at the end of the frame"""
+        self.pending_deletes.append(texture_id)
+
+    def create_target(self, x, y, width, height):
+        """Create a framebuffer for the given screen rectangle that doubles as a texture"""
+        texture_id = self.next_texture_id
+        self.next_texture_id += 1
+        self.textures[texture_id] = np.zeros((height, width, 4), dtype=np.float32)
+        return RenderTarget(x, y, width, height, texture_id, (0, 0, 1, 1))
+
+    def begin_target(self, target, clear_color=(0, 0, 0, 0)):
+        """Redirect drawing into target, clearing it first"""
+        self.framebuffer = self.textures[target.texture_id]
+        self.framebuffer[:] = clear_color
+        self.origin = (target.x, target.y)
+
+    def end_target(self):
+        """Finish drawing into the current target and return to the screen"""
+        self.framebuffer = self.screen
+        self.origin = (0, 0)
+
+    def release_target(self, target):
+        """Forget a target's framebuffer"""
+        self.release_texture(target.texture_id)
+
+    def flush(self):
+        """Finish the frame; drawing already happened as vertices were added"""
+        self.last_frame = {'vertices': self.vertex_count, 'draw_calls': self.draw_calls}
+        self.vertex_count = 0
+        self.draw_calls = 0
+        for texture_id in self.pending_deletes:
+            self.textures.pop(texture_id, None)
+        self.pending_deletes.clear()
+
+    def clear(self):
+        """Fill the framebuffer with the clear color"""
+        self.framebuffer[:] = self.clear_color
+
+    def present(self):
+        """Finish the frame; there is no window to show it in"""
+        self.flush()
+
+    def to_rgba8(self):
+        """Get the framebuffer as an (height, width, 4) uint8 array, top row first"""
+        return (np.clip(self.framebuffer, 0, 1) * 255 + 0.5).astype(np.uint8)
+
+    def save_png(self, path):
+        """Write the framebuffer to a PNG file"""
+        surface = pg.image.frombuffer(self.to_rgba8().tobytes(), (self.width, self.height), 'RGBA')
+        pg.image.save(surface, path)
+
+def load_png(path):
+    """Read a PNG file into an (height, width, 4) uint8 array, top row first"""
+    surface = pg.image.load(path)
+    width, height = surface.get_size()
+    return np.frombuffer(pg.image.tostring(surface, 'RGBA'), dtype=np.uint8).reshape(height, width, 4)
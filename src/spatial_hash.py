@@ -0,0 +1,92 @@
+import numpy as np
+
+def _expand(counts):
+    """For groups of the given sizes, the group index and offset within the group of every member"""
+    groups = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(groups)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return groups, offsets
+
+def _key(cell_x, cell_y):
+    """One integer per cell"""
+    return cell_x * (1 << 32) + cell_y
+
+class SpatialHash:
+    """
+    Uniform grid broad-phase for axis-aligned boxes given as rows of x0, y0,
+    x1, y1. build() files every box under each grid cell it touches, once
+    per tick; query() then finds the boxes overlapping a batch of query
+    boxes by looking only at the cells those touch, so the cost grows with
+    the number of boxes and actual neighbours instead of their product.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.build(())
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset all counters to zero"""
+        self.stats = {
+            'queries': 0,
+            'candidates': 0,
+            'overlaps': 0
+        }
+
+    def _cell(self, points):
+        """Cell coordinates of points given as rows of x, y"""
+        return np.floor(points / self.cell_size).astype(np.int64)
+
+    def _cells(self, boxes):
+        """Key of every cell each box touches, with the index of the box"""
+        low = self._cell(boxes[:, :2])
+        span = self._cell(boxes[:, 2:]) - low + 1
+        box, offset = _expand(span[:, 0] * span[:, 1])
+        return box, _key(low[box, 0] + offset // span[box, 1], low[box, 1] + offset % span[box, 1])
+
+    def build(self, boxes):
+        """Replace the contents of the grid with boxes; their row numbers are what queries return"""
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(self.boxes):
+            self.extent = np.concatenate((self.boxes[:, :2].min(axis=0), self.boxes[:, 2:].max(axis=0)))
+        else:
+            self.extent = np.zeros(4)
+        box, keys = self._cells(self.boxes)
+        order = np.argsort(keys, kind='stable')
+        self.entries = box[order]  # Box indices grouped by cell
+        # Occupied cells in key order, with where their entries start and how many there are
+        keys = keys[order]
+        self.starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1))
+        self.keys = keys[self.starts]
+        self.counts = np.diff(self.starts, append=len(keys))
+
+    def query(self, boxes):
+        """
+        Find every pair of a query box and a box in the grid that overlap,
+        edges included. Returns (query_indices, box_indices), sorted by query.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.stats['queries'] += len(boxes)
+        if not len(boxes) or not len(self.keys):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # Clip to the extent of the grid so long query boxes only visit occupied cells
+        query, keys = self._cells(boxes.clip(np.tile(self.extent[:2], 2), np.tile(self.extent[2:], 2)))
+        slot = np.searchsorted(self.keys, keys).clip(max=len(self.keys) - 1)
+        found = self.keys[slot] == keys
+        query, slot, keys = query[found], slot[found], keys[found]
+        member, offset = _expand(self.counts[slot])
+        query, keys = query[member], keys[member]
+        candidate = self.entries[self.starts[slot][member] + offset]
+
+        a, b = boxes[query], self.boxes[candidate]
+        overlap = (a[:, 0] <= b[:, 2]) & (a[:, 2] >= b[:, 0]) & (a[:, 1] <= b[:, 3]) & (a[:, 3] >= b[:, 1])
+        # Boxes sharing several cells meet in each of them; only the cell
+        # holding the top-left corner of their intersection reports the pair
+        corner = self._cell(np.maximum(a[:, :2], b[:, :2]))
+        overlap &= _key(corner[:, 0], corner[:, 1]) == keys
+        self.stats['candidates'] += len(candidate)
+        self.stats['overlaps'] += int(overlap.sum())
+        return query[overlap], candidate[overlap]
+
+    def query_box(self, x0, y0, x1, y1):
+        """Indices of the boxes overlapping one box"""
+        return self.query((x0, y0, x1, y1))[1]
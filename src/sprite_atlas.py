@@ -0,0 +1,107 @@
+import numpy as np
+from pathlib import Path
+from collections import namedtuple
+from renderer import get_renderer
+from asset_cache import load_images, texture_cache
+
+# A sub-rectangle of an atlas texture, uv given as (u0, v0, u1, v1)
+Sprite = namedtuple('Sprite', ['texture_id', 'uv', 'width', 'height'])
+
+def pack_rectangles(sizes, max_width=2048, padding=2, power_of_two=True):
+    """
+    Shelf-pack rectangles, tallest first, into rows no wider than max_width.
+    sizes: list of (width, height). Returns (positions, atlas_width,
+    atlas_height) with one (x, y) per size, in input order; the atlas size
+    is rounded up to powers of two, or trimmed to what the rectangles use.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = used_width = 0
+    for i in order:
+        width, height = sizes[i]
+        if width + padding > max_width:
+            raise ValueError(f"Rectangle of width {width} does not fit an atlas {max_width} wide")
+        if x + width + padding > max_width:
+            # Start a new shelf below the tallest rectangle of this one
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        positions[i] = (x + padding // 2, y + padding // 2)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+        used_width = max(used_width, x)
+
+    atlas_width, atlas_height = max(used_width, 1), max(y + shelf_height, 1)
+    if power_of_two:
+        atlas_width = 1 << (atlas_width - 1).bit_length()
+        atlas_height = 1 << (atlas_height - 1).bit_length()
+    return positions, atlas_width, atlas_height
+
+def compose_atlas(images, max_width=2048, power_of_two=True):
+    """
+    Pack images into one atlas image. images: dict of name -> (height,
+    width, 4) uint8 RGBA array, top row first. Returns (pixels, rects) with
+    rects mapping each name to its (x, y, width, height) in the atlas.
+    """
+    names = list(images)
+    sizes = [(images[name].shape[1], images[name].shape[0]) for name in names]
+    positions, atlas_width, atlas_height = pack_rectangles(sizes, max_width, power_of_two=power_of_two)
+
+    pixels = np.zeros((atlas_height, atlas_width, 4), dtype=np.uint8)
+    rects = {}
+    for name, (x, y), (width, height) in zip(names, positions, sizes):
+        pixels[y:y + height, x:x + width] = images[name]
+        rects[name] = (x, y, width, height)
+    return pixels, rects
+
+class SpriteAtlas:
+    """
+    Named sprites packed into shared textures, so sprites drawn one after
+    another share a texture and end up in a single renderer draw call.
+    """
+    def __init__(self):
+        self.sprites = {}
+        self.texture_ids = []
+
+    def add_texture(self, texture_id, width, height, rects):
+        """Register sprites living in a texture; rects: name -> (x, y, width, height)"""
+        self.texture_ids.append(texture_id)
+        # Inset uvs by half a texel so linear filtering never reads a neighbour
+        for name, (x, y, sprite_w, sprite_h) in rects.items():
+            uv = ((x + 0.5) / width, (y + 0.5) / height,
+                  (x + sprite_w - 0.5) / width, (y + sprite_h - 0.5) / height)
+            self.sprites[name] = Sprite(texture_id, uv, sprite_w, sprite_h)
+
+    @classmethod
+    def from_images(cls, images, max_width=2048):
+        """Pack images (name -> RGBA array) into one texture and upload it"""
+        pixels, rects = compose_atlas(images, max_width)
+        height, width = pixels.shape[:2]
+        atlas = cls()
+        atlas.add_texture(get_renderer().create_texture(pixels, width, height), width, height, rects)
+        return atlas
+
+    @classmethod
+    def from_directory(cls, directory, pattern="*.png", names=None, max_width=2048, cache=texture_cache):
+        """
+        Build an atlas from every matching image, named by file stem, or only
+        those whose stem is in names. Images are decoded (or mapped from the
+        decoded image cache) on worker threads; packing and the upload happen
+        on the calling thread.
+        """
+        paths = sorted(Path(directory).glob(pattern))
+        if names is not None:
+            paths = [path for path in paths if path.stem in names]
+        pixels = load_images(paths, cache)
+        return cls.from_images({path.stem: pixels[path] for path in paths}, max_width)
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """Upload every texture of a prebuilt AssetBundle with its mip levels"""
+        atlas = cls()
+        for name in bundle.textures:
+            entry = bundle.textures[name]
+            atlas.add_texture(bundle.upload(name), entry['width'], entry['height'], entry['sprites'])
+        return atlas
+
+    def __getitem__(self, name):
+        return self.sprites[name]
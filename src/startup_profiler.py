@@ -0,0 +1,55 @@
+import json
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """
+    Records named phases of startup on one timeline, measured from when this
+    module was first imported, and writes them as a Chrome trace JSON file
+    that chrome://tracing or Perfetto can open.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = []  # (name, start, end) in seconds since origin
+        self.marks = {}   # name -> seconds since origin
+
+    def now(self):
+        """Seconds since the profiler was created"""
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with block as a phase"""
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, self.now()))
+
+    def record(self, name, start, end=None):
+        """Add a phase that already happened, ending now unless end is given"""
+        self.phases.append((name, start, self.now() if end is None else end))
+
+    def mark(self, name):
+        """Record a point in time, e.g. the first presented frame"""
+        self.marks[name] = self.now()
+        return self.marks[name]
+
+    def summary(self):
+        """Phases and marks in milliseconds"""
+        return {
+            'phases': [{'name': name, 'start_ms': round(start * 1000, 3),
+                        'duration_ms': round((end - start) * 1000, 3)} for name, start, end in self.phases],
+            'marks': {name: round(when * 1000, 3) for name, when in self.marks.items()},
+        }
+
+    def write(self, path):
+        """Write the timeline as Chrome trace events, with the summary alongside"""
+        events = [{'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': (end - start) * 1e6, 'pid': 0, 'tid': 0}
+                  for name, start, end in self.phases]
+        events += [{'name': name, 'ph': 'i', 's': 'g', 'ts': when * 1e6, 'pid': 0, 'tid': 0}
+                   for name, when in self.marks.items()]
+        with open(path, "w") as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'startup': self.summary()}, file, indent=1)
+
+profiler = StartupProfiler()
@@ -1,25 +1,114 @@
 import pygame as pg
-from OpenGL.GL import *
+import numpy as np
+from OpenGL.GL import GL_QUADS
+from renderer import get_renderer
 
-def render_text(text, font_size=24, color=(255, 255, 255)):
-    font = pg.font.SysFont('Arial', font_size)
+FIRST_GLYPH = 32   # Space
+LAST_GLYPH = 126   # Tilde
+ATLAS_WIDTH = 512
 
-    # Render with anti-aliasing, white text, and transparent background
-    text_surface = font.render(text, True, color)
-    text_surface = text_surface.convert_alpha()  # Keep transparency
+_fonts = {}
+_atlases = {}
 
-    # Flip vertically for OpenGL
-    text_surface = pg.transform.flip(text_surface, False, True)
+def get_font(face='Arial', size=24):
+    """Get a font object, cached by (face, size) so system fonts are only looked up once"""
+    font = _fonts.get((face, size))
+    if font is None:
+        if not pg.font.get_init():
+            pg.font.init()
+        font = _fonts[(face, size)] = pg.font.SysFont(face, size)
+    return font
 
-    texture_data = pg.image.tostring(text_surface, "RGBA", True)
-    width, height = text_surface.get_size()
+class GlyphAtlas:
+    """
+    All printable ASCII glyphs of one font, rasterized once into a single
+    texture. Glyphs are white; text color comes from the vertex color.
+    Characters outside the atlas are added on first use and the texture is
+    rebuilt, which only ever happens once per character.
+    """
+    def __init__(self, font):
+        self.font = font
+        self.height = font.get_height()
+        self.texture_id = None
+        self.glyphs = {}  # char -> (u0, v0, u1, v1, width)
+        self._build(chr(code) for code in range(FIRST_GLYPH, LAST_GLYPH + 1))
 
-    tex_id = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, tex_id)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
+    def _build(self, chars):
+        """Pack the glyphs on shelves of one line each and upload the atlas"""
+        surfaces = {char: self.font.render(char, True, (255, 255, 255)) for char in chars}
+        surfaces.update({char: self.font.render(char, True, (255, 255, 255)) for char in self.glyphs})
 
-    return tex_id, width, height
+        # Lay out glyphs left to right with a pixel of padding, wrapping rows
+        positions = {}
+        x, y = 0, 0
+        for char, surface in surfaces.items():
+            width = surface.get_width()
+            if x + width + 1 > ATLAS_WIDTH:
+                x, y = 0, y + self.height + 1
+            positions[char] = (x, y)
+            x += width + 1
+        atlas_height = y + self.height
 
+        # Transparent white background so blending keeps glyph edges white
+        atlas = pg.Surface((ATLAS_WIDTH, atlas_height), pg.SRCALPHA)
+        atlas.fill((255, 255, 255, 0))
+        self.glyphs = {}
+        for char, surface in surfaces.items():
+            gx, gy = positions[char]
+            atlas.blit(surface, (gx, gy))
+            width = surface.get_width()
+            self.glyphs[char] = (gx / ATLAS_WIDTH, gy / atlas_height,
+                                 (gx + width) / ATLAS_WIDTH, (gy + self.height) / atlas_height, width)
 
+        renderer = get_renderer()
+        if self.texture_id is not None:
+            renderer.release_texture(self.texture_id)
+        self.texture_id = renderer.create_texture(pg.image.tostring(atlas, "RGBA"), ATLAS_WIDTH, atlas_height)
+
+    def _ensure_glyphs(self, text):
+        """Add any characters of text that are not in the atlas yet"""
+        missing = set(text) - self.glyphs.keys()
+        if missing:
+            self._build(missing)
+
+    def measure(self, text):
+        """Width and height of text in pixels"""
+        self._ensure_glyphs(text)
+        return sum(self.glyphs[char][4] for char in text), self.height
+
+    def draw(self, text, x, y, color=(1.0, 1.0, 1.0, 1.0)):
+        """Queue text as one textured quad per glyph, all in a single batch"""
+        self._ensure_glyphs(text)
+        if not text:
+            return 0, self.height
+
+        glyphs = np.array([self.glyphs[char] for char in text], dtype=np.float32)
+        u0, v0, u1, v1, widths = glyphs.T
+        left = x + np.concatenate(([0], np.cumsum(widths)[:-1]))
+        right = left + widths
+        top = np.full(len(text), y, dtype=np.float32)
+        bottom = top + self.height
+
+        positions = np.stack((left, top, right, top, right, bottom, left, bottom), axis=1)
+        texcoords = np.stack((u0, v0, u1, v0, u1, v1, u0, v1), axis=1)
+        get_renderer().add_vertices(GL_QUADS, positions, color, texcoords.reshape(-1, 2), self.texture_id)
+        return float(widths.sum()), self.height
+
+def get_atlas(font_size=24, face='Arial'):
+    """Get the glyph atlas for a font, building it on first use"""
+    atlas = _atlases.get((face, font_size))
+    if atlas is None:
+        atlas = _atlases[(face, font_size)] = GlyphAtlas(get_font(face, font_size))
+    return atlas
+
+def measure_text(text, font_size=24, face='Arial'):
+    """Size of text in pixels as (width, height)"""
+    return get_atlas(font_size, face).measure(text)
+
+def draw_text(text, x, y, font_size=24, color=(255, 255, 255), face='Arial'):
+    """
+    Draw text with its top-left corner at (x, y) from the cached glyph atlas.
+    color uses 0-255 components like pygame. Returns (width, height).
+    """
+    rgba = tuple(component / 255 for component in color)
+    return get_atlas(font_size, face).draw(text, x, y, rgba)
@@ -1,5 +1,5 @@
 import pygame as pg
-from OpenGL.GL import *
+from renderer import get_renderer
 
 def load_texture(path):
     image = pg.image.load(path)
@@ -7,40 +7,16 @@ def load_texture(path):
     image_data = pg.image.tostring(image, "RGBA", True)
     width, height = image.get_size()
 
-    texture_id = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, texture_id)
-
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0,
-                 GL_RGBA, GL_UNSIGNED_BYTE, image_data)
-
+    texture_id = get_renderer().create_texture(image_data, width, height)
     return texture_id, width, height
 
 def draw_texture(texture_id, x, y, w, h):
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, texture_id)
+    get_renderer().add_textured_quad(texture_id, x, y, w, h)
     
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(x, y)
-    glTexCoord2f(1, 0); glVertex2f(x + w, y)
-    glTexCoord2f(1, 1); glVertex2f(x + w, y + h)
-    glTexCoord2f(0, 1); glVertex2f(x, y + h)
-    glEnd()
-    
-    glDisable(GL_TEXTURE_2D)
+def draw_sprite(sprite, x, y, w, h):
+    """Draw an atlas sprite; consecutive sprites of one atlas share a draw call"""
+    get_renderer().add_textured_quad(sprite.texture_id, x, y, w, h, uv=sprite.uv)
     
 def draw_rectangle(x, y, width, height, color=(1, 1, 1), alpha=1.0):
     """Draw a rectangle with optional alpha transparency"""
-    glColor4f(color[0], color[1], color[2], alpha)
-    glBegin(GL_QUADS)
-    glVertex2f(x, y)
-    glVertex2f(x + width, y)
-    glVertex2f(x + width, y + height)
-    glVertex2f(x, y + height)
-    glEnd()
-    glColor3f(1, 1, 1)  # Reset color to white
-
-    
-       
\ No newline at end of file
+    get_renderer().add_rect(x, y, width, height, (color[0], color[1], color[2], alpha))
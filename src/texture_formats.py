@@ -0,0 +1,126 @@
+import numpy as np
+
+# Texel formats a texture can be stored and uploaded in
+FORMAT_RGBA8 = 'rgba8'        # 4 bytes per texel
+FORMAT_RGB565 = 'rgb565'      # 2 bytes, no alpha
+FORMAT_RGBA4444 = 'rgba4444'  # 2 bytes
+FORMAT_PALETTE8 = 'palette8'  # 1 byte index into a 256 color RGBA palette
+FORMATS = (FORMAT_RGBA8, FORMAT_RGB565, FORMAT_RGBA4444, FORMAT_PALETTE8)
+
+BYTES_PER_TEXEL = {FORMAT_RGBA8: 4, FORMAT_RGB565: 2, FORMAT_RGBA4444: 2, FORMAT_PALETTE8: 1}
+# Bytes per texel once uploaded: GL has no portable paletted textures, so
+# palette8 only saves space on disk and takes as much memory as RGBA8
+UPLOADED_BYTES_PER_TEXEL = {FORMAT_RGBA8: 4, FORMAT_RGB565: 2, FORMAT_RGBA4444: 2, FORMAT_PALETTE8: 4}
+
+def _reduce(channel, bits):
+    """Round 8-bit channel values to the given number of bits"""
+    top = (1 << bits) - 1
+    return (channel.astype(np.uint32) * top + 127) // 255
+
+def _expand(channel, bits):
+    """Scale channel values of the given number of bits back to 8 bits"""
+    top = (1 << bits) - 1
+    return ((channel.astype(np.uint32) * 255 + top // 2) // top).astype(np.uint8)
+
+def quantize(rgba, colors=256):
+    """
+    Pick a palette of at most `colors` RGBA colors for an image. Images with
+    few enough distinct colors get an exact palette; otherwise the most
+    common colors at 4 bits per channel are used, each averaged over the
+    pixels that fall into it. Returns a (colors, 4) uint8 palette.
+    """
+    pixels = np.ascontiguousarray(rgba).reshape(-1, 4)
+    unique = np.unique(pixels.view(np.uint32))
+    palette = np.zeros((colors, 4), dtype=np.uint8)
+    if len(unique) <= colors:
+        palette[:len(unique)] = unique.view(np.uint8).reshape(-1, 4)
+        return palette
+
+    reduced = (pixels >> 4).astype(np.int64)
+    bins = (reduced[:, 0] << 12) | (reduced[:, 1] << 8) | (reduced[:, 2] << 4) | reduced[:, 3]
+    counts = np.bincount(bins, minlength=1 << 16)
+    popular = np.argsort(counts)[::-1][:colors]
+    popular = popular[counts[popular] > 0]
+    for channel in range(4):
+        sums = np.bincount(bins, weights=pixels[:, channel], minlength=1 << 16)
+        palette[:len(popular), channel] = np.rint(sums[popular] / counts[popular])
+    return palette
+
+def palette_indices(rgba, palette):
+    """Map every pixel to the index of the nearest palette color"""
+    pixels = np.ascontiguousarray(rgba).reshape(-1, 4)
+    unique, inverse = np.unique(pixels.view(np.uint32), return_inverse=True)
+    unique = unique.view(np.uint8).reshape(-1, 4).astype(np.int32)
+    nearest = np.empty(len(unique), dtype=np.uint8)
+    # Compare distinct colors only, in chunks to bound the distance matrix
+    for start in range(0, len(unique), 4096):
+        chunk = unique[start:start + 4096, None, :] - palette[None, :, :].astype(np.int32)
+        nearest[start:start + 4096] = np.argmin((chunk * chunk).sum(axis=2), axis=1)
+    return nearest[inverse.reshape(-1)].reshape(rgba.shape[:2])
+
+def encode_pixels(rgba, texel_format, palette=None):
+    """
+    Convert a (height, width, 4) uint8 RGBA image to texel_format. Returns
+    a C-contiguous array ready to upload: uint8 RGBA, uint16 packed texels
+    or uint8 palette indices. palette8 needs the palette from quantize().
+    """
+    rgba = np.asarray(rgba, dtype=np.uint8)
+    r, g, b, a = (rgba[..., i] for i in range(4))
+    if texel_format == FORMAT_RGBA8:
+        return np.ascontiguousarray(rgba)
+    if texel_format == FORMAT_RGB565:
+        # Alpha is dropped; callers make sure the image is opaque where it is used
+        return ((_reduce(r, 5) << 11) | (_reduce(g, 6) << 5) | _reduce(b, 5)).astype(np.uint16)
+    if texel_format == FORMAT_RGBA4444:
+        return ((_reduce(r, 4) << 12) | (_reduce(g, 4) << 8) | (_reduce(b, 4) << 4) | _reduce(a, 4)).astype(np.uint16)
+    if texel_format == FORMAT_PALETTE8:
+        if palette is None:
+            raise ValueError("palette8 needs a palette")
+        return palette_indices(rgba, palette)
+    raise ValueError(f"Unknown texture format: {texel_format}")
+
+def decode_pixels(data, width, height, texel_format, palette=None):
+    """Expand texels of texel_format back into a (height, width, 4) uint8 RGBA array"""
+    if texel_format == FORMAT_RGBA8:
+        return np.frombuffer(data, dtype=np.uint8, count=width * height * 4).reshape(height, width, 4)
+    if texel_format == FORMAT_PALETTE8:
+        indices = np.frombuffer(data, dtype=np.uint8, count=width * height).reshape(height, width)
+        return np.asarray(palette, dtype=np.uint8).reshape(-1, 4)[indices]
+
+    texels = np.frombuffer(data, dtype=np.uint16, count=width * height).reshape(height, width)
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    if texel_format == FORMAT_RGB565:
+        rgba[..., 0] = _expand(texels >> 11, 5)
+        rgba[..., 1] = _expand((texels >> 5) & 0x3F, 6)
+        rgba[..., 2] = _expand(texels & 0x1F, 5)
+        rgba[..., 3] = 255
+    elif texel_format == FORMAT_RGBA4444:
+        for channel in range(4):
+            rgba[..., channel] = _expand((texels >> (12 - 4 * channel)) & 0xF, 4)
+    else:
+        raise ValueError(f"Unknown texture format: {texel_format}")
+    return rgba
+
+def build_mipmaps(rgba):
+    """
+    Halve an RGBA image repeatedly down to 1x1 with a 2x2 box filter.
+    Colors are averaged weighted by alpha so transparent texels do not
+    darken the edges of sprites. Returns the levels below the original.
+    """
+    levels = []
+    level = np.asarray(rgba, dtype=np.float64)
+    while level.shape[0] > 1 or level.shape[1] > 1:
+        height, width = max(level.shape[0] // 2, 1), max(level.shape[1] // 2, 1)
+        # Odd or 1-texel sides: repeat the edge so every output has 2x2 inputs
+        source = level
+        if source.shape[0] < 2 * height:
+            source = np.concatenate((source, source[-1:]), axis=0)
+        if source.shape[1] < 2 * width:
+            source = np.concatenate((source, source[:, -1:]), axis=1)
+        blocks = source[:2 * height, :2 * width].reshape(height, 2, width, 2, 4)
+        alpha = blocks[..., 3:4]
+        alpha_sum = alpha.sum(axis=(1, 3))
+        color = (blocks[..., :3] * alpha).sum(axis=(1, 3)) / np.maximum(alpha_sum, 1e-9)
+        level = np.concatenate((color, alpha_sum / 4), axis=2)
+        levels.append(np.rint(level).clip(0, 255).astype(np.uint8))
+    return levels
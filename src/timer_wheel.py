@@ -0,0 +1,122 @@
+import math
+
+class Timer:
+    """A callback scheduled on a TimerWheel; pass it to cancel() or remaining()"""
+    __slots__ = ('due', 'tick', 'callback', 'bucket')
+
+    def __init__(self, due, tick, callback):
+        self.due = due  # Time the timer fires at
+        self.tick = tick  # The wheel tick that time falls in
+        self.callback = callback
+        self.bucket = None  # The slot holding the timer while it is pending
+
+    @property
+    def pending(self):
+        return self.bucket is not None
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel running on simulation time. Time is cut into
+    ticks of resolution seconds; level 0 has one slot per tick for the next
+    slots ticks, and each level above has slots as wide as the whole level
+    below. A timer goes into the slot covering its due tick, so scheduling
+    and cancelling are O(1), and advancing only looks at the level 0 slot of
+    each tick passed, moving a higher slot's timers down a level when its
+    turn comes. Timers fire in time order, those due in the same tick in
+    the order they were scheduled, and never on wall-clock time.
+    """
+    def __init__(self, resolution=1 / 240, slots=64, levels=4):
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.time = 0.0
+        self.tick = 0  # Last tick processed
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, delay, callback):
+        """Call callback() after delay seconds of simulation time; returns its Timer"""
+        due = self.time + delay
+        tick = max(math.ceil(due / self.resolution - 1e-9), self.tick + 1)
+        timer = Timer(due, tick, callback)
+        self._insert(timer)
+        self.count += 1
+        return timer
+
+    def _insert(self, timer):
+        """File a timer under the slot covering its tick at the lowest level that reaches that far"""
+        delta = timer.tick - self.tick
+        level, span = 0, self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+        # Beyond the top level a timer waits in the farthest slot and is refiled from there
+        tick = min(timer.tick, self.tick + span - 1)
+        bucket = self.wheels[level][(tick // (span // self.slots)) % self.slots]
+        bucket[timer] = None
+        timer.bucket = bucket
+
+    def cancel(self, timer):
+        """Stop a timer from firing; fired, cancelled and None timers are ignored"""
+        if timer is not None and timer.bucket is not None:
+            del timer.bucket[timer]
+            timer.bucket = None
+            self.count -= 1
+
+    def remaining(self, timer):
+        """Seconds until a timer fires, 0 if it is not pending"""
+        if timer is None or timer.bucket is None:
+            return 0.0
+        return max(timer.due - self.time, 0.0)
+
+    def advance(self, dt):
+        """Move time on by dt seconds, firing every timer due by then"""
+        end = self.time + dt
+        target = math.floor(end / self.resolution + 1e-9)
+        while self.tick < target:
+            if not self.count:
+                self.tick = target  # Nothing pending: skip straight to the end
+                break
+            self.tick += 1
+            self._cascade()
+            bucket = self.wheels[0][self.tick % self.slots]
+            while bucket:
+                timer = next(iter(bucket))
+                del bucket[timer]
+                if timer.tick > self.tick:
+                    # Filed in the farthest slot of the top level; still not due
+                    self._insert(timer)
+                    continue
+                timer.bucket = None
+                self.count -= 1
+                # Callbacks see the time their timer was due, so timers they schedule keep exact periods
+                self.time = timer.due
+                timer.callback()
+        self.time = end
+
+    def _cascade(self):
+        """When a level's slot boundary is reached, refile the timers of the next slot of the level above"""
+        top, span = 0, 1
+        while top < self.levels - 1 and not self.tick % (span * self.slots):
+            top += 1
+            span *= self.slots
+        # Highest level first, so timers it hands down are refiled again in turn
+        for level in range(top, 0, -1):
+            span = self.slots ** level
+            bucket = self.wheels[level][(self.tick // span) % self.slots]
+            timers = list(bucket)
+            bucket.clear()
+            for timer in timers:
+                self._insert(timer)
+
+    def clear(self):
+        """Cancel every timer"""
+        for wheel in self.wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    timer.bucket = None
+                bucket.clear()
+        self.count = 0
@@ -0,0 +1,82 @@
+import numpy as np
+import math
+
+# sin/cos for every whole degree; the game only rotates by integer angles
+SIN_TABLE = np.sin(np.radians(np.arange(360)))
+COS_TABLE = np.cos(np.radians(np.arange(360)))
+
+def sin_cos(angle_degrees):
+    """
+    Get (sin, cos) of an angle in degrees. Integer angles come from the
+    precomputed tables, anything else falls back to math.sin/math.cos.
+    """
+    if float(angle_degrees).is_integer():
+        index = int(angle_degrees) % 360
+        return SIN_TABLE[index], COS_TABLE[index]
+    angle_radians = math.radians(angle_degrees)
+    return math.sin(angle_radians), math.cos(angle_radians)
+
+def identity_matrix():
+    """3x3 homogeneous identity matrix"""
+    return np.eye(3)
+
+def translation_matrix(tx, ty):
+    """3x3 homogeneous matrix translating by (tx, ty)"""
+    return np.array([[1.0, 0.0, tx],
+                     [0.0, 1.0, ty],
+                     [0.0, 0.0, 1.0]])
+
+def rotation_matrix(angle_degrees, center_x=0, center_y=0):
+    """3x3 homogeneous matrix rotating around (center_x, center_y)"""
+    sin, cos = sin_cos(angle_degrees)
+    return np.array([[cos, -sin, center_x - cos * center_x + sin * center_y],
+                     [sin, cos, center_y - sin * center_x - cos * center_y],
+                     [0.0, 0.0, 1.0]])
+
+def scale_matrix(sx, sy, center_x=0, center_y=0):
+    """3x3 homogeneous matrix scaling relative to (center_x, center_y)"""
+    return np.array([[sx, 0.0, center_x - sx * center_x],
+                     [0.0, sy, center_y - sy * center_y],
+                     [0.0, 0.0, 1.0]])
+
+def compose(*matrices):
+    """
+    Compose transforms into one matrix. Matrices are applied in the order
+    given, so compose(scale, rotate, translate) scales first.
+    """
+    result = np.eye(3)
+    for matrix in matrices:
+        result = matrix @ result
+    return result
+
+def rotation_matrices(angles_degrees, center_x, center_y):
+    """
+    Build an (N, 3, 3) stack of rotation matrices, one per angle and center.
+    Angles are rounded to whole degrees and looked up in the trig tables.
+    """
+    angles = np.rint(np.asarray(angles_degrees, dtype=np.float64)).astype(np.int64) % 360
+    center_x = np.broadcast_to(np.asarray(center_x, dtype=np.float64), angles.shape)
+    center_y = np.broadcast_to(np.asarray(center_y, dtype=np.float64), angles.shape)
+    sin = SIN_TABLE[angles]
+    cos = COS_TABLE[angles]
+
+    matrices = np.zeros(angles.shape + (3, 3))
+    matrices[..., 0, 0] = cos
+    matrices[..., 0, 1] = -sin
+    matrices[..., 0, 2] = center_x - cos * center_x + sin * center_y
+    matrices[..., 1, 0] = sin
+    matrices[..., 1, 1] = cos
+    matrices[..., 1, 2] = center_y - sin * center_x - cos * center_y
+    matrices[..., 2, 2] = 1.0
+    return matrices
+
+def apply_transform(matrix, points):
+    """
+    Transform an (N, 2) point array. matrix is either one 3x3 matrix for all
+    points or an (N, 3, 3) stack with one matrix per point.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim == 2:
+        return points @ matrix[:2, :2].T + matrix[:2, 2]
+    return np.einsum('nij,nj->ni', matrix[:, :2, :2], points) + matrix[:, :2, 2]
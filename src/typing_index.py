@@ -0,0 +1,42 @@
+class TypingIndex:
+    """
+    The enemies that can be typed, bucketed by the first letter of what is
+    left of their word. Finding who a keystroke targets is one dictionary
+    lookup however many enemies there are. Within a bucket enemies are kept
+    in spawn order, also when a partly typed one joins a bucket late, so the
+    longest waiting one is picked first.
+    """
+    def __init__(self):
+        self.buckets = {}  # letter -> {handle: serial}, ordered by serial
+
+    def add(self, handle, word, serial):
+        """Make an enemy with word left to type and spawn number serial targetable"""
+        if word:
+            bucket = self.buckets.setdefault(word[0], {})
+            newest = next(reversed(bucket.values()), serial)
+            bucket[handle] = serial
+            if serial < newest:
+                # Rare: an enemy older than the bucket's newest, after typing its first letters
+                self.buckets[word[0]] = dict(sorted(bucket.items(), key=lambda item: item[1]))
+
+    def discard(self, handle, word):
+        """Stop targeting an enemy that had word left to type"""
+        if word:
+            bucket = self.buckets.get(word[0])
+            if bucket is not None:
+                bucket.pop(handle, None)
+                if not bucket:
+                    del self.buckets[word[0]]
+
+    def update(self, handle, old_word, new_word, serial):
+        """Move an enemy whose remaining word changed"""
+        self.discard(handle, old_word)
+        self.add(handle, new_word, serial)
+
+    def target(self, letter):
+        """Handle of the enemy typing letter starts on, or None"""
+        bucket = self.buckets.get(letter)
+        return next(iter(bucket)) if bucket else None
+
+    def clear(self):
+        self.buckets.clear()
@@ -1,41 +1,141 @@
-import pygame
-from text_manager import render_text
-from texture import draw_texture
-
-class Zombie:
-    def __init__(self, x, y, speed, word, zombie_texture, zombie_w, zombie_h):
-        self.x = x
-        self.y = y
-        self.speed = speed
-        self.word = word
-        self.alive = True
-        self.zombie_texture = zombie_texture
-        self.zombie_w = zombie_w
-        self.zombie_h = zombie_h
-        self.text_texture, self.tw, self.th = render_text(self.word)
-
-    def update(self, dt, player_right_edge, stop_distance):
-        if not self.alive:
+import numpy as np
+from entity_store import EntityStore
+from typing_index import TypingIndex
+from asset_cache import frame_size
+
+# Walk and attack cycles of each enemy kind; the attack cycle plays while
+# the enemy stands at the player
+ENEMY_CYCLES = {
+    'zombie': ('zombie_walk', None),
+    'boss': ('boss_walk', 'boss_attack'),
+    'bat': ('bat', None),
+}
+ENEMY_KINDS = list(ENEMY_CYCLES)  # The kind column holds indices into this list
+
+class ZombieStore(EntityStore):
+    """
+    Every enemy on the field, one row each. Movement, reaching the player
+    and cleaning up the dead are vectorized passes over all of them. Enemies
+    are referred to by handle, and a typing index over their remaining
+    words finds the enemy a keystroke targets. Without an animator enemies
+    play no animations, for simulating the game with nothing to draw.
+    """
+    def __init__(self, animator=None, capacity=64):
+        super().__init__({
+            'x': np.float64,
+            'prev_x': np.float64,  # x at the previous tick, for drawing between ticks
+            'y': np.float64,
+            'speed': np.float64,
+            'width': np.float64,
+            'height': np.float64,
+            'kind': np.int8,
+            'alive': (bool, True),
+            'attacking': bool,
+            'animation': (np.int64, -1),
+            'word': (object, ''),
+            'serial': np.int64,  # Spawn order
+        }, capacity)
+        self.animator = animator
+        self.typing_index = TypingIndex()
+        self.spawned = 0
+        self.has_attack = np.array([ENEMY_CYCLES[kind][1] is not None for kind in ENEMY_KINDS])
+        self.sizes = {}  # Walk cycle -> size of its first frame, the size enemies of the kind are hit at
+
+    def spawn(self, x, y, speed, word, kind='zombie', now=0.0):
+        """Add an enemy walking toward the player and return its handle"""
+        walk_cycle = ENEMY_CYCLES[kind][0]
+        if walk_cycle not in self.sizes:
+            self.sizes[walk_cycle] = frame_size(walk_cycle)
+        width, height = self.sizes[walk_cycle]
+        animation = self.animator.play(walk_cycle, now) if self.animator else -1
+        handle = self.add(x=x, prev_x=x, y=y, speed=speed, word=word, kind=ENEMY_KINDS.index(kind), animation=animation,
+                          width=width, height=height, serial=self.spawned)
+        self.typing_index.add(handle, word, self.spawned)
+        self.spawned += 1
+        return handle
+
+    def update(self, dt, player_right_edge, stop_distance, now=0.0):
+        """
+        Remove dead enemies, walk the rest toward the player and switch those
+        that reached it to their attack cycle. Returns whether any enemy is
+        within stop_distance of player_right_edge.
+        """
+        dead = ~self['alive']
+        if dead.any():
+            rows = np.flatnonzero(dead)
+            for handle, word in zip(self['id'][rows], self['word'][rows]):
+                self.typing_index.discard(handle, word)
+            self._release(rows)
+            self.remove(rows)
+
+        self['prev_x'] = self['x']
+        distance = self['x'] - player_right_edge
+        walking = distance > stop_distance
+        self['x'] -= np.where(walking, self['speed'] * dt, 0.0)
+
+        attacks = np.flatnonzero(~walking & ~self['attacking'] & self.has_attack[self['kind']])
+        for row in attacks if self.animator else ():
+            attack_cycle = ENEMY_CYCLES[ENEMY_KINDS[self['kind'][row]]][1]
+            self.animator.play(attack_cycle, now, handle=int(self['animation'][row]))
+        self['attacking'][attacks] = True
+        return bool((~walking).any())
+
+    def _release(self, rows):
+        """Give the animations of rows back to the animator's pool"""
+        if not self.animator:
             return
-        distance_to_player = self.x - player_right_edge
-        if distance_to_player > stop_distance:
-            self.x -= self.speed * dt
-        return distance_to_player
-
-    def process_typed_letter(self, typed_letter):
-        if self.alive and self.word and typed_letter == self.word[0]:
-            self.word = self.word[1:]
-            pygame.display.get_surface()  # Ensure pygame is initialized
-            from OpenGL.GL import glDeleteTextures
-            glDeleteTextures([self.text_texture])
-            if not self.word:
-                self.alive = False
-            else:
-                self.text_texture, self.tw, self.th = render_text(self.word)
+        for handle in self['animation'][rows]:
+            self.animator.stop(int(handle))
+
+    def clear(self):
+        """Remove every enemy"""
+        self._release(np.arange(len(self)))
+        self.typing_index.clear()
+        super().clear()
+
+    def target(self, typed_letter):
+        """Handle of the enemy typing typed_letter starts on, or None"""
+        return self.typing_index.target(typed_letter)
+
+    def set_word(self, row, word):
+        """Change what is left to type of an enemy's word"""
+        self.typing_index.update(self['id'][row], self['word'][row], word, self['serial'][row])
+        self['word'][row] = word
+
+    def process_typed_letter(self, row, typed_letter):
+        """Strip typed_letter off the front of an enemy's word if it matches; an empty word kills it"""
+        word = self['word'][row]
+        if self['alive'][row] and word and typed_letter == word[0]:
+            self.set_word(row, word[1:])
+            if not word[1:]:
+                self['alive'][row] = False
             return True
         return False
 
-    def draw(self):
-        if self.alive:
-            draw_texture(self.zombie_texture, self.x, self.y, self.zombie_w * 1.5, self.zombie_h * 1.5)
-            draw_texture(self.text_texture, self.x + 35, self.y - 25, self.tw, self.th) 
\ No newline at end of file
+    def spawn_order(self):
+        """Rows of the live enemies, oldest first"""
+        alive = np.flatnonzero(self['alive'])
+        return alive[np.argsort(self['serial'][alive])]
+
+    def draw_rects(self, rows, alpha=1.0):
+        """
+        Where each enemy's current animation frame is drawn, as (x, y, width,
+        height) rows, alpha of the way from the previous tick to this one
+        """
+        return np.column_stack((self.interpolate('x', alpha, rows), self['y'][rows],
+                                self['width'][rows] * 1.5, self['height'][rows] * 1.5))
+
+    def bounds(self):
+        """Boxes of every enemy as rows of x0, y0, x1, y1: the area drawn and hit by bullets"""
+        x, y, width, height = self.draw_rects(slice(None)).T
+        return np.column_stack((x, y, x + width, y + height))
+
+    def draw(self, alpha=1.0):
+        """Draw the live enemies, all frames before all words so each frame set batches into one draw call"""
+        rows = self.spawn_order()
+        self.animator.draw(self['animation'][rows], self.draw_rects(rows, alpha))
+        return rows
+
+    def labels(self, rows, alpha=1.0):
+        """Each enemy's word left to type with where it is drawn, as (word, x, y)"""
+        return zip(self['word'][rows], self.interpolate('x', alpha, rows) + 35, self['y'][rows] - 25)